@@ -0,0 +1,409 @@
+"""
+Offline master -> follower copy latency and throughput
+
+Starts the broker stand-ins from sim_brokers.py, runs the copy engine with
+masters and followers that speak each broker's wire protocol to them
+(the same messages cpo.py, cqu.py, ciq.py and cdr.py send through their
+SDKs), injects synthetic master trades at a fixed rate and reports
+signal-to-ack latency per stage and broker pair, plus per-follower
+throughput. With ``--accounts`` each follower broker gets several
+accounts, all fed by the engine's fan-out dispatcher. SDK-internal waits
+(e.g. PocketOption's 200 ms result polling) are not part of the
+measurement. The Deriv master and follower are the engine's own
+DerivMaster (contract feed subscriptions) and DerivFollower on the
+DerivAPI SDK; ``--deriv-buy-mode`` picks proposal+buy, direct buy or
+streamed proposals, and each path's send->ack is reported separately.
+
+The trade stream and ack jitter are seeded, so runs with the same arguments
+are comparable; ``--json`` saves the results and ``--baseline`` fails (exit
+status 1) when a pair's end-to-end p95 regressed by more than
+``--tolerance``.
+
+Follower accounts are not rate limited unless ``--rate-limit`` says so:
+``broker`` applies each broker's own admission limits (copytrade.admission),
+a number that many orders per minute. A burst above the limit is then
+smoothed, and receive->admit shows how long orders queued for it.
+
+    python benchmarks/copy_latency.py --masters iqoption pocketoption deriv \\
+        --followers pocketoption quotex iqoption deriv --rate 20 --count 200
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import websockets
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from copytrade import CopyEngine, LatencyTracker, SeenIds, Signal  # noqa: E402
+from copytrade.brokers import (  # noqa: E402
+    DerivFollower,
+    DerivMaster,
+    Follower,
+    Master,
+    signal_from_iq_option,
+    signal_from_pocket_order,
+)
+from copytrade.deriv import BUY_DIRECT, BUY_MODES, MAX_STREAMS  # noqa: E402
+from copytrade.latency import TOTAL  # noqa: E402
+from sim_brokers import SIMULATORS, synthetic_trade  # noqa: E402
+
+# Orders per minute that no run reaches: --rate-limit off
+UNLIMITED = 1e9
+
+
+# --- masters -----------------------------------------------------------------
+
+
+class SimMaster(Master):
+    """Master reading pushes from a stand-in"""
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, settings)
+        self.seen = SeenIds(ttl=86400)
+        self.ws = None
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.settings["url"], max_size=None)
+        await self.ws.send(self.hello())
+        await self.ws.recv()
+
+    def hello(self) -> str:
+        raise NotImplementedError
+
+    async def close(self):
+        await self.ws.close()
+
+
+class SimPocketOptionMaster(SimMaster):
+    broker = "pocketoption"
+
+    def hello(self) -> str:
+        return '42["auth",{"session":"sim","isDemo":1,"master":true}]'
+
+    async def run(self, emit):
+        async for message in self.ws:
+            if not isinstance(message, bytes):
+                continue
+            data = json.loads(message)
+            order = SimpleNamespace(
+                order_id=data["id"],
+                asset=data["asset"],
+                amount=float(data["amount"]),
+                direction=SimpleNamespace(value="call" if data["command"] == 0 else "put"),
+                duration=int(data["closeTimestamp"] - data["openTimestamp"]),
+                placed_at=SimpleNamespace(timestamp=lambda t=data["openTimestamp"]: t),
+            )
+            self._publish(str(data["id"]), signal_from_pocket_order(order), emit)
+
+
+class SimDerivMaster(DerivMaster):
+    """The engine's DerivMaster itself (DerivAPI SDK, contract feed subscriptions) on the stand-in"""
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, dict(settings, token="sim", endpoint=settings["url"]))
+        self.seen = SeenIds(ttl=86400)
+
+
+class SimIQOptionMaster(SimMaster):
+    broker = "iqoption"
+
+    def hello(self) -> str:
+        return json.dumps({"name": "ssid", "msg": "sim", "master": True})
+
+    async def run(self, emit):
+        async for message in self.ws:
+            push = json.loads(message)
+            if push.get("name") == "socket-option-opened":
+                msg = push["msg"]
+                self._publish(str(msg["id"]), signal_from_iq_option(msg["id"], msg), emit)
+
+
+# --- followers ---------------------------------------------------------------
+
+
+class SimFollower(Follower):
+    """Follower placing orders on a stand-in; replies are matched by request ID"""
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, settings)
+        self.ws = None
+        self.acks: List[float] = []
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.settings["url"], max_size=None)
+        await self.ws.send(self.hello())
+        await self.ws.recv()
+        self._reader = asyncio.ensure_future(self._read())
+
+    def hello(self) -> str:
+        raise NotImplementedError
+
+    def reply_key(self, message) -> Tuple[Optional[str], Any]:
+        """Request ID and payload of a reply, or (None, None)"""
+        raise NotImplementedError
+
+    async def _read(self):
+        async for message in self.ws:
+            key, payload = self.reply_key(message)
+            future = self._pending.pop(key, None) if key is not None else None
+            if future is not None and not future.done():
+                future.set_result(payload)
+
+    async def request(self, key: str, message: str, timeout: float = 10.0) -> Any:
+        future = self._pending[key] = asyncio.get_running_loop().create_future()
+        await self.ws.send(message)
+        return await asyncio.wait_for(future, timeout)
+
+    async def execute(self, signal: Signal) -> Tuple[bool, Any]:
+        order_id = await self.place(signal)
+        self.acks.append(time.time())
+        return True, order_id
+
+    async def place(self, signal: Signal) -> Any:
+        raise NotImplementedError
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        await self.ws.close()
+
+
+class _SimSocketIOFollower(SimFollower):
+    def hello(self) -> str:
+        return '42["auth",{"session":"sim","isDemo":1}]'
+
+    def reply_key(self, message):
+        if isinstance(message, bytes):
+            data = json.loads(message)
+            return data.get("requestId"), data
+        return None, None
+
+
+class SimPocketOptionFollower(_SimSocketIOFollower):
+    broker = "pocketoption"
+
+    async def place(self, signal: Signal) -> Any:
+        # Same frame as AsyncPocketOptionClient._send_order
+        request_id = str(uuid.uuid4())
+        message = (
+            f'42["openOrder",{{"asset":"{signal.asset}","amount":{signal.amount},"action":"{signal.direction}",'
+            f'"isDemo":1,"requestId":"{request_id}","optionType":100,"time":{signal.duration}}}]'
+        )
+        return (await self.request(request_id, message))["id"]
+
+
+class SimQuotexFollower(_SimSocketIOFollower):
+    broker = "quotex"
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, settings)
+        self._req_ids = itertools.count(int(time.time()))
+
+    async def place(self, signal: Signal) -> Any:
+        # Same frames as pyquotex's Buy channel
+        request_id = str(next(self._req_ids))
+        payload = {
+            "asset": signal.asset, "amount": signal.amount, "time": signal.duration, "action": signal.direction,
+            "isDemo": 1, "tournamentId": 0, "requestId": request_id, "optionType": 100,
+        }
+        await self.ws.send('42["tick"]')
+        return (await self.request(request_id, f'42["orders/open",{json.dumps(payload)}]'))["id"]
+
+
+class SimDerivFollower(DerivFollower):
+    """The engine's DerivFollower itself (DerivAPI SDK, session pool, buy modes) on the stand-in"""
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, dict(settings, token="sim", endpoint=settings["url"]))
+        self.acks: List[float] = []
+
+    async def execute(self, signal: Signal) -> Tuple[bool, Any]:
+        ok, contract_id = await super().execute(signal)
+        if ok:
+            self.acks.append(time.time())
+        return ok, contract_id
+
+
+class SimIQOptionFollower(SimFollower):
+    broker = "iqoption"
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, settings)
+        self._req_ids = itertools.count(1)
+
+    def hello(self) -> str:
+        return json.dumps({"name": "ssid", "msg": "sim"})
+
+    def reply_key(self, message):
+        reply = json.loads(message)
+        if reply.get("name") == "option":
+            return str(reply.get("request_id")), reply
+        return None, None
+
+    async def place(self, signal: Signal) -> Any:
+        # Same envelope as the SDK's Buyv3 channel
+        request_id = str(next(self._req_ids))
+        message = json.dumps({"name": "sendMessage", "request_id": request_id, "msg": {
+            "name": "binary-options.open-option", "version": "1.0",
+            "body": {"price": signal.amount, "active_id": 76, "expired": int(time.time()) + signal.duration,
+                     "direction": signal.direction, "option_type_id": 3, "user_balance_id": 1},
+        }})
+        return (await self.request(request_id, message))["msg"]["id"]
+
+
+SIM_MASTERS = {cls.broker: cls for cls in (SimPocketOptionMaster, SimDerivMaster, SimIQOptionMaster)}
+SIM_FOLLOWERS = {
+    cls.broker: cls for cls in (SimPocketOptionFollower, SimQuotexFollower, SimDerivFollower, SimIQOptionFollower)
+}
+
+
+# --- harness -----------------------------------------------------------------
+
+
+async def inject(sim, count: int, rate: float, rng: random.Random):
+    """Push ``count`` synthetic master trades at ``rate`` per second"""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for i in range(count):
+        delay = start + i / rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await sim.inject(synthetic_trade(rng))
+
+
+async def run(args) -> Dict[str, Any]:
+    brokers = sorted(set(args.masters) | set(args.followers))
+    sims = {}
+    for i, broker in enumerate(brokers):
+        sims[broker] = SIMULATORS[broker](ack_delay=args.ack_delay, jitter=args.jitter, seed=args.seed + i)
+        await sims[broker].start()
+
+    masters = [SIM_MASTERS[b](f"m-{b}", {"url": sims[b].url}) for b in args.masters]
+    # Every injected signal must fit in an account queue so the run measures latency, not drops
+    settings = {
+        "max_in_flight": args.max_in_flight, "queue_size": args.count * len(args.masters),
+        "buy_mode": args.deriv_buy_mode, "streams": args.deriv_streams, "sessions": args.max_in_flight,
+    }
+    if args.rate_limit != "broker":
+        settings["rate_limit"] = UNLIMITED if args.rate_limit == "off" else float(args.rate_limit)
+    followers = [
+        SIM_FOLLOWERS[b](f"f-{b}-{k}", dict(settings, url=sims[b].url))
+        for b in args.followers
+        for k in range(args.accounts)
+    ]
+    tracker = LatencyTracker("copy_latency", interval=3600)
+    engine = CopyEngine(masters, followers, staleness=60.0, audit_path=None, latency=tracker)
+    await engine.start()
+
+    expected = args.count
+    start = time.time()
+    rng = random.Random(args.seed)
+    await asyncio.gather(*(inject(sims[b], args.count, args.rate, random.Random(rng.random())) for b in args.masters))
+    deadline = time.time() + args.timeout
+    while time.time() < deadline and any(len(f.acks) < expected * len(masters) for f in followers):
+        await asyncio.sleep(0.05)
+    await engine.stop()
+    for sim in sims.values():
+        await sim.stop()
+
+    throughput = {}
+    for follower in followers:
+        elapsed = (follower.acks[-1] - start) if follower.acks else 0.0
+        throughput[follower.name] = {
+            "acks": len(follower.acks),
+            "expected": expected * len(masters),
+            "orders_per_s": len(follower.acks) / elapsed if elapsed else 0.0,
+        }
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("json", "baseline")},
+        "latency": tracker.snapshot(),
+        "throughput": throughput,
+        "fanout": engine.dispatcher.stats()["total"],
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Pairs whose end-to-end p95 grew by more than ``tolerance`` (and 1 ms)"""
+    regressions = []
+    for pair, segments in results["latency"].items():
+        before = baseline.get("latency", {}).get(pair, {}).get(TOTAL)
+        after = segments.get(TOTAL)
+        if before and after and after["p95"] > before["p95"] * (1 + tolerance) and after["p95"] - before["p95"] > 0.001:
+            regressions.append(f"{pair}: p95 {before['p95'] * 1e3:.1f} ms -> {after['p95'] * 1e3:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--masters", nargs="+", default=["iqoption", "pocketoption", "deriv"], choices=sorted(SIM_MASTERS))
+    parser.add_argument("--followers", nargs="+", default=sorted(SIM_FOLLOWERS), choices=sorted(SIM_FOLLOWERS))
+    parser.add_argument("--accounts", type=int, default=1, help="Follower accounts per follower broker")
+    parser.add_argument("--max-in-flight", type=int, default=2, help="Orders open at once per follower account")
+    parser.add_argument("--rate", type=float, default=20.0, help="Master trades per second per master")
+    parser.add_argument("--count", type=int, default=200, help="Master trades per master")
+    parser.add_argument("--ack-delay", type=float, default=0.005, help="Simulated broker ack delay, seconds")
+    parser.add_argument("--jitter", type=float, default=0.002, help="Extra random ack delay, seconds")
+    parser.add_argument("--deriv-buy-mode", default=BUY_DIRECT, choices=BUY_MODES, help="How the Deriv follower buys")
+    parser.add_argument("--deriv-streams", type=int, default=MAX_STREAMS, help="Proposal streams kept in stream mode")
+    parser.add_argument(
+        "--rate-limit", default="off", help="Orders per minute per follower account: off, broker or a number"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for outstanding acks")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 growth over the baseline")
+    args = parser.parse_args()
+
+    # Drops and failures are counted in the results; keep per-order logging quiet
+    logging.getLogger("copytrade").setLevel(logging.CRITICAL)
+    results = asyncio.run(run(args))
+
+    print(f"{'pair':<28}{'segment':<24}{'n':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for pair, segments in results["latency"].items():
+        for segment, s in segments.items():
+            print(
+                f"{pair:<28}{segment:<24}{s['n']:>6}"
+                f"{s['p50'] * 1e3:>9.2f}{s['p95'] * 1e3:>9.2f}{s['p99'] * 1e3:>9.2f}{s['max'] * 1e3:>9.2f}"
+            )
+    print()
+    print(f"{'follower':<16}{'acks':>8}{'expected':>10}{'orders/s':>10}")
+    for name, t in results["throughput"].items():
+        print(f"{name:<16}{t['acks']:>8}{t['expected']:>10}{t['orders_per_s']:>10.1f}")
+    fanout = results["fanout"]
+    print(
+        f"{'all accounts':<16}{fanout['placed']:>8}"
+        f"{fanout['placed'] + fanout['dropped'] + fanout['expired'] + fanout['failed']:>10}"
+        f"{fanout['orders_per_s']:>10.1f}   dropped {fanout['dropped']}, expired {fanout['expired']}, send->ack p50 {fanout['p50'] * 1e3:.1f} ms p95 {fanout['p95'] * 1e3:.1f} ms"
+    )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+    if any(t["acks"] < t["expected"] for t in results["throughput"].values()):
+        print("Some orders were not acknowledged")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Deriv order latency: fresh session per order vs. DerivSessionPool
+
+Runs the Deriv stand-in from sim_brokers.py and places the same orders
+(proposal + buy, as cdr.buy()) through the real DerivAPI SDK two ways:
+
+    fresh  new DerivAPI + authorize for every order (cdr.py before the pool)
+    pool   lease from a DerivSessionPool of pre-authorized sessions
+
+``--handshake-delay`` models the TCP + TLS setup a remote broker costs and
+``--ack-delay`` each request's round trip.
+
+    python benchmarks/deriv_sessions.py --orders 50 --concurrency 3 --handshake-delay 0.15 --ack-delay 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from copytrade.deriv import DerivSessionPool  # noqa: E402
+from copytrade.latency import percentiles  # noqa: E402
+from sim_brokers import DerivSim  # noqa: E402
+
+
+async def place(api, amount: float = 1.0):
+    proposal = await api.proposal({
+        "proposal": 1, "amount": amount, "basis": "stake", "contract_type": "CALL",
+        "currency": "USD", "duration": 60, "duration_unit": "s", "symbol": "frxEURUSD",
+    })
+    bought = await api.buy({"buy": proposal["proposal"]["id"], "price": amount})
+    return bought["buy"]["contract_id"]
+
+
+async def run_orders(order, count: int, concurrency: int) -> List[float]:
+    """Place ``count`` orders, at most ``concurrency`` at once; per-order seconds"""
+    latencies: List[float] = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            start = time.perf_counter()
+            await order()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(count)))
+    return latencies
+
+
+async def bench(args, mode: str):
+    from deriv_api import DerivAPI
+
+    sim = DerivSim(ack_delay=args.ack_delay, jitter=args.jitter, handshake_delay=args.handshake_delay)
+    url = await sim.start()
+    options = {"app_id": 1089, "endpoint": url}
+
+    if mode == "fresh":
+        async def order():
+            api = DerivAPI(**options)
+            await api.authorize("sim")
+            try:
+                await place(api)
+            finally:
+                await api.disconnect()
+
+        start = time.perf_counter()
+        latencies = await run_orders(order, args.orders, args.concurrency)
+        elapsed = time.perf_counter() - start
+    else:
+        pool = DerivSessionPool("sim", size=args.concurrency, **options)
+        await pool.start()
+
+        async def order():
+            async with pool.lease() as api:
+                await place(api)
+
+        start = time.perf_counter()
+        latencies = await run_orders(order, args.orders, args.concurrency)
+        elapsed = time.perf_counter() - start
+        await pool.close()
+    await sim.stop()
+    return latencies, elapsed, sim.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=3, help="Orders in flight (and pool size)")
+    parser.add_argument("--handshake-delay", type=float, default=0.15, help="Simulated connection setup, seconds")
+    parser.add_argument("--ack-delay", type=float, default=0.05, help="Simulated request round trip, seconds")
+    parser.add_argument("--jitter", type=float, default=0.005)
+    args = parser.parse_args()
+
+    # The SDK reports its own task errors on disconnect; they are not part of the measurement
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print(f"{'mode':<8}{'orders':>8}{'conns':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'orders/s':>10}")
+    for mode in ("fresh", "pool"):
+        latencies, elapsed, connections = asyncio.run(bench(args, mode))
+        p50, p95 = percentiles(latencies, (0.50, 0.95))
+        print(
+            f"{mode:<8}{len(latencies):>8}{connections:>7}{p50 * 1e3:>10.1f}{p95 * 1e3:>10.1f}"
+            f"{max(latencies) * 1e3:>10.1f}{len(latencies) / elapsed:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
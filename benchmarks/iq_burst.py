@@ -0,0 +1,256 @@
+"""
+IQ Option follower bursts: thread per order vs. IQOrderPool
+
+Places bursts of simultaneous orders against an in-process stand-in for the
+IQ Option client two ways:
+
+    threads  a thread per order calling ``buy_blitz`` (ciq.py before the pool);
+             the stand-in's ``buy_blitz`` follows iqoptionapi.stable_api: it
+             resets the shared ``buy_multi_option`` dict, reads the shared
+             ``result`` flag, fetches the payout table and busy-waits
+    pool     IQOrderPool with ``--workers`` threads and unique request IDs
+
+An order counts as correct when it reports success with the option ID the
+broker issued for that order's request. The broker replies after
+``--ack-delay`` (plus jitter) from a single socket thread, as the SDK's
+websocket client does. Orders of a burst start within ``--spread`` seconds
+of each other (master trades copied from several accounts rarely land in
+the same millisecond); latency is measured from each order's own start.
+
+    python benchmarks/iq_burst.py --bursts 1 5 20 --workers 4 --ack-delay 0.05 --spread 0.1
+"""
+
+import argparse
+import heapq
+import itertools
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from random import randint
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from copytrade.iqoption import IQOrderPool  # noqa: E402
+from copytrade.latency import percentiles  # noqa: E402
+
+ASSET = "EURUSD"
+
+
+class SimSocket:
+    """Delivers scheduled replies in order from one thread"""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Callable[[], None]]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def later(self, delay: float, callback: Callable[[], None]):
+        with self._cond:
+            heapq.heappush(self._heap, (time.perf_counter() + delay, next(self._seq), callback))
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (not self._heap or self._heap[0][0] > time.perf_counter()):
+                    self._cond.wait(self._heap[0][0] - time.perf_counter() if self._heap else None)
+                if self._closed:
+                    return
+                _, _, callback = heapq.heappop(self._heap)
+            callback()
+
+
+class SimIQAPI:
+    """The parts of ``IQOptionAPI`` a buy touches"""
+
+    def __init__(self, socket: SimSocket, ack_delay: float, jitter: float, rng: random.Random):
+        self.buy_multi_option: Dict[str, Any] = {}
+        self.result = None
+        self.buy_successful = None
+        self.issued: Dict[str, int] = {}
+        self.last_request: Dict[int, str] = {}
+        self._socket = socket
+        self._ack_delay = ack_delay
+        self._jitter = jitter
+        self._rng = rng
+        self._ids = itertools.count(1000)
+        self._lock = threading.Lock()
+
+    def _reply(self, request_id: str):
+        with self._lock:
+            option_id = self.issued[request_id] = next(self._ids)
+            delay = self._ack_delay + self._rng.uniform(0, self._jitter)
+
+        def deliver():
+            # What the SDK's "option" and "result" handlers do
+            self.buy_multi_option[request_id] = {"id": option_id}
+            self.result = True
+
+        self._socket.later(delay, deliver)
+
+    def buyv3(self, price, active, direction, duration, request_id):
+        self.last_request[threading.get_ident()] = str(request_id)
+        self._reply(str(request_id))
+
+    def buy_blitz_option(self, price, active_id, direction, expiration_size, profit_percent, value=None, request_id=None):
+        self.last_request[threading.get_ident()] = str(request_id)
+        self._reply(str(request_id))
+
+
+class SimIQOption:
+    """Stand-in for ``IQ_Option``; ``buy_blitz`` mirrors the SDK's algorithm"""
+
+    def __init__(self, ack_delay: float, jitter: float, seed: int = 1):
+        self.socket = SimSocket()
+        self.api = SimIQAPI(self.socket, ack_delay, jitter, random.Random(seed))
+        self.ack_delay = ack_delay
+
+    def get_all_profit(self):
+        # get_all_init is a request/response round trip as well
+        time.sleep(self.ack_delay)
+        return {ASSET: {"turbo": 0.87, "binary": 0.85}}
+
+    def get_blitz_payout(self, active):
+        all_profit = self.get_all_profit()
+        if active in all_profit:
+            for key in ["turbo", "binary"]:
+                if key in all_profit[active]:
+                    return int(all_profit[active][key] * 100)
+        return 85
+
+    def buy_blitz(self, active, price, direction, expiration):
+        self.api.buy_multi_option = {}
+        self.api.buy_successful = None
+        request_id = str(randint(0, 10000))
+        profit_percent = self.get_blitz_payout(active)
+        self.api.buy_blitz_option(price, 1, direction, expiration, profit_percent, None, request_id)
+        start_t = time.time()
+        id = None
+        self.api.result = None
+        while self.api.result == None or id == None:
+            try:
+                if "message" in self.api.buy_multi_option[request_id].keys():
+                    return False, self.api.buy_multi_option[request_id]["message"]
+            except Exception:
+                pass
+            try:
+                id = self.api.buy_multi_option[request_id]["id"]
+            except Exception:
+                pass
+            if time.time() - start_t >= 5:
+                return False, None
+        return self.api.result, self.api.buy_multi_option[request_id]["id"]
+
+    def close(self):
+        self.socket.close()
+
+
+def burst_threads(client: SimIQOption, offsets: List[float]) -> List[Tuple[bool, float]]:
+    """(correct, seconds) per order, one thread per order"""
+    outcomes: List[Tuple[bool, float]] = []
+    lock = threading.Lock()
+
+    def order():
+        start = time.perf_counter()
+        try:
+            ok, option_id = client.buy_blitz(ASSET, 1.0, "call", 60)
+        except KeyError:
+            # Another order reset buy_multi_option between this one's reply and its read
+            ok, option_id = False, None
+        elapsed = time.perf_counter() - start
+        request_id = client.api.last_request.get(threading.get_ident())
+        correct = bool(ok) and option_id is not None and client.api.issued.get(request_id) == option_id
+        with lock:
+            outcomes.append((correct, elapsed))
+
+    threads = []
+    for offset in offsets:
+        wait(offset)
+        thread = threading.Thread(target=order)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def burst_pool(pool: IQOrderPool, client: SimIQOption, offsets: List[float]) -> List[Tuple[bool, float]]:
+    """(correct, seconds) per order through the pool"""
+    slots = []
+    for offset in offsets:
+        wait(offset)
+        slot = pool.submit(ASSET, 1.0, "call", 60, block=True)
+        slots.append((slot, time.perf_counter()))
+        slot.add_done_callback(lambda slot: setattr(slot, "finished", time.perf_counter()))
+    outcomes = []
+    for slot, start in slots:
+        ok, option_id = slot.result()
+        outcomes.append((ok and client.api.issued.get(slot.request_id) == option_id, slot.finished - start))
+    return outcomes
+
+
+def wait(until: float):
+    """Sleep until ``until`` (perf_counter seconds)"""
+    delay = until - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bursts", type=int, nargs="+", default=[1, 5, 20], help="Orders per burst")
+    parser.add_argument("--repeat", type=int, default=5, help="Bursts per size")
+    parser.add_argument("--workers", type=int, default=4, help="IQOrderPool worker threads")
+    parser.add_argument("--ack-delay", type=float, default=0.05, help="Simulated broker round trip, seconds")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--spread", type=float, default=0.1, help="Window the orders of a burst start in, seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print(f"{'mode':<8}{'burst':>6}{'orders':>8}{'correct':>9}{'p50 ms':>10}{'max ms':>10}{'orders/s':>10}")
+    for mode in ("threads", "pool"):
+        for size in args.bursts:
+            client = SimIQOption(args.ack_delay, args.jitter)
+            pool = IQOrderPool(client, workers=args.workers, queue_size=max(args.bursts)) if mode == "pool" else None
+            if pool is not None:
+                pool.start()
+            outcomes: List[Tuple[bool, float]] = []
+            elapsed = 0.0
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                offsets = sorted(start + rng.uniform(0, args.spread) for _ in range(size))
+                if pool is not None:
+                    outcomes += burst_pool(pool, client, offsets)
+                else:
+                    outcomes += burst_threads(client, offsets)
+                elapsed += time.perf_counter() - start
+            if pool is not None:
+                pool.close()
+            client.close()
+            latencies = [seconds for _, seconds in outcomes]
+            correct = sum(ok for ok, _ in outcomes)
+            (p50,) = percentiles(latencies, (0.50,))
+            print(
+                f"{mode:<8}{size:>6}{len(outcomes):>8}{correct:>9}{p50 * 1e3:>10.1f}"
+                f"{max(latencies) * 1e3:>10.1f}{correct / elapsed:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
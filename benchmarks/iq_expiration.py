@@ -0,0 +1,103 @@
+"""
+IQ Option expiration ladder: per-call walks vs. ExpirationSchedule
+
+Times the lookups an order and a copied signal make:
+
+    expiration   Buyv3's ``get_expiration_time`` (walks up to 50 quarter
+                 hours minute by minute) vs. ``expiration_schedule.expiration``
+    remaning     signal_from_iq_option's ``get_remaning_time`` walk plus its
+                 first-slot search vs. ``expiration_schedule.duration_for``
+
+over a stream of ``--calls`` timestamps spread across ``--span`` seconds, so
+the schedule rebuilds its ladder at each half minute as it would live. The
+results of both are first compared over every ``--step`` seconds of a day
+and every duration, with the clock frozen so the walks and the schedule
+read the same second.
+
+    python benchmarks/iq_expiration.py --calls 5000 --span 3600
+"""
+
+import argparse
+import os
+import sys
+import time
+import types
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iqoptionapi import expiration  # noqa: E402
+from iqoptionapi.expiration import ExpirationSchedule  # noqa: E402
+
+DURATIONS = [1, 2, 3, 4, 5, 15, 30, 45, 60, 120, 240, 720]
+
+
+def first_slot(timestamp: float, seconds: float):
+    """signal_from_iq_option's search before the schedule"""
+    for minutes, remaining in expiration.get_remaning_time(timestamp):
+        if seconds < remaining:
+            return minutes
+    return None
+
+
+def check(start: int, step: int) -> int:
+    """Compare the schedule with the walks over a day; returns the number of mismatches"""
+    schedule = ExpirationSchedule()
+    clock = expiration.time
+    mismatches = 0
+    try:
+        for timestamp in range(start, start + 86400, step):
+            now = timestamp + 1
+            expiration.time = types.SimpleNamespace(time=lambda: now, mktime=time.mktime)
+            for duration in DURATIONS:
+                if expiration.get_expiration_time(timestamp, duration) != schedule.expiration(timestamp, duration, now):
+                    mismatches += 1
+            if expiration.get_remaning_time(timestamp) != schedule.remaning(timestamp, now):
+                mismatches += 1
+            for seconds in (30, 59, 60, 61, 299, 900, 3600):
+                if first_slot(timestamp, seconds) != schedule.duration_for(timestamp, seconds, now):
+                    mismatches += 1
+    finally:
+        expiration.time = clock
+    return mismatches
+
+
+def per_call(call: Callable[[float], object], timestamps: List[float]) -> float:
+    """Microseconds per call"""
+    start = time.perf_counter()
+    for timestamp in timestamps:
+        call(timestamp)
+    return (time.perf_counter() - start) / len(timestamps) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000, help="Lookups timed per function")
+    parser.add_argument("--span", type=float, default=3600.0, help="Seconds the timestamps spread over")
+    parser.add_argument("--step", type=int, default=61, help="Seconds between checked timestamps")
+    args = parser.parse_args()
+
+    start = int(time.time())
+    mismatches = check(start, args.step)
+    print(f"checked {86400 // args.step} timestamps x {len(DURATIONS)} durations: {mismatches} mismatches")
+
+    timestamps = [start + args.span * i / args.calls for i in range(args.calls)]
+    schedule = ExpirationSchedule()
+    rows = [
+        ("expiration", "walk", lambda t: expiration.get_expiration_time(int(t), 1)),
+        ("expiration", "schedule", lambda t: schedule.expiration(int(t), 1)),
+        ("remaning", "walk", lambda t: first_slot(t, 60)),
+        ("remaning", "schedule", lambda t: schedule.duration_for(t, 60)),
+    ]
+    print(f"{'lookup':<12}{'impl':<10}{'us/call':>10}{'speedup':>10}")
+    baseline = 0.0
+    for lookup, impl, call in rows:
+        micros = per_call(call, timestamps)
+        if impl == "walk":
+            baseline = micros
+        print(f"{lookup:<12}{impl:<10}{micros:>10.2f}{baseline / micros:>9.1f}x")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+MT5 open/close propagation: one re-logging process vs. a process per terminal
+
+Runs a schedule of master positions (see mt5_sim.py) through two copiers:
+
+    relogin  cmt.py's monitor_trades: one process, one terminal connection
+             switched to the follower account and back for every copied open
+             and close, 1 s between polls
+    split    copytrade.mt5 run_master + run_follower: a process per
+             terminal, linked by a multiprocessing queue
+
+and reports, per position, the time from the master opening (closing) it
+to the follower's copy being opened (closed). ``--login-delay`` is what one
+``initialize`` + ``login`` costs; a real terminal takes seconds.
+
+    python benchmarks/mt5_copy.py --count 6 --gap 2 --hold 3 --login-delay 1
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS))
+sys.path.insert(0, BENCHMARKS)
+
+from copytrade.latency import percentiles  # noqa: E402
+from copytrade.mt5 import run_follower, run_master  # noqa: E402
+
+MASTER = {"login": 1, "password": "sim", "server": "sim", "path": "master"}
+FOLLOWER = {"login": 2, "password": "sim", "server": "sim", "path": "follower"}
+
+
+def relogin():
+    """Process target: cmt.py's own single-process loop on the stand-in"""
+    import mt5_sim
+
+    sys.modules["MetaTrader5"] = mt5_sim
+    import cmt
+
+    cmt.monitor_trades(MASTER, FOLLOWER)
+
+
+def run_relogin(seconds: float):
+    process = multiprocessing.Process(target=relogin, daemon=True)
+    process.start()
+    process.join(seconds)
+    process.terminate()
+    process.join()
+
+
+def run_split(seconds: float):
+    events = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    master = multiprocessing.Process(
+        target=run_master, args=(MASTER, "master", events), kwargs={"module": "mt5_sim", "stop": stop}
+    )
+    follower = multiprocessing.Process(
+        target=run_follower, args=(FOLLOWER, "follower", events), kwargs={"module": "mt5_sim"}
+    )
+    follower.start()
+    master.start()
+    time.sleep(seconds)
+    stop.set()
+    master.join()
+    events.put(None)
+    follower.join()
+
+
+def fills(path: str) -> Dict[str, Dict[int, float]]:
+    result: Dict[str, Dict[int, float]] = {"open": {}, "close": {}}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            kind, index, when = line.split()
+            result[kind].setdefault(int(index), float(when))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["relogin", "split"], choices=["relogin", "split"])
+    parser.add_argument("--count", type=int, default=6, help="Master positions")
+    parser.add_argument("--gap", type=float, default=2.0, help="Seconds between master opens")
+    parser.add_argument("--hold", type=float, default=3.0, help="Seconds each master position stays open")
+    parser.add_argument("--login-delay", type=float, default=1.0, help="initialize + login, seconds")
+    parser.add_argument("--order-delay", type=float, default=0.05, help="order_send round trip, seconds")
+    args = parser.parse_args()
+
+    print(f"{'mode':<9}{'kind':<7}{'copied':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as directory:
+            log = os.path.join(directory, "fills.log")
+            open(log, "w").close()
+            # Leave both copiers time to log in before the first position opens
+            start = time.time() + 2 * args.login_delay + 0.5
+            os.environ["MT5_SIM"] = json.dumps({
+                "start": start, "count": args.count, "gap": args.gap, "hold": args.hold,
+                "login_delay": args.login_delay, "order_delay": args.order_delay, "log": log,
+            })
+            seconds = start - time.time() + (args.count - 1) * args.gap + args.hold + 4 * args.login_delay + 2
+            run_relogin(seconds) if mode == "relogin" else run_split(seconds)
+            filled = fills(log)
+        for kind, offset in (("open", 0.0), ("close", args.hold)):
+            latencies: List[float] = [
+                when - (start + index * args.gap + offset) for index, when in filled[kind].items()
+            ]
+            if not latencies:
+                print(f"{mode:<9}{kind:<7}{0:>5}/{args.count:<2}")
+                continue
+            p50, p95 = percentiles(latencies, (0.50, 0.95))
+            print(
+                f"{mode:<9}{kind:<7}{len(latencies):>5}/{args.count:<2}"
+                f"{p50 * 1e3:>10.0f}{p95 * 1e3:>10.0f}{max(latencies) * 1e3:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
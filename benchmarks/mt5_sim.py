@@ -0,0 +1,109 @@
+"""
+Stand-in for the MetaTrader5 package
+
+Answers the calls cmt.py and copytrade.mt5 make. Login ``MASTER_LOGIN``
+sees a fixed schedule of positions: position ``i`` opens at
+``start + i * gap`` and closes ``hold`` seconds later, and its stop loss is
+``SL_BASE + i`` so a follower's copy can be matched to it. Any other login
+is a follower account holding the positions its order_send() calls open.
+``initialize()`` and ``login()`` each take half of ``login_delay`` and
+``order_send()`` takes ``order_delay``, standing in for the terminal.
+
+Settings are read from the ``MT5_SIM`` environment variable (JSON), so
+every process started by multiprocessing sees the same schedule. Each
+follower fill is appended to the ``log`` file as ``<open|close> <i> <time>``.
+"""
+
+import itertools
+import json
+import os
+import time
+from collections import namedtuple
+from typing import Any, Dict, Optional
+
+MASTER_LOGIN = 1
+SL_BASE = 1000
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+TRADE_ACTION_DEAL = 1
+ORDER_TIME_GTC = 0
+ORDER_FILLING_IOC = 1
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_REJECT = 10006
+
+Position = namedtuple("Position", "ticket symbol volume type price_current sl tp time_msc")
+OrderSendResult = namedtuple("OrderSendResult", "retcode order comment")
+Tick = namedtuple("Tick", "bid ask")
+
+_login: Optional[int] = None
+_positions: Dict[int, Position] = {}
+_tickets = itertools.count(500)
+
+
+def settings() -> Dict[str, Any]:
+    return json.loads(os.environ["MT5_SIM"])
+
+
+def initialize(path: str = "", **kwargs) -> bool:
+    time.sleep(settings()["login_delay"] / 2)
+    return True
+
+
+def login(login: int, password: str = "", server: str = "", **kwargs) -> bool:
+    global _login
+    time.sleep(settings()["login_delay"] / 2)
+    _login = login
+    return True
+
+
+def shutdown():
+    pass
+
+
+def last_error():
+    return 1, "Success"
+
+
+def symbol_info_tick(symbol: str) -> Tick:
+    return Tick(1.0, 1.0)
+
+
+def _schedule(now: float):
+    config = settings()
+    for i in range(config["count"]):
+        opened = config["start"] + i * config["gap"]
+        if opened <= now < opened + config["hold"]:
+            yield Position(i + 1, "EURUSD", 0.01, ORDER_TYPE_BUY, 1.0, SL_BASE + i, 2.0, int(opened * 1000))
+
+
+def positions_get(ticket: Optional[int] = None, **kwargs):
+    if _login == MASTER_LOGIN:
+        positions = list(_schedule(time.time()))
+    else:
+        positions = list(_positions.values())
+    if ticket is not None:
+        positions = [p for p in positions if p.ticket == ticket]
+    return tuple(positions)
+
+
+def _fill(kind: str, index: int):
+    with open(settings()["log"], "a", encoding="utf-8") as f:
+        f.write(f"{kind} {index} {time.time():.6f}\n")
+
+
+def order_send(request: Dict[str, Any]) -> OrderSendResult:
+    time.sleep(settings()["order_delay"])
+    if "position" in request:
+        position = _positions.pop(request["position"], None)
+        if position is None:
+            return OrderSendResult(TRADE_RETCODE_REJECT, 0, "Position not found")
+        _fill("close", int(position.sl) - SL_BASE)
+        return OrderSendResult(TRADE_RETCODE_DONE, next(_tickets), "Request executed")
+    ticket = next(_tickets)
+    _positions[ticket] = Position(
+        ticket, request["symbol"], request["volume"], request["type"], request["price"],
+        request["sl"], request["tp"], int(time.time() * 1000),
+    )
+    _fill("open", int(request["sl"]) - SL_BASE)
+    return OrderSendResult(TRADE_RETCODE_DONE, ticket, "Request executed")
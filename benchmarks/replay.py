@@ -0,0 +1,291 @@
+"""
+Replay recorded signals through the follower pipeline
+
+Streams the signals in orders.log, or in every segment of the journal
+(copytrade.journal), legacy free-text lines included, and feeds them to a
+CopyEngine whose followers place orders on the broker stand-ins from
+sim_brokers.py, so the router's duplicate and staleness checks, the symbol
+table and the fan-out dispatcher see the recorded traffic's real shape.
+
+Signals are emitted on the recorded schedule divided by ``--speed`` (1, 10,
+... or ``max`` for no waits). Each signal's open, expiry and stamp times are
+moved to its replay time, keeping the gaps between them, so a signal the
+master recorded too close to expiry is still refused as stale. The log is
+read one line at a time, so a month of it needs no more memory than a day.
+
+Reported per follower account:
+
+    expected   signals the router handed to the dispatcher
+    placed     orders the stand-in acknowledged
+    failed     orders refused, including assets the broker does not list (unmapped)
+    dropped    signals refused because the account's queue was full
+    expired    signals whose deadline passed while they waited for admission (rate limit)
+    late       orders acked more than ``--late`` seconds after the signal's replay time
+    dup        master trades copied more than once (same ID within ``DUPLICATE_WINDOW``
+               of recorded time)
+
+The router keeps each copied ID until its trade expires, so a re-sent
+signal is refused while it could still be copied. The run fails (exit
+status 1) if any master trade was copied twice.
+
+    python benchmarks/replay.py orders.log --speed 10 --followers pocketoption quotex deriv
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS))
+sys.path.insert(0, BENCHMARKS)
+
+from copytrade import CopyEngine, LatencyTracker, SeenIds, Signal, SignalJournal, mark  # noqa: E402
+from copytrade.brokers import Follower, Master  # noqa: E402
+from copy_latency import SIM_FOLLOWERS, SimFollower  # noqa: E402
+from sim_brokers import SIMULATORS  # noqa: E402
+
+# Recorded seconds within which a second copy of a master trade counts as a duplicate
+DUPLICATE_WINDOW = 86400.0
+PROGRESS_INTERVAL = 10.0
+
+
+def recorded_signals(path: str, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Signal]:
+    """Signals of a log or journal, oldest segment first, within [start, end)"""
+    for signal in SignalJournal(path, cursor_dir=None).read_from(0):
+        if start is not None and signal.stamp < start:
+            continue
+        if end is not None and signal.stamp >= end:
+            return
+        yield signal
+
+
+class ReplayMaster(Master):
+    """Emits recorded signals on their schedule, moved to the replay's clock"""
+
+    broker = "replay"
+
+    def __init__(self, signals: Iterator[Signal], speed: float):
+        super().__init__("replay", {})
+        self.signals = signals
+        self.speed = speed
+        self.read = 0
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+        self.lag = 0.0
+        self.finished = asyncio.Event()
+
+    async def connect(self):
+        pass
+
+    async def run(self, emit):
+        if self.finished.is_set():
+            # The engine restarts masters that return; there is nothing left to emit
+            await asyncio.Future()
+        started = time.time()
+        progress = started + PROGRESS_INTERVAL
+        for signal in self.signals:
+            self.read += 1
+            if self.first is None:
+                self.first = signal.stamp
+            self.last = max(self.last or signal.stamp, signal.stamp)
+            if self.speed:
+                scheduled = started + (signal.stamp - self.first) / self.speed
+                delay = scheduled - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.lag = max(self.lag, -delay)
+            else:
+                scheduled = time.time()
+                # Let the router and the followers run between signals
+                await asyncio.sleep(0)
+            emit(self.shift(signal, scheduled))
+            if time.time() >= progress:
+                progress += PROGRESS_INTERVAL
+                print(f"  {self.read} signals, recorded time {datetime.fromtimestamp(signal.stamp):%Y-%m-%d %H:%M:%S}")
+        self.finished.set()
+        await asyncio.Future()
+
+    @staticmethod
+    def shift(signal: Signal, now: float) -> Signal:
+        """The signal as if its master had detected it at ``now``"""
+        offset = now - signal.stamp
+        extra = {k: v for k, v in signal.extra.items() if k != "t"}
+        extra["recorded"] = signal.stamp
+        shifted = replace(
+            signal,
+            stamp=now,
+            server_stamp=signal.server_stamp + offset if signal.server_stamp else 0.0,
+            expiry=signal.expiry + offset if signal.expiry else 0.0,
+            extra=extra,
+        )
+        mark(shifted, "detect", now)
+        return shifted
+
+
+def replay_follower(cls):
+    """A stand-in follower that maps symbols like the real ones and counts late and repeated copies"""
+
+    class ReplayFollower(cls):
+        def __init__(self, name: str, settings: Dict[str, Any]):
+            super().__init__(name, settings)
+            self.late_after = settings["late"]
+            self.copied = SeenIds(ttl=DUPLICATE_WINDOW)
+            self.unmapped = 0
+            self.late = 0
+            self.repeated = 0
+
+        async def execute(self, signal: Signal) -> Tuple[bool, Any]:
+            if isinstance(self, SimFollower):
+                # The wire-level stand-ins send the asset as given; the real followers translate it
+                asset = self.symbol(signal)
+                if asset is None:
+                    self.unmapped += 1
+                    return False, f"{signal.asset} is not listed on {self.broker}"
+                signal = replace(signal, asset=asset)
+            ok, info = await super().execute(signal)
+            if ok:
+                if time.time() - signal.stamp > self.late_after:
+                    self.late += 1
+                if not self.copied.add((signal.broker, signal.id), now=signal.extra.get("recorded", signal.stamp)):
+                    self.repeated += 1
+            return ok, info
+
+    ReplayFollower.__name__ = f"Replay{cls.__name__}"
+    return ReplayFollower
+
+
+def idle(engine: CopyEngine, emitted: int) -> bool:
+    """Every emitted signal went through the router and every account's orders are done"""
+    if engine.routed + engine.duplicates + engine.stale < emitted:
+        return False
+    return all(
+        a.queue.empty() and not a.in_flight and not a.admission.waiting for a in engine.dispatcher.accounts
+    )
+
+
+async def run(args) -> Dict[str, Any]:
+    sims = {}
+    for i, broker in enumerate(sorted(set(args.followers))):
+        sims[broker] = SIMULATORS[broker](ack_delay=args.ack_delay, jitter=args.jitter, seed=args.seed + i)
+        await sims[broker].start()
+
+    start = datetime.fromisoformat(args.start).timestamp() if args.start else None
+    end = start + args.hours * 3600 if start is not None and args.hours else None
+    master = ReplayMaster(recorded_signals(args.log, start, end), args.speed)
+    settings = {
+        "max_in_flight": args.max_in_flight, "queue_size": args.queue_size, "sessions": args.max_in_flight,
+        "late": args.late,
+    }
+    followers: List[Follower] = [
+        replay_follower(SIM_FOLLOWERS[b])(f"f-{b}-{k}", dict(settings, url=sims[b].url))
+        for b in args.followers
+        for k in range(args.accounts)
+    ]
+    engine = CopyEngine(
+        [master], followers, staleness=args.staleness, audit_path=None,
+        latency=LatencyTracker("replay", interval=86400),
+    )
+    await engine.start()
+    started = time.time()
+    await master.finished.wait()
+    deadline = time.time() + args.timeout
+    while time.time() < deadline and not idle(engine, master.read):
+        await asyncio.sleep(0.05)
+    elapsed = time.time() - started
+    accounts = engine.dispatcher.stats()["accounts"]
+    await engine.stop()
+    for sim in sims.values():
+        await sim.stop()
+
+    recorded = (master.last - master.first) if master.read else 0.0
+    results: Dict[str, Any] = {
+        "config": vars(args),
+        "signals": {
+            "read": master.read,
+            "routed": engine.routed,
+            "duplicates": engine.duplicates,
+            "stale": engine.stale,
+            "recorded_s": recorded,
+            "replay_s": elapsed,
+            "signals_per_s": master.read / elapsed if elapsed else 0.0,
+            "emit_lag_max_s": master.lag,
+        },
+        "followers": {},
+    }
+    for follower in followers:
+        stats = accounts[follower.name]
+        results["followers"][follower.name] = {
+            "expected": engine.routed,
+            "placed": stats["placed"],
+            "failed": stats["failed"],
+            "unmapped": follower.unmapped,
+            "dropped": stats["dropped"],
+            "expired": stats["expired"],
+            "late": follower.late,
+            "duplicates": follower.repeated,
+            "orders_per_s": stats["placed"] / elapsed if elapsed else 0.0,
+            "p50": stats["p50"],
+            "p95": stats["p95"],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", nargs="?", default="orders.log", help="orders.log, or the active segment of a journal")
+    parser.add_argument("--speed", default="1", help="Replay speed: a factor (1, 10, ...) or max")
+    parser.add_argument("--start", help="Replay from this local time (ISO, e.g. 2025-07-10 or 2025-07-10T09:30)")
+    parser.add_argument("--hours", type=float, help="Hours of the recording to replay from --start")
+    parser.add_argument("--followers", nargs="+", default=["pocketoption"], choices=sorted(SIM_FOLLOWERS))
+    parser.add_argument("--accounts", type=int, default=1, help="Follower accounts per follower broker")
+    parser.add_argument("--max-in-flight", type=int, default=2, help="Orders open at once per follower account")
+    parser.add_argument("--queue-size", type=int, default=64, help="Signals an account queues before dropping")
+    parser.add_argument("--staleness", type=float, default=15.0, help="Age limit for signals without an expiry")
+    parser.add_argument("--late", type=float, default=1.0, help="Seconds after which an ack counts as late")
+    parser.add_argument("--ack-delay", type=float, default=0.005, help="Simulated broker ack delay, seconds")
+    parser.add_argument("--jitter", type=float, default=0.002, help="Extra random ack delay, seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for outstanding orders")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    args.speed = 0.0 if args.speed == "max" else float(args.speed)
+
+    # Drops and failures are counted in the results; keep per-order logging quiet
+    logging.getLogger("copytrade").setLevel(logging.CRITICAL)
+    results = asyncio.run(run(args))
+
+    s = results["signals"]
+    speed = s["recorded_s"] / s["replay_s"] if s["replay_s"] else 0.0
+    print(
+        f"signals  read {s['read']}, routed {s['routed']}, duplicates {s['duplicates']}, stale {s['stale']}\n"
+        f"time     {s['recorded_s'] / 3600:.2f} h recorded in {s['replay_s']:.1f} s ({speed:.1f}x), "
+        f"{s['signals_per_s']:.1f} signals/s, emit lag max {s['emit_lag_max_s'] * 1e3:.0f} ms"
+    )
+    print()
+    print(
+        f"{'follower':<18}{'expected':>9}{'placed':>8}{'failed':>8}{'unmapped':>9}{'dropped':>8}"
+        f"{'expired':>8}{'late':>6}{'dup':>5}{'orders/s':>10}{'p50 ms':>8}{'p95 ms':>8}"
+    )
+    for name, f in results["followers"].items():
+        print(
+            f"{name:<18}{f['expected']:>9}{f['placed']:>8}{f['failed']:>8}{f['unmapped']:>9}{f['dropped']:>8}"
+            f"{f['expired']:>8}{f['late']:>6}{f['duplicates']:>5}{f['orders_per_s']:>10.1f}{f['p50'] * 1e3:>8.1f}{f['p95'] * 1e3:>8.1f}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    if any(f["duplicates"] for f in results["followers"].values()):
+        print("Some master trades were copied more than once")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
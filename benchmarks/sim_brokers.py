@@ -0,0 +1,358 @@
+"""
+Local websocket stand-ins for the brokers
+
+Each simulator speaks just enough of its broker's protocol for the copy path:
+
+    PocketOption  42["openOrder",{...}]          -> 451-["successopenOrder",...] + binary JSON
+    Quotex        42["orders/open",{...}]        -> 451-["s_orders/open",...] + binary JSON
+    Deriv         {"proposal": 1, ...}           -> {"msg_type": "proposal", ...}
+                  {"buy": <id>, "price": ...}    -> {"msg_type": "buy", ...}
+                  {"buy": 1, "parameters": ...}  -> {"msg_type": "buy", ...}
+                  {"proposal_open_contract": 1, "subscribe": 1} and
+                  {"transaction": 1, "subscribe": 1} -> pushes per contract
+    IQ Option     sendMessage binary-options.open-option -> {"name": "option", ...}
+
+``inject()`` pushes a synthetic master trade to every connection that asked
+for master pushes (PocketOption/Quotex ``successopenOrder``, Deriv
+``proposal_open_contract`` subscription, IQ Option ``socket-option-opened``).
+Order acks are delayed by ``ack_delay`` plus seeded jitter so runs repeat;
+``handshake_delay`` holds every new connection before its websocket
+handshake completes, standing in for TCP + TLS setup to a remote broker.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Any, Dict, Optional, Set
+
+import websockets
+
+ASSETS = ("EURUSD_otc", "GBPUSD_otc", "USDJPY_otc", "AUDCAD_otc", "EURJPY_otc")
+
+
+class SimBroker:
+    """
+    Base stand-in server.
+
+    Args:
+        ack_delay: Seconds before an order is acknowledged
+        jitter: Extra uniformly distributed ack delay, seconds
+        seed: Seed for the jitter
+        handshake_delay: Seconds added to every connection's handshake
+    """
+
+    name = ""
+
+    def __init__(self, ack_delay: float = 0.005, jitter: float = 0.002, seed: int = 1, handshake_delay: float = 0.0):
+        self.ack_delay = ack_delay
+        self.handshake_delay = handshake_delay
+        self.connections = 0
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.url = ""
+        self.orders = 0
+        self._server = None
+        self._masters: Set[Any] = set()
+        self._ids = itertools.count(10_000_000_000)
+
+    async def start(self) -> str:
+        """Listen on a free local port and return the ws:// URL"""
+        self._server = await websockets.serve(
+            self._handler, "127.0.0.1", 0, max_size=None, process_request=self._handshake
+        )
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handshake(self, path, headers):
+        self.connections += 1
+        if self.handshake_delay:
+            await asyncio.sleep(self.handshake_delay)
+        return None
+
+    async def _handler(self, ws, path: str = "/"):
+        try:
+            async for message in ws:
+                await self.on_message(ws, message)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._masters.discard(ws)
+
+    async def on_message(self, ws, message):
+        raise NotImplementedError
+
+    def _later(self, coro):
+        """Run ``coro`` after the ack delay without blocking the connection"""
+        delay = self.ack_delay + self.rng.uniform(0, self.jitter)
+
+        async def delayed():
+            await asyncio.sleep(delay)
+            try:
+                await coro
+            except websockets.ConnectionClosed:
+                pass
+
+        asyncio.ensure_future(delayed())
+
+    async def inject(self, trade: Dict[str, Any]):
+        """Push a master trade to every master connection"""
+        raise NotImplementedError
+
+    async def _broadcast(self, *frames):
+        for ws in list(self._masters):
+            try:
+                for frame in frames:
+                    await ws.send(frame)
+            except websockets.ConnectionClosed:
+                self._masters.discard(ws)
+
+
+class _SocketIOSim(SimBroker):
+    """Socket.IO style text events with a binary attachment for results"""
+
+    order_event = ""
+    result_event = ""
+
+    async def on_message(self, ws, message):
+        if isinstance(message, bytes):
+            return
+        if message.startswith("42["):
+            event, *payload = json.loads(message[2:])
+            data = payload[0] if payload else {}
+            if event == "auth":
+                await ws.send('42["successauth",{"id":"sim"}]')
+                if isinstance(data, dict) and data.get("master"):
+                    self._masters.add(ws)
+            elif event == self.order_event:
+                self.orders += 1
+                self._later(self._send_result(ws, self._result(data)))
+
+    def _result(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "id": str(next(self._ids)),
+            "requestId": order.get("requestId"),
+            "asset": order.get("asset"),
+            "amount": order.get("amount"),
+            "command": 0 if order.get("action") == "call" else 1,
+            "openTimestamp": now,
+            "closeTimestamp": now + int(order.get("time", 60)),
+        }
+
+    async def _send_result(self, ws, result: Dict[str, Any]):
+        await ws.send(f'451-["{self.result_event}",{{"_placeholder":true,"num":0}}]')
+        await ws.send(json.dumps(result).encode())
+
+    async def inject(self, trade: Dict[str, Any]):
+        result = self._result(trade)
+        await self._broadcast(
+            f'451-["{self.result_event}",{{"_placeholder":true,"num":0}}]', json.dumps(result).encode()
+        )
+
+
+class PocketOptionSim(_SocketIOSim):
+    name = "pocketoption"
+    order_event = "openOrder"
+    result_event = "successopenOrder"
+
+
+class QuotexSim(_SocketIOSim):
+    name = "quotex"
+    order_event = "orders/open"
+    result_event = "s_orders/open"
+
+
+class DerivSim(SimBroker):
+    """
+    Deriv API v3 JSON requests keyed by req_id.
+
+    A proposal with ``subscribe`` is re-quoted under a new ID every
+    ``requote`` seconds (the old ID stops being buyable) until it is bought
+    or forgotten. Pushes of the ``proposal_open_contract`` and
+    ``transaction`` subscriptions echo the subscribing request and its
+    req_id, as Deriv's do; an injected trade's ``buy`` transaction goes out before
+    its contract update.
+    """
+
+    name = "deriv"
+    requote = 1.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._proposals: Dict[str, Dict[str, Any]] = {}
+        self._streams: Dict[str, asyncio.Task] = {}
+        self._contracts: Dict[int, Dict[str, Any]] = {}
+        # Subscribing connection -> msg_type -> the request its pushes echo
+        self._subscribers: Dict[Any, Dict[str, Any]] = {}
+
+    async def on_message(self, ws, message):
+        request = json.loads(message)
+        reply: Dict[str, Any] = {"echo_req": request, "req_id": request.get("req_id")}
+        if "authorize" in request:
+            reply.update(msg_type="authorize", authorize={"account_list": [{"loginid": "VRTC1"}], "currency": "USD"})
+            self._later(ws.send(json.dumps(reply)))
+        elif "asset_index" in request:
+            reply.update(msg_type="asset_index", asset_index=[
+                ["frx" + a.replace("_otc", ""), a[:3] + "/" + a[3:6], []] for a in ASSETS
+            ] + [["R_100", "Volatility 100 Index", []]])
+            await ws.send(json.dumps(reply))
+        elif "active_symbols" in request:
+            reply.update(msg_type="active_symbols", active_symbols=[
+                {"symbol": "frx" + a.replace("_otc", ""), "display_name": a[:3] + "/" + a[3:6], "exchange_is_open": 1}
+                for a in ASSETS
+            ])
+            await ws.send(json.dumps(reply))
+        elif "ping" in request:
+            reply.update(msg_type="ping", ping="pong")
+            await ws.send(json.dumps(reply))
+        elif "time" in request:
+            reply.update(msg_type="time", time=int(time.time()))
+            await ws.send(json.dumps(reply))
+        elif "proposal_open_contract" in request and request.get("contract_id"):
+            reply.update(msg_type="proposal_open_contract",
+                         proposal_open_contract=self._contracts.get(request["contract_id"], {}))
+            await ws.send(json.dumps(reply))
+        elif "proposal_open_contract" in request or "transaction" in request:
+            msg_type = "transaction" if "transaction" in request else "proposal_open_contract"
+            self._masters.add(ws)
+            self._subscribers.setdefault(ws, {})[msg_type] = request
+            reply.update({"msg_type": msg_type, msg_type: {}, "subscription": {"id": f"sim-{msg_type}"}})
+            await ws.send(json.dumps(reply))
+        elif "proposal" in request:
+            if request.get("subscribe"):
+                stream_id = f"s{next(self._ids)}"
+                self._streams[stream_id] = asyncio.ensure_future(self._stream(ws, reply, stream_id))
+                return
+            proposal_id = f"p{next(self._ids)}"
+            self._proposals[proposal_id] = request
+            reply.update(msg_type="proposal", proposal={"id": proposal_id, "ask_price": request["amount"]})
+            self._later(ws.send(json.dumps(reply)))
+        elif "forget" in request:
+            task = self._streams.pop(request["forget"], None)
+            if task is not None:
+                task.cancel()
+            reply.update(msg_type="forget", forget=int(task is not None))
+            await ws.send(json.dumps(reply))
+        elif "buy" in request:
+            if str(request["buy"]) == "1":
+                proposal = request.get("parameters", {})
+            elif request["buy"] in self._proposals:
+                proposal = self._proposals.pop(request["buy"])
+                # Buying a streamed proposal ends its subscription
+                task = self._streams.pop(proposal.get("stream_id", ""), None)
+                if task is not None:
+                    task.cancel()
+            else:
+                reply.update(msg_type="buy", error={"code": "InvalidContractProposal", "message": "Proposal expired"})
+                self._later(ws.send(json.dumps(reply)))
+                return
+            self.orders += 1
+            now = int(time.time())
+            reply.update(msg_type="buy", buy={
+                "contract_id": next(self._ids), "buy_price": request.get("price"),
+                "start_time": now, "purchase_time": now, "shortcode": proposal.get("symbol", ""),
+            })
+            self._later(ws.send(json.dumps(reply)))
+
+    async def _stream(self, ws, reply: Dict[str, Any], stream_id: str):
+        request = dict(reply["echo_req"], stream_id=stream_id)
+        proposal_id = None
+        try:
+            await asyncio.sleep(self.ack_delay)
+            while True:
+                self._proposals.pop(proposal_id, None)
+                proposal_id = f"p{next(self._ids)}"
+                self._proposals[proposal_id] = request
+                reply.update(msg_type="proposal", subscription={"id": stream_id},
+                             proposal={"id": proposal_id, "ask_price": request["amount"]})
+                await ws.send(json.dumps(reply))
+                await asyncio.sleep(self.requote)
+        except websockets.ConnectionClosed:
+            self._streams.pop(stream_id, None)
+        finally:
+            if self._proposals.get(proposal_id) is request and stream_id not in self._streams:
+                self._proposals.pop(proposal_id, None)
+
+    async def inject(self, trade: Dict[str, Any]):
+        now = time.time()
+        contract = {
+            "contract_id": next(self._ids),
+            "underlying": "frx" + trade["asset"].replace("_otc", ""),
+            "display_name": trade["asset"],
+            "buy_price": trade["amount"],
+            "contract_type": trade["action"].upper(),
+            "date_start": int(now),
+            "purchase_time": now,
+            "date_expiry": int(now) + int(trade["time"]),
+        }
+        self._contracts[contract["contract_id"]] = contract
+        transaction = {
+            "action": "buy", "amount": -contract["buy_price"], "contract_id": contract["contract_id"],
+            "symbol": contract["underlying"], "transaction_id": next(self._ids), "transaction_time": int(now),
+        }
+        for ws in list(self._masters):
+            subscriptions = self._subscribers.get(ws, {})
+            try:
+                for msg_type, body in (("transaction", transaction), ("proposal_open_contract", contract)):
+                    if msg_type in subscriptions:
+                        await ws.send(json.dumps({
+                            "msg_type": msg_type, msg_type: body, "echo_req": subscriptions[msg_type],
+                            "req_id": subscriptions[msg_type].get("req_id"),
+                            "subscription": {"id": f"sim-{msg_type}"},
+                        }))
+            except websockets.ConnectionClosed:
+                self._masters.discard(ws)
+                self._subscribers.pop(ws, None)
+
+
+class IQOptionSim(SimBroker):
+    """IQ Option {"name", "msg", "request_id"} envelopes"""
+
+    name = "iqoption"
+
+    async def on_message(self, ws, message):
+        request = json.loads(message)
+        name = request.get("name")
+        if name == "ssid":
+            await ws.send(json.dumps({"name": "profile", "msg": {"balance_id": 1}}))
+            if request.get("master"):
+                self._masters.add(ws)
+        elif name == "sendMessage" and request["msg"].get("name") == "binary-options.open-option":
+            self.orders += 1
+            reply = {"name": "option", "request_id": request.get("request_id"), "status": 0,
+                     "msg": {"id": next(self._ids)}}
+            self._later(ws.send(json.dumps(reply)))
+
+    async def inject(self, trade: Dict[str, Any]):
+        now = time.time()
+        msg = {
+            "id": next(self._ids),
+            "active": trade["asset"].replace("_otc", "-OTC"),
+            "dir": trade["action"],
+            "created": int(now),
+            "created_millisecond": int(now * 1000),
+            "expired": int(now) + int(trade["time"]),
+            "profit_amount": trade["amount"],
+            "type_name": "blitz" if int(trade["time"]) <= 300 else "turbo",
+        }
+        await self._broadcast(json.dumps({"name": "socket-option-opened", "msg": msg}))
+
+
+SIMULATORS = {cls.name: cls for cls in (PocketOptionSim, QuotexSim, DerivSim, IQOptionSim)}
+
+
+def synthetic_trade(rng: random.Random, duration: Optional[int] = None) -> Dict[str, Any]:
+    """A random master trade in the openOrder payload shape"""
+    return {
+        "asset": rng.choice(ASSETS),
+        "amount": float(rng.choice((1, 2, 5, 10))),
+        "action": rng.choice(("call", "put")),
+        "time": duration or rng.choice((5, 10, 60)),
+    }
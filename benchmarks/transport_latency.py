@@ -0,0 +1,219 @@
+"""
+Master -> client signal propagation latency per transport
+
+Publishes signals from one process and receives them in another over
+orders.log (inotify tail), the socket bus and the shared-memory ring, then
+prints latency percentiles for each.
+
+    python benchmarks/transport_latency.py --count 1000 --interval 0.005
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from copytrade import (  # noqa: E402
+    Signal,
+    SignalBus,
+    SignalPublisher,
+    SignalReader,
+    SignalSubscriber,
+    ShmRingReader,
+    ShmRingWriter,
+    encode,
+)
+
+
+def make_signal(i: int) -> Signal:
+    return Signal(
+        stamp=0.0,
+        id=str(10_000_000_000 + i),
+        broker="bench",
+        asset="EURUSD_otc",
+        amount=1.0,
+        direction="call" if i % 2 else "put",
+        duration=60,
+    )
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1]}
+
+
+# --- writers (run in a child process) ----------------------------------------
+
+
+def write_file(path: str, count: int, interval: float, ready):
+    ready.wait()
+    with open(path, "ab", buffering=0) as f:
+        for i in range(count):
+            signal = make_signal(i)
+            signal.stamp = time.time()
+            f.write(encode(signal))
+            time.sleep(interval)
+
+
+def write_bus(socket_path: str, count: int, interval: float, ready):
+    publisher = SignalPublisher(socket_path=socket_path, fallback_path=None)
+    ready.wait()
+    for i in range(count):
+        signal = make_signal(i)
+        signal.stamp = time.time()
+        publisher.publish(signal)
+        time.sleep(interval)
+    publisher.close()
+
+
+def write_shm(broker: str, count: int, interval: float, ready):
+    ring = ShmRingWriter(broker)
+    ready.wait()
+    for i in range(count):
+        signal = make_signal(i)
+        signal.stamp = time.time()
+        ring.publish(signal)
+        time.sleep(interval)
+    ring.close()
+
+
+def run_bus(socket_path: str):
+    asyncio.run(SignalBus(socket_path=socket_path, audit_path=None).serve_forever())
+
+
+# --- readers (run in this process) -------------------------------------------
+
+
+async def read_async(source, count: int, ready) -> List[float]:
+    latencies = []
+    ready.set()
+    while len(latencies) < count:
+        signals = await source.poll(2.0)
+        now = time.time()
+        if not signals:
+            break
+        latencies.extend(now - s.stamp for s in signals)
+    return latencies
+
+
+def bench_file(workdir: str, count: int, interval: float) -> List[float]:
+    path = os.path.join(workdir, "orders.log")
+    open(path, "wb").close()
+    ready = mp.Event()
+    writer = mp.Process(target=write_file, args=(path, count, interval, ready))
+    writer.start()
+    reader = SignalReader(path)
+    latencies = asyncio.run(read_async(reader, count, ready))
+    writer.join()
+    reader.close()
+    return latencies
+
+
+def bench_bus(workdir: str, count: int, interval: float) -> List[float]:
+    socket_path = os.path.join(workdir, "bench.sock")
+    bus = mp.Process(target=run_bus, args=(socket_path,), daemon=True)
+    bus.start()
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+    ready = mp.Event()
+    writer = mp.Process(target=write_bus, args=(socket_path, count, interval, ready))
+    writer.start()
+
+    async def main():
+        subscriber = SignalSubscriber(socket_path=socket_path)
+        await subscriber.connect()
+        try:
+            return await read_async(subscriber, count, ready)
+        finally:
+            await subscriber.close()
+
+    latencies = asyncio.run(main())
+    writer.join()
+    bus.terminate()
+    return latencies
+
+
+def bench_shm(count: int, interval: float, spin: bool) -> List[float]:
+    broker = f"bench_{os.getpid()}"
+    ring = ShmRingWriter(broker)  # create up front so the reader can attach
+    ready = mp.Event()
+    writer = mp.Process(target=write_shm, args=(broker, count, interval, ready))
+    writer.start()
+    reader = ShmRingReader([broker])
+    reader.read()
+    latencies: List[float] = []
+    if spin:
+        ready.set()
+        while len(latencies) < count:
+            signals = reader.wait_blocking(2.0)
+            now = time.time()
+            if not signals:
+                break
+            latencies.extend(now - s.stamp for s in signals)
+    else:
+        latencies = asyncio.run(read_async(reader, count, ready))
+    writer.join()
+    reader.close()
+    ring.unlink()
+    ring.close()
+    return latencies
+
+
+def bench_shm_inprocess(count: int) -> List[float]:
+    """Publish + read cost of the ring without any scheduling in between"""
+    broker = f"bench_inproc_{os.getpid()}"
+    ring = ShmRingWriter(broker)
+    reader = ShmRingReader([broker])
+    reader.read()
+    latencies = []
+    for i in range(count):
+        signal = make_signal(i)
+        start = time.perf_counter()
+        ring.publish(signal)
+        reader.read()
+        latencies.append(time.perf_counter() - start)
+    reader.close()
+    ring.unlink()
+    ring.close()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=500, help="Signals per transport")
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between signals")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        results["orders.log (inotify)"] = bench_file(workdir, args.count, args.interval)
+        if hasattr(asyncio, "start_unix_server"):
+            results["socket bus"] = bench_bus(workdir, args.count, args.interval)
+    results["shm ring (asyncio poll)"] = bench_shm(args.count, args.interval, spin=False)
+    results["shm ring (busy wait)"] = bench_shm(args.count, args.interval, spin=True)
+    results["shm ring (in-process)"] = bench_shm_inprocess(args.count)
+
+    print(f"{'transport':<26}{'n':>6}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'max us':>10}")
+    for name, samples in results.items():
+        if not samples:
+            print(f"{name:<26}{0:>6}   no signals received")
+            continue
+        p = percentiles(samples)
+        print(
+            f"{name:<26}{len(samples):>6}"
+            f"{p['p50'] * 1e6:>10.1f}{p['p95'] * 1e6:>10.1f}{p['p99'] * 1e6:>10.1f}{p['max'] * 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
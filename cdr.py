@@ -3,101 +3,82 @@ import asyncio
 import os
 from deriv_api import DerivAPI
 from deriv_api import APIError
+from copytrade import AdmissionController, DerivAssetResolver, DerivSessionPool, LatencyTracker, OrderExecutor, SeenIds, mark, open_signal_source, symbol_table, time_sync
+from copytrade.deriv import BUY_DIRECT, BUY_STREAM, DerivProposalStreams, buy_contract, contract_parameters
+from copytrade.timesync import SYNC_INTERVAL
 import time
 from datetime import datetime
-import re
-import threading
 
+latency = LatencyTracker("cdr", dump_path="settings/latency/cdr.json")
+clock = time_sync()
+# proposal, direct or stream (see copytrade.deriv)
+BUY_MODE = os.environ.get("DERIV_BUY_MODE", BUY_DIRECT)
+# Orders placed at once; more wait for a free slot
+MAX_CONCURRENT = int(os.environ.get("DERIV_MAX_CONCURRENT", 8))
 
-async def buy(api , symbol:str = "R_100",amount:int  = 1,direction:str = "CALL", duration:int = 60):
-    # Get proposal
-    proposal = await api.proposal({"proposal": 1, "amount": amount, "basis": "stake",
-                                   "contract_type": direction, "currency": "USD", "duration": duration, "duration_unit": "s",
-                                   "symbol": symbol
-                                   })
-    #print(proposal)
-   
 
-    # Buy
-    response = await api.buy({"buy": proposal.get('proposal').get('id'), "price": amount})
+async def buy(api , symbol:str = "R_100",amount:int  = 1,direction:str = "CALL", duration:int = 60, mode:str = BUY_DIRECT):
+    # "direct" buys with parameters in one request, "proposal" asks for a proposal first
+    response = await buy_contract(api, contract_parameters(symbol, amount, direction, duration), mode)
     #print(response)
 
-    if response.get('buy').get('contract_id') :
-        return response.get('buy').get('contract_id'),True
+    if response.get('contract_id') :
+        return response.get('contract_id'),True
     else:
         return None,False
 
     #await asyncio.sleep(300)
 
-def read_orders_from_file(file_path):
-    """Reads orders from the log file and extracts relevant information."""
+def read_orders_from_signals(signals):
+    """Converts signals received from the masters into orders."""
     orders = []
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            match = re.search(
-                r"Stamp: (\d+\.?\d*) ID: (\d+\.?\d*) Asset: ([\w-]+) Amount: (\d+\.?\d*) Direction: (\w+) Duration: (\d+\.?\d*)",
-                line,
-            )
-            if match:
-                stamp, id, asset, amount, direction, duration = match.groups()
-                orders.append({
-                    "Stamp": float(stamp),
-                    "ID": int(id),
-                    "asset": asset,
-                    "amount": float(amount),
-                    "direction": "CALL" if direction.lower() == "call" else "PUT",
-                    "duration": int(float(duration))
-                })
+    for signal in signals:
+        mark(signal, "receive")
+        direction = signal.direction
+        orders.append({
+            "Stamp": signal.stamp,
+            "ID": signal.id,
+            "asset": signal.asset,
+            "amount": signal.amount,
+            "direction": "CALL" if direction == "call" else "PUT",
+            "duration": signal.duration,
+            "signal": signal
+        })
     return orders
 
-async def execute_order(client, order):
-    """Executes a single order using the provided client."""
-    apip = DerivAPI(app_id=client[0])
-    authorize = await apip.authorize(client[1])
-
+async def execute_order(pool, assets, order, streams=None):
+    """Executes a single order on a session leased from the pool (or on a live proposal); errors are collected by the executor."""
     Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Client]Deriv: ")
-    assets = await apip.cache.asset_index({"asset_index": 1})
-    for asset in assets['asset_index']:
-        #print(f"Asset: {asset[1]} - {asset[0]}")
-        if str(order["asset"]) in str(asset[0]):
-            print(f"Found {order['asset']} asset: {asset[0]}")
-            nw_asset = str(asset[0])
-            pk = True
-            break
-        else:
-            pk = False
-    if pk == False:
-            print(f"Asset {order['asset']} not found in asset index, skipping order execution.")
-            return
-
-    try:
-        print(str(Timen) + f" New Order Placing: {order['ID']}")
-        order_result = await buy(apip,
-            symbol=nw_asset,
-            amount=order["amount"],
-            direction=str(order["direction"]).upper(),
-            duration=order["duration"],
-        )
-        #print(str(Timen) + f" Order result: {order_result.order_id}")
-
-        # Optionally, check the order result
-        if order_result[0] and order_result[1] == True:  # Replace "error" with the actual error status if different
-            print(str(Timen) + f" Order placed successfully: {order_result[0]}")
-        else:
-            print(str(Timen) + f" Failed to place order")
-
-    except Exception as e:
-        print(str(Timen) + f" Error executing order: {e}")
-
-def execute_order_thread_target(loop, client, order):
-    """Schedules execute_order to run on the main event loop from a separate thread."""
-    try:
-        # Schedule the coroutine to be executed in the event loop
-        future = asyncio.run_coroutine_threadsafe(execute_order(client, order), loop)
-        # Wait for the coroutine to finish. A timeout is a good idea.
-        future.result(timeout=60)
-    except Exception as e:
-        print(f"Error in thread for order {order.get('ID', 'N/A')}: {e}")
+    nw_asset = assets.resolve(str(order["asset"]))
+    if nw_asset is None:
+        raise LookupError(f"Asset {order['asset']} not found in asset index, skipping order execution.")
+
+    print(str(Timen) + f" New Order Placing: {order['ID']} on {nw_asset}")
+    mark(order["signal"], "send")
+    if streams is not None:
+        bought, via = await streams.buy(contract_parameters(
+            nw_asset, order["amount"], str(order["direction"]).upper(), order["duration"]))
+        order_result = (bought.get("contract_id"), bool(bought.get("contract_id")))
+    else:
+        async with pool.lease() as apip:
+            order_result = await buy(apip,
+                symbol=nw_asset,
+                amount=order["amount"],
+                direction=str(order["direction"]).upper(),
+                duration=order["duration"],
+                mode=BUY_MODE,
+            )
+        via = BUY_MODE
+    mark(order["signal"], "ack")
+    order["signal"].extra["via"] = via
+    #print(str(Timen) + f" Order result: {order_result.order_id}")
+
+    # Optionally, check the order result
+    if order_result[0] and order_result[1] == True:  # Replace "error" with the actual error status if different
+        latency.record(order["signal"], "deriv")
+        print(str(Timen) + f" Order placed successfully: {order_result[0]}")
+        return order_result[0]
+    raise RuntimeError("Failed to place order")
 
 async def main():
             
@@ -117,12 +98,17 @@ async def main():
         return
 
     app_id = 1089
-    paka = [app_id,token]
 
     if len(token) == 0:
         sys.exit("DERIV_TOKEN environment variable is not set")
 
     api = DerivAPI(app_id=app_id)
+    # Orders lease these already authorized sessions instead of connecting per order
+    pool = DerivSessionPool(token, size=3, app_id=app_id)
+    assets = DerivAssetResolver(pool)
+    streams = DerivProposalStreams(token, app_id=app_id) if BUY_MODE == BUY_STREAM else None
+    # Orders run as tasks on this loop instead of a thread per order, within the broker's rate limit
+    executor = OrderExecutor(max_concurrent=MAX_CONCURRENT, deadline=60, admission=AdmissionController.for_broker("deriv"))
 
     try:
         #logger.info("Connecting to Deriv...")
@@ -136,48 +122,61 @@ async def main():
             # Wait for authentication and balance
             await asyncio.sleep(1)
 
-            active_symbols = await api.active_symbols({"active_symbols": "brief", "product_type": "basic"})
-    
             # Get Balance
             response = await api.balance()
             response = response['balance']
             currency = response['currency']
             print(str(Timen) + " Your current balance is " + str(currency) + " " + str( response['balance']) )
-            
-            # Get the current event loop to pass to threads
-            main_event_loop = asyncio.get_running_loop()
 
-            ListOrder = []
+            await pool.start()
+            print(str(Timen) + f" {len(pool.sessions)} order sessions ready")
+            await assets.start()
+            print(str(Timen) + f" {len(assets)} Deriv symbols indexed")
+            symbol_table().update("deriv", assets.open, save=True)
+            if streams is not None:
+                await streams.start()
+            print(str(Timen) + f" Buying contracts via {BUY_MODE}")
+
+
+            source = await open_signal_source("cdr")
+            ListOrder = SeenIds(ttl=60, snapshot_path="settings/seen/cdr.json")
             cnt = 0
+            next_sync = 0.0
             while True:
                 Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Client]Deriv: ")
                 print("" + str(Timen) + " 📊 Checking active orders to Read...")
-                # Read orders from file
-                orders = read_orders_from_file("orders.log")
+                # Write the seen-ID snapshot if the last burst left it behind
+                ListOrder.flush()
+                # Wait for new orders from the masters
+                orders = read_orders_from_signals(await source.poll(0.5))
+                report = latency.maybe_report()
+                if report:
+                    print(str(Timen) + " " + report)
                 #print(f"Orders from file: {orders}")
                 #await asyncio.sleep(20)
 
-                # Execute orders as threads
-                threads = []
-                now = datetime.now().timestamp()
-                
+                # Report orders that failed or ran past their deadline since the last poll
+                for outcome in executor.drain():
+                    if not outcome.ok:
+                        print(str(Timen) + " " + outcome.describe())
+
+                # Keep the Deriv server clock offset current
+                if time.monotonic() >= next_sync:
+                    next_sync = time.monotonic() + SYNC_INTERVAL
+                    try:
+                        await asyncio.wait_for(clock.sync_deriv(api), 10)
+                    except Exception as e:
+                        print(str(Timen) + f" Time sync failed: {e}")
+
+                # Execute orders as tasks, while the master's trade has enough time left on the server clock
                 for order in orders:
-                    if (order["ID"] not in ListOrder) and ((now - int(order["Stamp"])) < 15 ):
-                        ListOrder.append(order["ID"])
-                        thread = threading.Thread(
-                            target=execute_order_thread_target,
-                            args=(main_event_loop, paka, order)
+                    if not clock.fresh(order["signal"], "deriv"):
+                        print(str(Timen) + f" Order {order['ID']} too close to expiry, skipping")
+                    elif ListOrder.add(order["ID"], expires_at=order["signal"].expiry):
+                        executor.submit(
+                            order["ID"], lambda order=order: execute_order(pool, assets, order, streams),
+                            not_after=clock.deadline(order["signal"], "deriv"), signal=order["signal"],
                         )
-                        threads.append(thread)
-                        thread.start()
-                    else:
-                        continue
-    
-                # Wait for all tasks to complete
-                #for thread in threads:
-                    #thread.join()
-                
-                await asyncio.sleep( 0.5 )  # Use asyncio.sleep in an async function
         else:
             print(str(Timen) + " ❌ Authorization failed. Please check your API token.")
             exit()
@@ -189,6 +188,11 @@ async def main():
         print(f"Connection error: {e}")
 
     finally:
+        await executor.close()
+        if streams is not None:
+            await streams.close()
+        await assets.close()
+        await pool.close()
         await api.clear()
         print("Disconnected")
 
@@ -1,55 +1,66 @@
 from iqoptionapi.stable_api import IQ_Option
+from copytrade import UNMAPPABLE, AdmissionController, IQOrderPool, LatencyTracker, SeenIds, mark, open_signal_source, symbol_table, time_sync
 from datetime import datetime
 import asyncio
 from loguru import logger
-import re
-import threading
+import queue
 import sys
 
+latency = LatencyTracker("ciq", dump_path="settings/latency/ciq.json")
+symbols = symbol_table()
+clock = time_sync()
+# Orders placed at once, and orders allowed to wait for a worker before new ones are refused
+WORKERS = 4
+QUEUE_SIZE = 32
 
 
-def read_orders_from_file(file_path):
-    """Reads orders from the log file and extracts relevant information."""
+def read_orders_from_signals(signals):
+    """Converts signals received from the masters into orders."""
     orders = []
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            match = re.search(
-                r"Stamp: (\d+\.?\d*) ID: (\d+\.?\d*) Asset: ([\w-]+) Amount: (\d+\.?\d*) Direction: (\w+) Duration: (\d+\.?\d*)",
-                line,
-            )
-            if match:
-                stamp, id, asset, amount, direction, duration = match.groups()
-                orders.append({
-                    "Stamp": float(stamp),
-                    "ID": int(id),
-                    "asset": asset,
-                    "amount": float(amount),
-                    "direction": direction.lower(),
-                    "duration": int(float(duration))
-                })
+    for signal in signals:
+        mark(signal, "receive")
+        asset = symbols.translate(signal.asset, "iqoption")
+        if asset == UNMAPPABLE:
+            print(f"Asset {signal.asset} is not listed on IQ Option, skipping {signal.id}")
+            continue
+        direction = signal.direction
+        orders.append({
+            "Stamp": signal.stamp,
+            "ID": signal.id,
+            "asset": asset,
+            "amount": signal.amount,
+            "direction": direction,
+            "duration": signal.duration,
+            "signal": signal
+        })
     return orders
 
-def execute_order(client, order):
-    """Executes a single order using the provided client."""
+def execute_order(pool, order):
+    """Queues a single order on the worker pool; returns False if the queue is full."""
     Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Client]Iqoption: ")
     try:
-        print(str(Timen) + f" New Order Placing: {order['ID']}")
-        if order["duration"] > 300:
-            order["duration"] = order["duration"] / 60  # Convert duration from seconds to minutes if needed
-            order["asset"] = order["asset"].replace("_otc", "-OTC")
-            order_result, order_id = client.buy(order["amount"],order["asset"], order["direction"], order["duration"])
-        else:
-            order["asset"] = order["asset"].replace("_otc", "-OTC")
-            order_result, order_id = client.buy_blitz(order["asset"], order["amount"], order["direction"], order["duration"])
-
-        # Optionally, check the order result
-        if order_result != False:  # Replace "error" with the actual error status if different
-            print(str(Timen) + f" Order placed successfully: {order_id}")
-        else:
-            print(str(Timen) + f" Failed to place order: {order_id if order_id else 'Unknown error'}")
-
-    except Exception as e:
-        print(str(Timen) + f"Error executing order: {e}")
+        # Durations over 300 s are bought as turbo/binary options, shorter ones as blitz
+        slot = pool.submit(order["asset"], order["amount"], order["direction"], order["duration"], signal=order["signal"])
+    except queue.Full:
+        print(str(Timen) + f" {pool.queue.qsize()} orders waiting, skipping {order['ID']}")
+        return False
+    print(str(Timen) + f" New Order Placing: {order['ID']} ({slot.request_id})")
+    slot.add_done_callback(lambda slot: report_order(order, slot))
+    return True
+
+
+def report_order(order, slot):
+    """Prints the outcome of an order (runs on the worker thread that placed it)."""
+    Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Client]Iqoption: ")
+    if slot.cancelled():
+        print(str(Timen) + f" Order {order['ID']} cancelled")
+        return
+    order_result, order_id = slot.result()
+    if order_result:
+        latency.record(order["signal"], "iqoption")
+        print(str(Timen) + f" Order placed successfully: {order_id}")
+    else:
+        print(str(Timen) + f" Failed to place order: {order_id if order_id else 'Unknown error'}")
 
 
 async def main():
@@ -72,6 +83,8 @@ async def main():
 
     
     api = IQ_Option(email, password)
+    # Orders wait for IQ Option's rate limit, nearest expiry first, before reaching a worker
+    pool = IQOrderPool(api, workers=WORKERS, queue_size=QUEUE_SIZE, admission=AdmissionController.for_broker("iqoption"))
 
     try:
         #logger.info("Connecting to PocketOption...")
@@ -98,13 +111,20 @@ async def main():
             # Test placing an order (this should now work without the order_id error)
             #logger.info("esting order placement...")
 
-            ListOrder = []
+            pool.start()
+            source = await open_signal_source("ciq")
+            ListOrder = SeenIds(ttl=60, snapshot_path="settings/seen/ciq.json")
             cnt = 0
             while True:
                 Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Client]Iqoption: ")
                 print("" + str(Timen) + " 📊 Checking active orders to Read...")
-                # Read orders from file
-                orders = read_orders_from_file("orders.log")
+                # Write the seen-ID snapshot if the last burst left it behind
+                ListOrder.flush()
+                # Wait for new orders from the masters
+                orders = read_orders_from_signals(await source.poll(0.5))
+                report = latency.maybe_report()
+                if report:
+                    print(str(Timen) + " " + report)
                 #print(f"Orders from file: {orders}")
                 #await asyncio.sleep(20)
 
@@ -133,31 +153,21 @@ async def main():
                     print(str(Timen) + " You Are Still connected !")
                     #time.sleep(0.5)  # Wait for a second to ensure reconnection is established
             
-                # Execute orders as threads
-                threads = []
-                now = datetime.now().timestamp()
+                # Hand orders to the worker pool, while the master's trade has enough time left on the server clock
+                clock.sync_iqoption(api.api)
                 
                 for order in orders:
-                    if (order["ID"] not in ListOrder) and ((now - int(order["Stamp"])) < 15 ):
-                        ListOrder.append(order["ID"])
-                        thread = threading.Thread(target=execute_order, args=(api, order))
-                        threads.append(thread)
-                        thread.start()
-                    else:
-                        continue
-    
-                # Wait for all tasks to complete
-                #for thread in threads:
-                    #thread.join()
-                threads = []
-                
-                await asyncio.sleep( 0.5 )  # Use asyncio.sleep in an async function
+                    if not clock.fresh(order["signal"], "iqoption"):
+                        print(str(Timen) + f" Order {order['ID']} too close to expiry, skipping")
+                    elif ListOrder.add(order["ID"], expires_at=order["signal"].expiry):
+                        execute_order(pool, order)
                 
     except Exception as e:
         #logger.error(f"Connection error: {e}")
         print(f"Connection error: {e}")
 
     finally:
+        pool.close()
         api.logout()
         logger.info("Disconnected")
 
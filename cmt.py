@@ -1,14 +1,17 @@
 import MetaTrader5 as mt5
+import argparse
+import multiprocessing
 import time
 import os
 import json
 
-# Clear screen and set title
-os.system('cls')
-os.system('title CopyTrading')
+from copytrade.mt5 import run_follower, run_master
 
 # Account credentials
 file_path = "settings/cmtaccounts.json"
+# Terminals, unless an account in cmtaccounts.json names its own "path"
+PATH_1 = "D:\\trd\\MetaTrader5\\ex1\\terminal64.exe"
+PATH_2 = "D:\\trd\\MetaTrader5\\ex2\\terminal64.exe"
 default_data = {
     "account_1": {
         "login": 0,
@@ -22,18 +25,17 @@ default_data = {
     }
 }
 
-if not os.path.exists(file_path):
-    with open(file_path, 'w') as json_file:
-        json.dump(default_data, json_file, indent=4)
-    print(f"{file_path} created.\n\nPlease enter the accounts' credentials!")
-    exit()
-else:
-    with open(file_path, 'r') as json_file:
-        data = json.load(json_file)
-    print(f"Data loaded from {file_path}")
-
-account_1 = data["account_1"]
-account_2 = data["account_2"]
+def load_accounts():
+    if not os.path.exists(file_path):
+        with open(file_path, 'w') as json_file:
+            json.dump(default_data, json_file, indent=4)
+        print(f"{file_path} created.\n\nPlease enter the accounts' credentials!")
+        exit()
+    else:
+        with open(file_path, 'r') as json_file:
+            data = json.load(json_file)
+        print(f"Data loaded from {file_path}")
+    return data["account_1"], data["account_2"]
 
 # Login to MetaTrader 5 account
 def login_to_mt5_account(account,path):
@@ -46,11 +48,11 @@ def login_to_mt5_account(account,path):
     print(f"Connected to account {account['login']}")
     return True
 
-# Monitor trades on first account
+# Monitor trades on first account, switching the one terminal connection to account 2 for every copy
 def monitor_trades(account_1, account_2):
     # Login to the first account
-    path1="D:\\trd\\MetaTrader5\\ex1\\terminal64.exe"
-    path2="D:\\trd\\MetaTrader5\\ex2\\terminal64.exe"
+    path1 = account_1.get("path", PATH_1)
+    path2 = account_2.get("path", PATH_2)
 
     if not login_to_mt5_account(account_1, path1):
         return
@@ -64,8 +66,8 @@ def monitor_trades(account_1, account_2):
 
     while True:
         # Get current trades
-        current_trades_account_1 = mt5.positions_get()
-        current_trade_ids_account_1 = {trade.ticket for trade in current_trades_account_1}
+        current_trades_account_1 = {trade.ticket: trade for trade in mt5.positions_get()}
+        current_trade_ids_account_1 = current_trades_account_1.keys()
         #print(f"Current trades on account 1: {len(current_trades_account_1)}")
 
         # Determine new trades by removing initial trades from the current trades
@@ -74,7 +76,7 @@ def monitor_trades(account_1, account_2):
 
         # Iterate through new trades and check conditions
         for trade_id in new_trade_ids:
-            trade = next((trade for trade in current_trades_account_1 if trade.ticket == trade_id), None)
+            trade = current_trades_account_1.get(trade_id)
             #print(trade)
             if trade:
                 if trade_id not in copied_trades and trade.sl != 0 and trade.tp != 0:
@@ -176,5 +178,39 @@ def close_trade_on_account_2(trade_id):
     print(f"Trade {trade_id} not found on account 2")
     return None
 
+# One process per terminal: account 1 is watched without pause, account 2 stays logged in
+def mirror_trades(account_1, account_2):
+    events = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    master = multiprocessing.Process(
+        target=run_master, args=(account_1, account_1.get("path", PATH_1), events),
+        kwargs={"stop": stop}, name="account-1",
+    )
+    follower = multiprocessing.Process(
+        target=run_follower, args=(account_2, account_2.get("path", PATH_2), events), name="account-2",
+    )
+    follower.start()
+    master.start()
+    try:
+        master.join()
+    except KeyboardInterrupt:
+        stop.set()
+        master.join()
+    # Let account 2 finish what account 1 already queued
+    events.put(None)
+    follower.join()
+
 if __name__ == "__main__":
-    monitor_trades(account_1, account_2)
+    parser = argparse.ArgumentParser(description="Copy MT5 positions from account 1 to account 2")
+    parser.add_argument("--relogin", action="store_true",
+                        help="Single process switching one terminal between the accounts (the old mode)")
+    args = parser.parse_args()
+
+    # Clear screen and set title
+    os.system('cls')
+    os.system('title CopyTrading')
+    account_1, account_2 = load_accounts()
+    if args.relogin:
+        monitor_trades(account_1, account_2)
+    else:
+        mirror_trades(account_1, account_2)
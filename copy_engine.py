@@ -0,0 +1,51 @@
+"""
+Single-process copy engine: every master and follower account in one event loop
+
+    py -3.8 copy_engine.py --config settings/engine.json
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from copytrade import CopyEngine, load_config
+from copytrade.engine import DEFAULT_CONFIG_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="Engine config (masters and followers)")
+    parser.add_argument("--verbose", action="store_true", help="Log SDK debug output too")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s [Engine]%(name)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"❌ Invalid engine config {args.config}: {e}")
+        sys.exit(1)
+    if not config["followers"]:
+        print(f"❌ {args.config} must list at least one follower")
+        sys.exit(1)
+
+    engine = CopyEngine.from_config(config)
+    if engine.masters:
+        print(f"Copying {len(engine.masters)} master(s) to {len(engine.followers)} follower(s)")
+    else:
+        print(f"Copying signals from the standalone masters to {len(engine.followers)} follower(s)")
+    asyncio.run(engine.run())
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n✅ Program terminated by user.")
+        sys.exit(0)
+    except ConnectionError as e:
+        print(f"❌ Connection failed: {e}")
+        sys.exit(1)
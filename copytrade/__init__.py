@@ -0,0 +1,68 @@
+"""
+Shared signal plumbing for the copy-trade masters and clients
+"""
+
+from .signals import (
+    SCHEMA_VERSION,
+    Signal,
+    encode,
+    decode,
+    decode_line,
+)
+from .reader import SignalReader
+from .journal import SignalJournal
+from .dedup import SeenIds
+from .watcher import FileWatcher
+from .shm import ShmRingReader, ShmRingWriter
+from .bus import (
+    SignalBus,
+    SignalPublisher,
+    SignalSubscriber,
+    open_signal_source,
+)
+from .latency import LatencyTracker, mark
+from .admission import AdmissionController, AdmissionExpired
+from .fanout import FanOutDispatcher
+from .deriv import DerivAssetResolver, DerivContractFeed, DerivSessionPool
+from .executor import OrderExecutor, OrderOutcome
+from .iqoption import IQOrderPool
+from .symbols import UNMAPPABLE, SymbolTable, canonical_asset, symbol_table
+from .timesync import TimeSyncService, time_sync
+from .engine import CopyEngine, load_config
+
+__all__ = [
+    "SCHEMA_VERSION",
+    "Signal",
+    "encode",
+    "decode",
+    "decode_line",
+    "SignalReader",
+    "SignalJournal",
+    "SeenIds",
+    "FileWatcher",
+    "ShmRingReader",
+    "ShmRingWriter",
+    "SignalBus",
+    "SignalPublisher",
+    "SignalSubscriber",
+    "open_signal_source",
+    "LatencyTracker",
+    "mark",
+    "AdmissionController",
+    "AdmissionExpired",
+    "FanOutDispatcher",
+    "DerivSessionPool",
+    "DerivAssetResolver",
+    "DerivContractFeed",
+    "OrderExecutor",
+    "OrderOutcome",
+    "IQOrderPool",
+    "UNMAPPABLE",
+    "SymbolTable",
+    "canonical_asset",
+    "symbol_table",
+    "TimeSyncService",
+    "time_sync",
+    "CopyEngine",
+    "load_config",
+]
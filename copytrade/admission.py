@@ -0,0 +1,230 @@
+"""
+Per-broker order admission
+
+Brokers throttle each account's order traffic. PocketOption's SDK states
+its limits in ``API_LIMITS``: 100 requests a minute and 10 orders open at
+once. The clients used to send a burst of copied signals as fast as their
+workers could go. Past the limit the broker refuses the orders or drops the
+session, so the trades of a busy minute were lost.
+
+``AdmissionController`` lets orders through a token bucket (``rate_limit``
+tokens a minute, refilled continuously, at most ``burst`` saved up) and a
+cap on orders in flight. An order that cannot go at once waits, and the
+waiting order with the nearest deadline goes first. An order whose deadline
+passes while it waits is refused with ``AdmissionExpired`` instead of being
+sent late. A burst is therefore spread out under the limit instead of
+failing at the broker::
+
+    admission = AdmissionController.for_broker("pocketoption")
+    async with admission.slot(time_sync().deadline(signal, "pocketoption")):
+        ...
+
+Callers stamp the ``admit`` latency stage when the slot is granted, so
+receive->admit is the time spent waiting for admission.
+
+Limits come from ``LIMITS`` (``DEFAULT_LIMITS`` for brokers that publish
+none) and can be overridden per account with the ``rate_limit`` (per
+minute), ``max_concurrent_orders`` and ``burst`` settings.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .latency import percentiles
+
+logger = logging.getLogger(__name__)
+
+# A guard for brokers without published limits, not a broker's own figure
+DEFAULT_LIMITS = {"rate_limit": 120, "max_concurrent_orders": 10}
+# PocketOption's figures as of the bundled SDK; its API_LIMITS wins when importable
+LIMITS: Dict[str, Dict[str, float]] = {
+    "pocketoption": {"rate_limit": 100, "max_concurrent_orders": 10},
+}
+WINDOW = 1024
+
+
+def broker_limits(broker: str) -> Dict[str, float]:
+    """
+    Order limits of a broker
+
+    Args:
+        broker: Broker name
+
+    Returns:
+        Dict: ``rate_limit`` (orders per minute) and ``max_concurrent_orders``
+    """
+    limits = dict(LIMITS.get(broker, DEFAULT_LIMITS))
+    if broker == "pocketoption":
+        try:
+            from pocketoptionapi_async.constants import API_LIMITS
+        except ImportError:
+            return limits
+        limits.update((k, API_LIMITS[k]) for k in limits if k in API_LIMITS)
+    return limits
+
+
+class AdmissionExpired(Exception):
+    """An order's deadline passed before it was admitted"""
+
+
+class AdmissionController:
+    """
+    Token bucket, in-flight cap and earliest-deadline-first queue for one account's orders.
+
+    Must be used from a single event loop.
+
+    Args:
+        broker: Broker name, for limits and log lines
+        rate_limit: Orders per minute (defaults to the broker's)
+        max_concurrent: Orders admitted and not yet released (defaults to the broker's)
+        burst: Tokens saved up while idle (defaults to ``max_concurrent``)
+    """
+
+    def __init__(self, broker: str, rate_limit: Optional[float] = None, max_concurrent: Optional[int] = None,
+                 burst: Optional[float] = None):
+        limits = broker_limits(broker)
+        self.broker = broker
+        self.rate_limit = float(rate_limit or limits["rate_limit"])
+        self.max_concurrent = int(max_concurrent or limits["max_concurrent_orders"])
+        if self.rate_limit <= 0 or self.max_concurrent < 1:
+            raise ValueError("rate_limit and max_concurrent must be positive")
+        self.capacity = max(1.0, float(burst or self.max_concurrent))
+        self.tokens = self.capacity
+        self.in_flight = 0
+        self.admitted = 0
+        self.expired = 0
+        self.waits: Deque[float] = deque(maxlen=WINDOW)
+        self._refilled = time.monotonic()
+        self._waiting: List[Tuple[float, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @classmethod
+    def for_broker(cls, broker: str, settings: Optional[Dict[str, Any]] = None) -> "AdmissionController":
+        """A controller with the broker's limits and an account's ``rate_limit``/``max_concurrent_orders``/``burst``"""
+        settings = settings or {}
+        return cls(broker, settings.get("rate_limit"), settings.get("max_concurrent_orders"), settings.get("burst"))
+
+    @property
+    def waiting(self) -> int:
+        """Orders waiting for admission"""
+        return sum(not future.done() for _, _, future in self._waiting)
+
+    async def admit(self, deadline: Optional[float] = None) -> float:
+        """
+        Wait for a token and a free slot; every admitted order must be released
+
+        Args:
+            deadline: Epoch seconds (local clock) by which the order must be
+                sent; None waits indefinitely behind orders that have one
+
+        Returns:
+            float: Seconds waited
+
+        Raises:
+            AdmissionExpired: If the deadline passed first
+        """
+        queued = time.time()
+        deadline = math.inf if deadline is None else deadline
+        if deadline <= queued:
+            self.expired += 1
+            raise AdmissionExpired(f"deadline passed {queued - deadline:.1f}s before the order was queued")
+        if not self._waiting and self._take():
+            return self._admitted(queued)
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiting, (deadline, next(self._order), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # Admitted just as the caller gave up: hand the slot on
+                self.release()
+            raise
+        return self._admitted(queued)
+
+    def release(self):
+        """Free an admitted order's slot"""
+        self.in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, deadline: Optional[float] = None):
+        """``admit()`` on entry and ``release()`` on exit; yields the seconds waited"""
+        waited = await self.admit(deadline)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def _admitted(self, queued: float) -> float:
+        waited = time.time() - queued
+        self.admitted += 1
+        self.waits.append(waited)
+        return waited
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._refilled) * self.rate_limit / 60.0)
+        self._refilled = now
+
+    def _take(self) -> bool:
+        """Spend a token and a slot if both are free"""
+        if self.in_flight >= self.max_concurrent:
+            return False
+        self._refill()
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        self.in_flight += 1
+        return True
+
+    def _dispatch(self):
+        """Admit waiting orders, nearest deadline first, and time the next pass"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.time()
+        while self._waiting:
+            deadline, _, future = self._waiting[0]
+            if future.done():
+                # The caller gave up (cancelled or timed out)
+                heapq.heappop(self._waiting)
+            elif deadline <= now:
+                heapq.heappop(self._waiting)
+                self.expired += 1
+                future.set_exception(AdmissionExpired(f"deadline passed while waiting for {self.broker} admission"))
+            elif self._take():
+                heapq.heappop(self._waiting)
+                future.set_result(None)
+            else:
+                break
+        if not self._waiting:
+            return
+        # Wake up for the next token (a released slot calls back itself) or the head's deadline
+        delay = self._waiting[0][0] - now
+        if self.in_flight < self.max_concurrent:
+            delay = min(delay, (1.0 - self.tokens) * 60.0 / self.rate_limit)
+        if delay < math.inf:
+            self._timer = asyncio.get_event_loop().call_later(max(0.0, delay), self._dispatch)
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = percentiles(self.waits, (0.50, 0.95)) if self.waits else (0.0, 0.0)
+        return {
+            "broker": self.broker,
+            "rate_limit": self.rate_limit,
+            "max_concurrent": self.max_concurrent,
+            "admitted": self.admitted,
+            "expired": self.expired,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "wait_p50": p50,
+            "wait_p95": p95,
+        }
@@ -0,0 +1,568 @@
+"""
+Broker adapters used by the single-process copy engine
+
+Masters watch one account and hand every new trade to the engine as a
+Signal; followers place a signal on one account. All adapters are driven by
+the engine's event loop. The IQ Option SDK is synchronous, so its blocking
+calls (connect, buy) run on a thread; every other broker is native asyncio.
+
+Broker SDKs are imported when an adapter connects, so an engine that only
+copies between two brokers does not need the others installed.
+"""
+
+import asyncio
+import queue
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from .dedup import SeenIds
+from .deriv import (
+    ASSET_TTL,
+    BUY_DIRECT,
+    BUY_MODES,
+    BUY_STREAM,
+    MAX_STREAMS,
+    POOL_SIZE,
+    DerivAssetResolver,
+    DerivContractFeed,
+    DerivProposalStreams,
+    DerivSessionPool,
+    buy_contract,
+    contract_parameters,
+)
+from .iqoption import WORKERS as IQ_WORKERS, IQOrderPool
+from .latency import mark
+from .signals import Signal
+from .symbols import UNMAPPABLE, canonical_asset, symbol_table
+from .timesync import SYNC_INTERVAL, time_sync
+
+logger = logging.getLogger(__name__)
+
+Emit = Callable[[Signal], None]
+
+
+# --- signal builders (shared with the standalone master scripts) ------------
+
+
+def signal_from_iq_option(option_id: Any, msg: Dict[str, Any], now: Optional[float] = None) -> Signal:
+    """
+    Build a signal from an IQ Option ``socket-option-opened`` message
+
+    Turbo/binary expiries are rounded up to the next slot of the expiration
+    ladder at the option's creation (server clock); blitz options keep their
+    exact duration.
+
+    Args:
+        option_id: Option ID
+        msg: The ``msg`` part of the push
+        now: Detection time (defaults to the current time)
+
+    Returns:
+        Signal: Signal for the option
+    """
+    from iqoptionapi.expiration import expiration_schedule
+
+    now = datetime.now().timestamp() if now is None else now
+    duration = msg["expired"] - msg["created"]
+    duration_new = duration
+    if msg["type_name"] != "blitz":
+        minutes = expiration_schedule.duration_for(msg["created"], duration)
+        if minutes is not None:
+            duration_new = minutes * 60
+    asset = canonical_asset(str(msg["active"]))
+    signal = Signal(
+        stamp=now,
+        id=str(option_id),
+        broker="iqoption",
+        asset=asset,
+        amount=float(msg["profit_amount"]),
+        direction=msg["dir"],
+        duration=int(duration_new),
+        option_type=msg["type_name"],
+        expiry=float(msg["expired"]),
+    )
+    opened = msg.get("created_millisecond")
+    signal.server_stamp = opened / 1000 if opened else float(msg["created"])
+    mark(signal, "broker", signal.server_stamp)
+    mark(signal, "detect", now)
+    return signal
+
+
+def signal_from_pocket_order(order: Any, now: Optional[float] = None) -> Signal:
+    """
+    Build a signal from a PocketOption active order
+
+    Args:
+        order: OrderResult from AsyncPocketOptionClient
+        now: Detection time (defaults to the current time)
+
+    Returns:
+        Signal: Signal for the order
+    """
+    now = datetime.now().timestamp() if now is None else now
+    signal = Signal(
+        stamp=now,
+        id=str(order.order_id),
+        broker="pocketoption",
+        asset=order.asset,
+        amount=order.amount,
+        direction=order.direction.value,
+        duration=order.duration,
+        server_stamp=order.placed_at.timestamp(),
+        expiry=order.placed_at.timestamp() + order.duration,
+    )
+    mark(signal, "broker", signal.server_stamp)
+    mark(signal, "detect", now)
+    return signal
+
+
+def signal_from_deriv_contract(contract: Dict[str, Any], now: Optional[float] = None) -> Signal:
+    """
+    Build a signal from a Deriv ``proposal_open_contract`` record
+
+    Args:
+        contract: Open contract
+        now: Detection time (defaults to the current time)
+
+    Returns:
+        Signal: Signal for the contract
+    """
+    now = datetime.now().timestamp() if now is None else now
+    signal = Signal(
+        stamp=now,
+        id=str(contract["contract_id"]),
+        broker="deriv",
+        asset=canonical_asset(str(contract["underlying"])),
+        amount=float(contract["buy_price"]),
+        direction=str(contract["contract_type"]).lower(),
+        duration=int(contract["date_expiry"] - contract["date_start"]),
+        server_stamp=float(contract.get("purchase_time", contract["date_start"])),
+        expiry=float(contract["date_expiry"]),
+    )
+    mark(signal, "broker", signal.server_stamp)
+    mark(signal, "detect", now)
+    return signal
+
+
+# --- masters -----------------------------------------------------------------
+
+
+class Master:
+    """
+    Watches one master account.
+
+    Args:
+        name: Account name from the engine config (also names the seen-ID snapshot)
+        settings: Account settings from the engine config
+    """
+
+    broker = ""
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        self.name = name
+        self.settings = settings
+        self.poll_interval = float(settings.get("poll_interval", 0.1))
+        # Trades stay open until expiry; remember published IDs for a day
+        self.seen = SeenIds(ttl=86400, snapshot_path=f"settings/seen/{name}.json")
+
+    async def connect(self):
+        """Log in; raises ConnectionError on failure"""
+        raise NotImplementedError
+
+    async def run(self, emit: Emit):
+        """Emit a signal for every new trade until cancelled"""
+        raise NotImplementedError
+
+    async def close(self):
+        """Release the connection"""
+
+    def _publish(self, key: str, signal: Signal, emit: Emit):
+        """Emit ``signal`` unless ``key`` was already published"""
+        if self.seen.add(key):
+            logger.info(f"[{self.name}] new trade {signal.id} {signal.asset} {signal.direction} {signal.duration}s")
+            emit(signal)
+
+
+class IQOptionMaster(Master):
+    """
+    IQ Option master; the SDK's blocking calls run on a thread
+
+    New options are pushed by the SDK's websocket thread the moment the
+    ``socket-option-opened`` message arrives (no polling).
+    """
+
+    broker = "iqoption"
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, settings)
+        self.api = None
+        self.check_interval = float(settings.get("check_interval", 15.0))
+
+    async def connect(self):
+        from iqoptionapi.stable_api import IQ_Option
+
+        loop = asyncio.get_running_loop()
+        self.api = IQ_Option(self.settings["email"], self.settings["password"])
+        stat, reason = await loop.run_in_executor(None, self.api.connect)
+        if not stat:
+            raise ConnectionError(f"IQ Option login failed: {reason}")
+        await loop.run_in_executor(None, self.api.change_balance, self.settings.get("balance", "PRACTICE"))
+
+    async def run(self, emit: Emit):
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        # Detection is stamped on the websocket thread, when the push arrives
+        listener = self.api.subscribe_option_opened(
+            lambda option_id, message: loop.call_soon_threadsafe(events.put_nowait, (option_id, message, time.time()))
+        )
+        # Options opened before subscribing are only in the SDK's dict
+        for option_id, trade in list(self.api.get_option_open_by_other_pc().items()):
+            events.put_nowait((option_id, trade, time.time()))
+        next_check = loop.time() + self.check_interval
+        try:
+            while True:
+                try:
+                    option_id, trade, detected = await asyncio.wait_for(events.get(), max(0.0, next_check - loop.time()))
+                except asyncio.TimeoutError:
+                    next_check = loop.time() + self.check_interval
+                    if not await loop.run_in_executor(None, self.api.check_connect):
+                        logger.warning(f"[{self.name}] connection lost, reconnecting")
+                        await loop.run_in_executor(None, self.api.connect)
+                    continue
+                time_sync().sync_iqoption(self.api.api)
+                self._publish(str(option_id)[-8:], signal_from_iq_option(option_id, trade["msg"], now=detected), emit)
+                # The SDK keeps every push in its dict as well
+                self.api.get_option_open_by_other_pc().pop(option_id, None)
+        finally:
+            self.api.unsubscribe_option_opened(listener)
+
+    async def close(self):
+        if self.api is not None and self.api.api is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.api.api.close)
+
+
+class PocketOptionMaster(Master):
+    """PocketOption master; awaits the client's order_events() stream"""
+
+    broker = "pocketoption"
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, settings)
+        self.client = None
+
+    async def connect(self):
+        from pocketoptionapi_async import AsyncPocketOptionClient
+
+        self.client = AsyncPocketOptionClient(
+            ssid=self.settings["ssid"], is_demo=self.settings.get("demo", True), auto_reconnect=True
+        )
+        if not await self.client.connect():
+            raise ConnectionError("PocketOption connection failed")
+
+    async def run(self, emit: Emit):
+        # Subscribe first so no order falls between the snapshot and the stream
+        async with self.client.order_events(kinds=("opened",)) as events:
+            for order in await self.client.get_active_orders():
+                self._publish(str(order.order_id)[-8:], signal_from_pocket_order(order), emit)
+                await self.client.delete_order_result(order.order_id)
+            async for event in events:
+                order = event.order
+                time_sync().sync_pocketoption(self.client)
+                self._publish(
+                    str(order.order_id)[-8:], signal_from_pocket_order(order, now=event.received_at), emit
+                )
+                await self.client.delete_order_result(order.order_id)
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.disconnect()
+
+
+class DerivMaster(Master):
+    """
+    Deriv master; new contracts are pushed by a DerivContractFeed
+
+    Contracts without enough time left to copy (such as the open contracts
+    Deriv reports after a resubscribe) are not published. The Deriv clock
+    offset is refreshed every ``SYNC_INTERVAL`` on the feed's session.
+    """
+
+    broker = "deriv"
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, settings)
+        self.feed: Optional[DerivContractFeed] = None
+        self._sync_task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        options = {"app_id": self.settings.get("app_id", 1089)}
+        if self.settings.get("endpoint"):
+            options["endpoint"] = self.settings["endpoint"]
+        self.feed = DerivContractFeed(self.settings["token"], **options)
+        await self.feed.start()
+        self._sync_task = asyncio.ensure_future(self._sync_clock())
+
+    async def run(self, emit: Emit):
+        clock = time_sync()
+        async for contract, received_at in self.feed:
+            signal = signal_from_deriv_contract(contract, now=received_at)
+            if clock.fresh(signal, self.broker):
+                self._publish(str(contract["contract_id"])[-8:], signal, emit)
+
+    async def _sync_clock(self):
+        while True:
+            try:
+                async with self.feed.pool.lease() as api:
+                    await asyncio.wait_for(time_sync().sync_deriv(api), self.feed.pool.timeout)
+            except Exception as e:
+                logger.debug(f"[{self.name}] Deriv time sync failed: {e!r}")
+            await asyncio.sleep(SYNC_INTERVAL)
+
+    async def close(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+        if self.feed is not None:
+            await self.feed.close()
+
+
+# --- followers ---------------------------------------------------------------
+
+
+class Follower:
+    """
+    Places signals on one follower account.
+
+    Args:
+        name: Account name from the engine config
+        settings: Account settings from the engine config
+    """
+
+    broker = ""
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        self.name = name
+        self.settings = settings
+
+    async def connect(self):
+        """Log in; raises ConnectionError on failure"""
+        raise NotImplementedError
+
+    async def execute(self, signal: Signal) -> Tuple[bool, Any]:
+        """
+        Place one order
+
+        Args:
+            signal: Master trade to copy
+
+        Returns:
+            Tuple[bool, Any]: Success flag and the broker's order ID or error
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """Release the connection"""
+
+    def symbol(self, signal: Signal) -> Optional[str]:
+        """The signal's asset as this broker names it, or None if the broker does not list it"""
+        name = symbol_table().translate(signal.asset, self.broker)
+        return None if name == UNMAPPABLE else name
+
+
+class PocketOptionFollower(Follower):
+    """PocketOption follower"""
+
+    broker = "pocketoption"
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, settings)
+        self.client = None
+
+    async def connect(self):
+        from pocketoptionapi_async import AsyncPocketOptionClient
+
+        self.client = AsyncPocketOptionClient(
+            ssid=self.settings["ssid"], is_demo=self.settings.get("demo", True), auto_reconnect=True
+        )
+        if not await self.client.connect():
+            raise ConnectionError("PocketOption connection failed")
+
+    async def execute(self, signal: Signal) -> Tuple[bool, Any]:
+        from pocketoptionapi_async import OrderDirection
+
+        asset = self.symbol(signal)
+        if asset is None:
+            return False, f"{signal.asset} is not listed on PocketOption"
+        result = await self.client.place_order(
+            asset=asset,
+            amount=signal.amount,
+            direction=OrderDirection.CALL if signal.direction == "call" else OrderDirection.PUT,
+            duration=signal.duration,
+        )
+        if result and result.status != "error":
+            return True, result.order_id
+        return False, result.error_message if result else None
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.disconnect()
+
+
+class QuotexFollower(Follower):
+    """Quotex follower"""
+
+    broker = "quotex"
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, settings)
+        self.client = None
+
+    async def connect(self):
+        from pyquotex.stable_api import Quotex
+
+        self.client = Quotex(email=self.settings["email"], password=self.settings["password"], lang="en")
+        check, reason = await self.client.connect()
+        if not check:
+            raise ConnectionError(f"Quotex connection failed: {reason}")
+        self.client.change_account(self.settings.get("account", "PRACTICE"))
+        try:
+            assets = await asyncio.wait_for(self.client.get_all_assets(), 10)
+        except asyncio.TimeoutError:
+            logger.warning(f"[{self.name}] Quotex instruments not received; assets are not checked")
+        else:
+            symbol_table().update(self.broker, assets, save=True)
+
+    async def execute(self, signal: Signal) -> Tuple[bool, Any]:
+        asset = self.symbol(signal)
+        if asset is None:
+            return False, f"{signal.asset} is not listed on Quotex"
+        status, info = await self.client.buy(
+            signal.amount, asset, signal.direction, signal.duration, time_mode="TIMER"
+        )
+        if status:
+            return True, info.get("id")
+        return False, info
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+
+
+class IQOptionFollower(Follower):
+    """
+    IQ Option follower.
+
+    The SDK is synchronous: connecting runs on a dedicated thread and orders
+    are placed by an IQOrderPool with one worker per order the account may
+    have in flight, which keeps each order's reply apart by request ID.
+    """
+
+    broker = "iqoption"
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, settings)
+        self.api = None
+        self.pool: Optional[IQOrderPool] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"iq-{name}")
+
+    async def connect(self):
+        from iqoptionapi.stable_api import IQ_Option
+
+        loop = asyncio.get_running_loop()
+        self.api = IQ_Option(self.settings["email"], self.settings["password"])
+        stat, reason = await loop.run_in_executor(self._executor, self.api.connect)
+        if not stat:
+            raise ConnectionError(f"IQ Option login failed: {reason}")
+        await loop.run_in_executor(self._executor, self.api.change_balance, self.settings.get("balance", "PRACTICE"))
+        # The dispatcher queues per account already; the pool only needs a worker per order in flight
+        self.pool = IQOrderPool(self.api, workers=int(self.settings.get("max_in_flight", IQ_WORKERS)))
+        self.pool.start()
+
+    async def execute(self, signal: Signal) -> Tuple[bool, Any]:
+        asset = self.symbol(signal)
+        if asset is None:
+            return False, f"{signal.asset} is not listed on IQ Option"
+        try:
+            slot = self.pool.submit(asset, signal.amount, signal.direction, signal.duration)
+        except queue.Full:
+            return False, f"{self.pool.queue.qsize()} IQ Option orders waiting"
+        return await asyncio.wrap_future(slot)
+
+    async def close(self):
+        if self.pool is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.pool.close)
+        if self.api is not None and self.api.api is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.api.api.close)
+        self._executor.shutdown(wait=False)
+
+
+class DerivFollower(Follower):
+    """
+    Deriv follower; orders lease pre-authorized sessions from a DerivSessionPool
+
+    ``buy_mode`` picks how a contract is bought (see copytrade.deriv); the
+    path each order took is left in ``signal.extra["via"]`` for the latency
+    report.
+    """
+
+    broker = "deriv"
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        super().__init__(name, settings)
+        self.buy_mode = self.settings.get("buy_mode", BUY_DIRECT)
+        if self.buy_mode not in BUY_MODES:
+            raise ValueError(f"Unknown Deriv buy_mode {self.buy_mode!r}, expected one of {BUY_MODES}")
+        self.pool: Optional[DerivSessionPool] = None
+        self.assets: Optional[DerivAssetResolver] = None
+        self.streams: Optional[DerivProposalStreams] = None
+
+    async def connect(self):
+        options = {"app_id": self.settings.get("app_id", 1089)}
+        if self.settings.get("endpoint"):
+            options["endpoint"] = self.settings["endpoint"]
+        self.pool = DerivSessionPool(self.settings["token"], size=int(self.settings.get("sessions", POOL_SIZE)), **options)
+        await self.pool.start()
+        self.assets = DerivAssetResolver(self.pool, ttl=float(self.settings.get("asset_ttl", ASSET_TTL)))
+        await self.assets.start()
+        symbol_table().update(self.broker, self.assets.open, save=True)
+        if self.buy_mode == BUY_STREAM:
+            self.streams = DerivProposalStreams(
+                self.settings["token"], max_streams=int(self.settings.get("streams", MAX_STREAMS)), **options
+            )
+            await self.streams.start()
+
+    async def execute(self, signal: Signal) -> Tuple[bool, Any]:
+        symbol = self.assets.resolve(signal.asset)
+        if symbol is None:
+            return False, f"asset {signal.asset} not in asset index"
+        parameters = contract_parameters(
+            symbol, signal.amount, "CALL" if signal.direction == "call" else "PUT", signal.duration
+        )
+        if self.streams is not None:
+            bought, via = await self.streams.buy(parameters)
+        else:
+            async with self.pool.lease() as api:
+                bought = await buy_contract(api, parameters, self.buy_mode)
+            via = self.buy_mode
+        signal.extra["via"] = via
+        contract_id = bought.get("contract_id")
+        return bool(contract_id), contract_id
+
+    async def close(self):
+        if self.streams is not None:
+            await self.streams.close()
+        if self.assets is not None:
+            await self.assets.close()
+        if self.pool is not None:
+            await self.pool.close()
+
+
+MASTERS: Dict[str, Type[Master]] = {
+    cls.broker: cls for cls in (IQOptionMaster, PocketOptionMaster, DerivMaster)
+}
+FOLLOWERS: Dict[str, Type[Follower]] = {
+    cls.broker: cls for cls in (PocketOptionFollower, QuotexFollower, IQOptionFollower, DerivFollower)
+}
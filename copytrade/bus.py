@@ -0,0 +1,487 @@
+"""
+Push-based local signal bus between masters and clients
+
+Run the broadcast server with ``python -m copytrade.bus``. Masters publish
+signals with SignalPublisher and clients receive them through
+SignalSubscriber the moment they are published. The server listens on a Unix
+domain socket and falls back to a localhost TCP port where Unix sockets are
+not available (Windows). orders.log is kept only as an optional audit sink,
+written as a rotating journal (see copytrade.journal).
+
+While the bus is down, publishers append to orders.log instead. On start
+the bus reads the still-fresh signals written that way since its last
+journal entry into its replay window, so subscribers that reconnect
+receive them. A signal replayed this way stays unstamped in the journal,
+so a second restart before the next publish replays it again; clients drop
+the repeat by ID.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import select
+import socket
+import time
+import logging
+from collections import deque
+from typing import Deque, List, Optional, Set, Tuple
+
+from .journal import CURSOR_DIR, SignalJournal
+from .latency import mark
+from .reader import SignalReader
+from .shm import ShmRingReader, ShmRingWriter
+from .signals import Signal, decode, encode
+from .timesync import time_sync
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.getenv("SIGNAL_BUS_SOCKET", "settings/signals.sock")
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.getenv("SIGNAL_BUS_PORT", "47800"))
+# How clients receive signals: "bus" (falls back to "file"), "shm" or "file"
+DEFAULT_TRANSPORT = os.getenv("SIGNAL_TRANSPORT", "bus")
+
+# Late joiners get at most this many signals, and none older than REPLAY_SECONDS
+REPLAY_SIZE = 256
+REPLAY_SECONDS = 15.0
+
+# A subscriber whose unsent buffer grows past this is too slow and is dropped
+MAX_SUBSCRIBER_BUFFER = 1024 * 1024
+
+
+def unix_sockets_supported() -> bool:
+    """Whether asyncio can serve on a Unix domain socket here"""
+    return hasattr(socket, "AF_UNIX") and hasattr(asyncio, "start_unix_server")
+
+
+class SignalBus:
+    """
+    Broadcast server: every signal published by a master is stamped with a
+    sequence number and written to all connected subscribers.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        audit_path: Optional[str] = "orders.log",
+        replay_size: int = REPLAY_SIZE,
+        replay_seconds: float = REPLAY_SECONDS,
+        archive: bool = False,
+    ):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.audit_path = audit_path
+        self._journal = SignalJournal(audit_path, archive=archive) if audit_path else None
+        self.replay_seconds = replay_seconds
+        self._replay: Deque[Tuple[int, float, bytes]] = deque(maxlen=replay_size)
+        self._subscribers: Set[asyncio.StreamWriter] = set()
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set[asyncio.Task] = set()
+        # Seed from the clock so sequence numbers keep increasing across bus
+        # restarts and reconnecting subscribers do not skip new signals
+        self._seq = int(time.time() * 1000)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Start listening (Unix socket if possible, else localhost TCP)"""
+        self._recover()
+        if unix_sockets_supported():
+            directory = os.path.dirname(self.socket_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self._server = await asyncio.start_unix_server(
+                self._handle, path=self.socket_path
+            )
+            logger.info(f"Signal bus listening on {self.socket_path}")
+        else:
+            self._server = await asyncio.start_server(
+                self._handle, host=self.host, port=self.port
+            )
+            logger.info(f"Signal bus listening on {self.host}:{self.port}")
+
+    async def serve_forever(self):
+        """Start the server and run until cancelled"""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Close the listener and every open connection"""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for writer in list(self._connections):
+            writer.close()
+        if self._handlers:
+            await asyncio.wait(list(self._handlers), timeout=1.0)
+        self._subscribers.clear()
+        if self._journal is not None:
+            self._journal.close()
+        if unix_sockets_supported() and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Dispatch a new connection according to its hello line"""
+        self._connections.add(writer)
+        self._handlers.add(asyncio.current_task())
+        try:
+            hello = json.loads(await reader.readline() or b"{}")
+            if hello.get("role") == "pub":
+                await self._serve_publisher(reader)
+            elif hello.get("role") == "sub":
+                self._replay_to(writer, int(hello.get("since", 0)))
+                self._subscribers.add(writer)
+                # Subscribers never send anything else; wait for them to go away
+                await reader.read()
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._subscribers.discard(writer)
+            self._connections.discard(writer)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def _serve_publisher(self, reader: asyncio.StreamReader):
+        """Broadcast every line sent by a publisher"""
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            try:
+                signal = decode(line)
+            except ValueError:
+                logger.warning(f"Dropping malformed signal: {line[:200]!r}")
+                continue
+            self.publish(signal)
+
+    def publish(self, signal: Signal) -> int:
+        """
+        Stamp a signal with the next sequence number and broadcast it
+
+        Args:
+            signal: Signal to broadcast
+
+        Returns:
+            int: Sequence number assigned to the signal
+        """
+        self._seq += 1
+        signal.seq = self._seq
+        data = encode(signal)
+        self._replay.append((self._seq, time.time(), data))
+
+        for writer in list(self._subscribers):
+            transport = writer.transport
+            if transport.is_closing():
+                self._subscribers.discard(writer)
+            elif transport.get_write_buffer_size() > MAX_SUBSCRIBER_BUFFER:
+                logger.warning("Dropping slow subscriber")
+                self._subscribers.discard(writer)
+                writer.close()
+            else:
+                writer.write(data)
+
+        if self._journal is not None:
+            self._journal.append(signal, data)
+        return self._seq
+
+    def _recover(self):
+        """Queue for replay the fresh signals publishers wrote to the journal while the bus was down"""
+        if self._journal is None:
+            return
+        try:
+            missed = self._journal.unsequenced()
+        except OSError as e:
+            logger.warning(f"Could not read {self.audit_path} for signals published while the bus was down: {e}")
+            return
+        clock = time_sync()
+        now = time.time()
+        recovered = 0
+        for signal in missed:
+            if not clock.fresh(signal):
+                continue
+            self._seq += 1
+            signal.seq = self._seq
+            # Replayed from now on, not from when the master published it
+            self._replay.append((self._seq, now, encode(signal)))
+            recovered += 1
+        if recovered:
+            logger.info(f"Replaying {recovered} signals published while the bus was down")
+
+    def _replay_to(self, writer: asyncio.StreamWriter, since: int):
+        """Send buffered signals newer than ``since`` and the replay window"""
+        oldest = time.time() - self.replay_seconds
+        for seq, stamp, data in self._replay:
+            if seq > since and stamp >= oldest:
+                writer.write(data)
+
+
+def _connect_blocking(socket_path: str, host: str, port: int, timeout: float) -> socket.socket:
+    """Open a blocking connection to the bus, preferring the Unix socket"""
+    if hasattr(socket, "AF_UNIX") and os.path.exists(socket_path):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(socket_path)
+            return sock
+        except OSError:
+            sock.close()
+    return socket.create_connection((host, port), timeout=timeout)
+
+
+class SignalPublisher:
+    """
+    Publishes master signals to the bus.
+
+    Sending is a single blocking write on a local socket, so the same
+    publisher works from the synchronous IQ Option master and from the async
+    masters. If the bus cannot be reached the signal is appended to
+    ``fallback_path`` instead, so file-based clients still see it. With
+    ``ring`` set (the master's broker name) every signal is also written to
+    that master's shared-memory ring for same-host clients; one too large for
+    a ring slot is logged, counted in ``ring_skipped`` and still published.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        fallback_path: Optional[str] = "orders.log",
+        timeout: float = 1.0,
+        ring: Optional[str] = None,
+    ):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.fallback_path = fallback_path
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._ring: Optional[ShmRingWriter] = None
+        self.ring_skipped = 0
+        if ring:
+            try:
+                self._ring = ShmRingWriter(ring)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Shared-memory ring unavailable, publishing without it: {e}")
+
+    def _send(self, data: bytes):
+        """Send on the current connection, connecting first if needed"""
+        if self._sock is not None and select.select([self._sock], [], [], 0)[0]:
+            # The bus never writes to publishers, so readable means it hung up
+            self.close()
+        if self._sock is None:
+            self._sock = _connect_blocking(self.socket_path, self.host, self.port, self.timeout)
+            self._sock.sendall(b'{"role": "pub"}\n')
+        self._sock.sendall(data)
+
+    def publish(self, signal: Signal) -> bool:
+        """
+        Publish one signal
+
+        Args:
+            signal: Signal to publish
+
+        Returns:
+            bool: True if the bus took the signal, False if it went to the fallback file
+        """
+        mark(signal, "publish")
+        data = encode(signal)
+        if self._ring is not None:
+            try:
+                self._ring.publish(signal)
+            except ValueError as e:
+                self.ring_skipped += 1
+                logger.warning(f"Not writing signal {signal.id} to the shared-memory ring: {e}")
+        for _ in range(2):
+            try:
+                self._send(data)
+                return True
+            except OSError:
+                # Stale connection (bus restarted): reconnect once before giving up
+                self.close()
+
+        if self.fallback_path:
+            with open(self.fallback_path, "ab") as f:
+                f.write(data)
+        return False
+
+    def close(self):
+        """Close the bus connection"""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+
+class SignalSubscriber:
+    """
+    Receives signals from the bus as they are published.
+
+    A background task keeps the connection alive; after a reconnect the bus
+    replays anything missed since the last received sequence number.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        queue_size: int = 1000,
+        reconnect_delay: float = 0.5,
+    ):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.reconnect_delay = reconnect_delay
+        self.last_seq = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _open(self):
+        """Open a connection and send the subscribe hello"""
+        if unix_sockets_supported() and os.path.exists(self.socket_path):
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+            except OSError:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        else:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        hello = {"role": "sub", "since": self.last_seq}
+        self._writer.write((json.dumps(hello) + "\n").encode("utf-8"))
+        await self._writer.drain()
+
+    async def connect(self) -> bool:
+        """
+        Connect to the bus and start receiving
+
+        Returns:
+            bool: False if the bus is not running
+        """
+        try:
+            await self._open()
+        except OSError:
+            return False
+        self._task = asyncio.create_task(self._pump())
+        return True
+
+    async def _pump(self):
+        """Move received signals into the queue, reconnecting on loss"""
+        while True:
+            try:
+                line = await self._reader.readline()
+                if not line:
+                    raise ConnectionResetError("signal bus closed the connection")
+                signal = decode(line)
+                if signal.seq <= self.last_seq:
+                    continue
+                self.last_seq = signal.seq
+                if self._queue.full():
+                    logger.warning("Subscriber queue full, dropping oldest signal")
+                    self._queue.get_nowait()
+                self._queue.put_nowait(signal)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, ValueError) as e:
+                logger.warning(f"Signal bus connection lost: {e}")
+                if self._writer is not None:
+                    self._writer.close()
+                while True:
+                    await asyncio.sleep(self.reconnect_delay)
+                    try:
+                        await self._open()
+                        break
+                    except OSError:
+                        continue
+
+    async def poll(self, timeout: float = 0.5) -> List[Signal]:
+        """
+        Return received signals, waiting up to ``timeout`` seconds for the first one
+
+        Args:
+            timeout: Maximum time to wait
+
+        Returns:
+            List[Signal]: Signals in publish order (possibly empty)
+        """
+        signals = []
+        try:
+            signals.append(await asyncio.wait_for(self._queue.get(), timeout))
+        except asyncio.TimeoutError:
+            return signals
+        while not self._queue.empty():
+            signals.append(self._queue.get_nowait())
+        return signals
+
+    async def close(self):
+        """Stop receiving and close the connection"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+async def open_signal_source(name: str, path: str = "orders.log", transport: str = DEFAULT_TRANSPORT):
+    """
+    Open the client's signal source
+
+    Args:
+        name: Client name, used for the file cursor (settings/cursors/<name>.json),
+            which is also its committed offset in the journal
+        path: Signal file used for the "file" transport or when the bus is unavailable
+        transport: "bus", "shm" or "file"
+
+    Returns:
+        SignalSubscriber, ShmRingReader or SignalReader; all provide ``await poll(timeout)``
+    """
+    if transport == "shm":
+        return ShmRingReader()
+    if transport == "bus":
+        subscriber = SignalSubscriber()
+        if await subscriber.connect():
+            return subscriber
+    return SignalReader(path, cursor_path=os.path.join(CURSOR_DIR, f"{name}.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local copy-trade signal bus")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="TCP fallback host")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP fallback port")
+    parser.add_argument("--audit", default="orders.log", help="Audit log path")
+    parser.add_argument("--no-audit", action="store_true", help="Do not write the audit log")
+    parser.add_argument("--archive", action="store_true", help="Gzip compacted audit log segments instead of deleting them")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    bus = SignalBus(
+        socket_path=args.socket,
+        host=args.host,
+        port=args.port,
+        audit_path=None if args.no_audit else args.audit,
+        archive=args.archive,
+    )
+    try:
+        asyncio.run(bus.serve_forever())
+    except KeyboardInterrupt:
+        print("\n✅ Signal bus stopped.")
+
+
+if __name__ == "__main__":
+    main()
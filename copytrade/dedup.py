@@ -0,0 +1,142 @@
+"""
+O(1) de-duplication of already-handled signal IDs with TTL expiry
+"""
+
+import atexit
+import heapq
+import itertools
+import json
+import os
+import time
+import logging
+from typing import Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between snapshot writes while IDs keep arriving
+SAVE_INTERVAL = 1.0
+
+
+class SeenIds:
+    """
+    Set of recently handled IDs that forgets entries after ``ttl`` seconds.
+
+    Lookups are O(1) (hash map); expiry pops the oldest entries off a heap,
+    so memory is bounded by the number of IDs seen within one TTL rather than
+    growing for the life of the process. An ID added with ``expires_at`` (its
+    signal's expiry) is kept until then if that is later than the TTL, so a
+    re-sent signal for a long trade is still recognised. With
+    ``snapshot_path`` the live entries are written to disk after an insert, at
+    most every ``save_interval`` seconds (callers ``flush()`` from their poll
+    loop to write the last IDs of a burst, and ``close()`` writes at exit), and
+    reloaded on start, so a restart does not copy recent trades again.
+    """
+
+    def __init__(self, ttl: float = 60.0, snapshot_path: Optional[str] = None, save_interval: float = SAVE_INTERVAL):
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.save_interval = save_interval
+        self._expiry: Dict[Hashable, float] = {}
+        self._queue: List[Tuple[float, int, Hashable]] = []
+        self._order = itertools.count()
+        self._dirty = False
+        self._saved_at = 0.0
+        self._load()
+        if snapshot_path:
+            atexit.register(self.close)
+
+    def __len__(self) -> int:
+        self.expire()
+        return len(self._expiry)
+
+    def __contains__(self, item: Hashable) -> bool:
+        expiry = self._expiry.get(item)
+        return expiry is not None and expiry > time.time()
+
+    def add(self, item: Hashable, now: Optional[float] = None, expires_at: Optional[float] = None) -> bool:
+        """
+        Mark an ID as handled
+
+        Args:
+            item: Signal or trade ID
+            now: Current time (defaults to time.time())
+            expires_at: Keep the ID at least until this time (e.g. ``Signal.expiry``)
+
+        Returns:
+            bool: True if the ID was new, False if it was already present
+        """
+        now = time.time() if now is None else now
+        self.expire(now)
+        if item in self._expiry:
+            return False
+        expiry = max(now + self.ttl, expires_at or 0.0)
+        self._expiry[item] = expiry
+        heapq.heappush(self._queue, (expiry, next(self._order), item))
+        self._dirty = True
+        self.flush()
+        return True
+
+    def expire(self, now: Optional[float] = None):
+        """Drop every ID past its expiry"""
+        now = time.time() if now is None else now
+        queue, expiry = self._queue, self._expiry
+        while queue and queue[0][0] <= now:
+            _, _, item = heapq.heappop(queue)
+            expiry.pop(item, None)
+
+    def flush(self, force: bool = False) -> bool:
+        """
+        Write the snapshot if IDs were added since the last write
+
+        Args:
+            force: Write even if the last write was less than ``save_interval`` ago
+
+        Returns:
+            bool: True if the snapshot was written
+        """
+        if not self._dirty or not self.snapshot_path:
+            return False
+        now = time.monotonic()
+        if not force and now - self._saved_at < self.save_interval:
+            return False
+        self._saved_at = now
+        self.expire()
+        try:
+            self._save()
+        except OSError as e:
+            logger.warning(f"Could not write seen-ID snapshot {self.snapshot_path}: {e}")
+            return False
+        self._dirty = False
+        return True
+
+    def close(self):
+        """Write any unsaved IDs"""
+        self.flush(force=True)
+
+    def _load(self):
+        """Restore unexpired IDs from the snapshot"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable snapshot {self.snapshot_path}: {e}")
+            return
+        now = time.time()
+        for item, expiry in entries.items():
+            if expiry > now:
+                self._expiry[item] = expiry
+                heapq.heappush(self._queue, (expiry, next(self._order), item))
+
+    def _save(self):
+        """Atomically write the live IDs to the snapshot"""
+        if not self.snapshot_path:
+            return
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({str(item): expiry for item, expiry in self._expiry.items()}, f)
+        os.replace(tmp_path, self.snapshot_path)
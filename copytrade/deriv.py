@@ -0,0 +1,721 @@
+"""
+Long-lived Deriv API sessions
+
+Opening a DerivAPI costs a websocket + TLS handshake and an ``authorize``
+round trip before the first proposal can be sent. ``DerivSessionPool``
+keeps ``size`` sessions connected and authorized, pings them in the
+background and replaces any that stop answering, so an order only leases a
+ready session::
+
+    pool = DerivSessionPool(token, size=3, app_id=1089)
+    await pool.start()
+    async with pool.lease() as api:
+        await api.proposal({...})
+
+``DerivAssetResolver`` loads ``asset_index`` and ``active_symbols`` once
+(and again every ``ttl`` in the background) into lookup maps, so turning a
+signal's asset (``EURUSD``, ``EURUSD_otc``, ``EUR/USD``, ``frxEURUSD``) into
+a Deriv symbol is a dict hit rather than a request and a scan per order.
+
+Contracts are bought one of three ways (``buy_mode``)::
+
+    proposal  proposal, then buy its ID: two round trips
+    direct    buy with ``parameters``: one round trip (default)
+    stream    ``DerivProposalStreams`` keeps live proposal subscriptions for
+              recently traded contracts and buys their current proposal ID;
+              a contract without a live proposal is bought direct
+
+``DerivContractFeed`` watches a master account: new contracts arrive on
+``proposal_open_contract`` and ``transaction`` subscriptions held on one
+pooled session, instead of a request per poll.
+
+The SDK is imported when the pool opens its first session.
+"""
+
+import asyncio
+import itertools
+import math
+import re
+import time
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 3
+PING_INTERVAL = 15.0
+TIMEOUT = 10.0
+MAX_BACKOFF = 30.0
+ASSET_TTL = 3600.0
+MAX_STREAMS = 8
+CONTRACT_QUEUE_SIZE = 1024
+# Contract IDs remembered so later updates of an open contract are not delivered again
+KEEP_CONTRACTS = 4096
+# Seconds between checks that the feed's subscriptions live on the pool's current session
+WATCH_INTERVAL = 1.0
+
+BUY_PROPOSAL = "proposal"
+BUY_DIRECT = "direct"
+BUY_STREAM = "stream"
+BUY_MODES = (BUY_PROPOSAL, BUY_DIRECT, BUY_STREAM)
+
+# Broker-side OTC markers ("EURUSD_otc", "EURUSD-OTC", "EUR/USD (OTC)")
+_OTC_SUFFIX = re.compile(r"[\s_-]*\(?otc\)?$", re.IGNORECASE)
+# Deriv symbol prefixes that are not part of the instrument name
+_SYMBOL_PREFIXES = ("frx", "cry", "OTC_", "WLD")
+
+
+def normalize_asset(asset: str) -> str:
+    """
+    Broker-neutral asset key: OTC suffix dropped, upper-case letters and digits only
+
+    Args:
+        asset: Asset name as a broker or Deriv reports it
+
+    Returns:
+        str: e.g. ``EURUSD`` for ``EURUSD_otc``, ``EUR/USD`` and ``eurusd``
+    """
+    return re.sub(r"[^A-Z0-9]", "", _OTC_SUFFIX.sub("", asset.strip()).upper())
+
+
+class DerivSessionPool:
+    """
+    Pool of pre-authorized DerivAPI sessions.
+
+    Args:
+        token: Deriv API token
+        size: Sessions kept open
+        ping_interval: Seconds between health-check pings
+        timeout: Seconds allowed for connect + authorize and for each ping
+        **options: Passed to DerivAPI (app_id, endpoint, lang, ...)
+    """
+
+    def __init__(
+        self,
+        token: str,
+        size: int = POOL_SIZE,
+        ping_interval: float = PING_INTERVAL,
+        timeout: float = TIMEOUT,
+        **options: Any,
+    ):
+        self.token = token
+        self.size = size
+        self.ping_interval = ping_interval
+        self.timeout = timeout
+        self.options = options
+        self.options.setdefault("app_id", 1089)
+        self.sessions: List[Any] = []
+        self.reconnects = 0
+        self._idle: Optional[asyncio.Queue] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed = False
+
+    async def start(self):
+        """
+        Open and authorize all sessions concurrently
+
+        Sessions that fail are retried in the background.
+
+        Raises:
+            ConnectionError: If no session could be opened
+        """
+        self._idle = asyncio.Queue()
+        self._closed = False
+        results = await asyncio.gather(*(self._open() for _ in range(self.size)), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        for api in results:
+            if not isinstance(api, BaseException):
+                self._add(api)
+        if not self.sessions:
+            raise ConnectionError(f"No Deriv session could be opened: {errors[0]}")
+        for error in errors:
+            logger.warning(f"Deriv session not opened, retrying: {error}")
+            self._spawn(self._replace())
+        self._spawn(self._health())
+
+    async def close(self):
+        """Stop the background tasks and disconnect every session"""
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        sessions, self.sessions = self.sessions, []
+        await asyncio.gather(*(api.disconnect() for api in sessions), return_exceptions=True)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Any]:
+        """
+        Borrow a ready session for one order
+
+        Waits while every session is leased. A session that fails with a
+        connection error or timeout is dropped and replaced in the background.
+
+        Yields:
+            DerivAPI: Authorized session
+        """
+        if self._idle is None or self._closed:
+            raise ConnectionError("Deriv session pool is not started")
+        while True:
+            api = await self._idle.get()
+            if api in self.sessions and api.connected.is_resolved():
+                break
+            self._retire(api)
+        try:
+            yield api
+        except (OSError, asyncio.TimeoutError):
+            self._retire(api)
+            raise
+        except BaseException:
+            # A dropped socket surfaces as the SDK's own errors; check the session itself
+            if api.connected.is_resolved():
+                self._release(api)
+            else:
+                self._retire(api)
+            raise
+        else:
+            self._release(api)
+
+    async def _open(self) -> Any:
+        """Connect and authorize one session"""
+        from deriv_api import DerivAPI
+
+        api = DerivAPI(**self.options)
+        try:
+            authorize = await asyncio.wait_for(api.authorize(self.token), self.timeout)
+        except BaseException:
+            await self._disconnect(api)
+            raise
+        if not authorize.get("authorize", {}).get("account_list"):
+            await self._disconnect(api)
+            raise ConnectionError("Deriv authorization failed")
+        return api
+
+    async def _disconnect(self, api: Any):
+        if api.connected.is_pending():
+            # Never connected: fail the SDK's waiting tasks so they exit
+            api.connected.reject(ConnectionError("Deriv session closed"))
+            api.connected.exception()
+            return
+        try:
+            await api.disconnect()
+        except Exception as e:
+            logger.debug(f"Deriv disconnect failed: {e}")
+
+    def _add(self, api: Any):
+        self.sessions.append(api)
+        self._idle.put_nowait(api)
+
+    def _release(self, api: Any):
+        if api in self.sessions:
+            self._idle.put_nowait(api)
+
+    def _retire(self, api: Any):
+        """Drop a session and open a replacement in the background"""
+        if api not in self.sessions:
+            return
+        self.sessions.remove(api)
+        self._spawn(self._disconnect(api))
+        if not self._closed:
+            self._spawn(self._replace())
+
+    async def _replace(self):
+        """Open a session, backing off while the broker is unreachable"""
+        backoff = 1.0
+        while not self._closed:
+            try:
+                api = await self._open()
+            except Exception as e:
+                logger.warning(f"Deriv reconnect failed, retrying in {backoff:.0f}s: {e!r}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+            self.reconnects += 1
+            self._add(api)
+            logger.info(f"Deriv session reconnected ({len(self.sessions)}/{self.size} open)")
+            return
+
+    async def _ping(self, api: Any):
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(api.ping({"ping": 1}), self.timeout)
+        except Exception as e:
+            logger.warning(f"Deriv session failed health check, replacing: {e!r}")
+            self._retire(api)
+            return
+        logger.debug(f"Deriv ping {(time.monotonic() - start) * 1000:.0f} ms")
+
+    async def _health(self):
+        """Ping every session each interval (also keeps idle sessions alive)"""
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await asyncio.gather(*(self._ping(api) for api in list(self.sessions)))
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class DerivAssetResolver:
+    """
+    Signal asset to Deriv symbol lookup, refreshed in the background.
+
+    Args:
+        pool: Session pool used to load the asset lists
+        ttl: Seconds between refreshes
+    """
+
+    def __init__(self, pool: DerivSessionPool, ttl: float = ASSET_TTL):
+        self.pool = pool
+        self.ttl = ttl
+        self.symbols: Dict[str, Optional[str]] = {}
+        self.open: Dict[str, bool] = {}
+        self.loaded_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.open)
+
+    async def start(self):
+        """
+        Load the asset lists and start the background refresh
+
+        Raises:
+            APIError: If the first load fails
+        """
+        await self.refresh()
+        self._task = asyncio.ensure_future(self._refresh_loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refresh(self):
+        """Fetch asset_index and active_symbols and swap in new maps"""
+        async with self.pool.lease() as api:
+            # Straight to the API: the SDK cache would return the first answer forever
+            assets = await api.asset_index({"asset_index": 1})
+            active = await api.active_symbols({"active_symbols": "brief"})
+        self.load(assets.get("asset_index", []), active.get("active_symbols", []))
+
+    def load(self, asset_index: Iterable[List[Any]], active_symbols: Iterable[Dict[str, Any]]):
+        """
+        Build the lookup maps from API results
+
+        Args:
+            asset_index: ``asset_index`` rows, ``[symbol, display_name, contracts]``
+            active_symbols: ``active_symbols`` records
+        """
+        names: Dict[str, str] = {}
+        is_open: Dict[str, bool] = {}
+        for row in asset_index:
+            names[str(row[0])] = str(row[1]) if len(row) > 1 else ""
+            is_open.setdefault(str(row[0]), True)
+        for record in active_symbols:
+            symbol = str(record["symbol"])
+            names.setdefault(symbol, str(record.get("display_name", "")))
+            is_open[symbol] = bool(record.get("exchange_is_open", 1)) and not record.get("is_trading_suspended")
+
+        symbols: Dict[str, str] = {}
+        # Open markets claim a shared alias before closed ones
+        for symbol in sorted(names, key=lambda s: not is_open[s]):
+            symbols.setdefault(symbol, symbol)
+            aliases = [symbol, names[symbol]]
+            aliases += [symbol[len(p):] for p in _SYMBOL_PREFIXES if symbol.startswith(p)]
+            for alias in aliases:
+                key = normalize_asset(alias)
+                if key:
+                    symbols.setdefault(key, symbol)
+        self.symbols, self.open = symbols, is_open
+        self.loaded_at = time.time()
+        logger.info(f"Deriv asset index loaded: {len(is_open)} symbols, {len(symbols)} aliases")
+
+    def resolve(self, asset: str) -> Optional[str]:
+        """
+        Deriv symbol for a signal's asset
+
+        Exact and normalized names are single dict lookups. An unknown name
+        falls back to the first symbol containing it, and the answer (a
+        miss included) is remembered until the next refresh.
+
+        Args:
+            asset: Asset name from a signal
+
+        Returns:
+            Optional[str]: Deriv symbol, or None if there is none
+        """
+        symbol = self.symbols.get(asset)
+        if symbol is not None or asset in self.symbols:
+            return symbol
+        key = normalize_asset(asset)
+        symbol = self.symbols.get(key)
+        if symbol is None and key not in self.symbols:
+            symbol = next((s for s in self.open if key and key in normalize_asset(s)), None)
+        self.symbols[asset] = symbol
+        return symbol
+
+    def is_open(self, symbol: str) -> bool:
+        """Whether the symbol's market was open at the last refresh"""
+        return self.open.get(symbol, False)
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.ttl)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Deriv asset index refresh failed, keeping the previous one: {e!r}")
+
+
+def contract_parameters(
+    symbol: str, amount: float, contract_type: str, duration: int, currency: str = "USD"
+) -> Dict[str, Any]:
+    """
+    Stake-based contract parameters, as sent in a proposal or a buy
+
+    Args:
+        symbol: Deriv symbol
+        amount: Stake
+        contract_type: CALL or PUT
+        duration: Seconds
+        currency: Account currency
+
+    Returns:
+        Dict: Parameters
+    """
+    return {
+        "amount": amount, "basis": "stake", "contract_type": contract_type, "currency": currency,
+        "duration": int(duration), "duration_unit": "s", "symbol": symbol,
+    }
+
+
+def max_price(parameters: Dict[str, Any]) -> int:
+    """
+    ``price`` for a buy: the most we pay for the contract
+
+    The SDK truncates ``price`` to an integer, which would put a fractional
+    stake's price below its ask; rounding up keeps the buy valid (a stake
+    contract costs its stake).
+    """
+    return math.ceil(parameters["amount"])
+
+
+async def buy_contract(api: Any, parameters: Dict[str, Any], mode: str = BUY_DIRECT) -> Dict[str, Any]:
+    """
+    Buy a contract on an authorized session
+
+    Args:
+        api: DerivAPI session
+        parameters: From contract_parameters()
+        mode: BUY_PROPOSAL (proposal, then buy) or BUY_DIRECT (one buy request)
+
+    Returns:
+        Dict: The ``buy`` record (contract_id, buy_price, ...)
+    """
+    if mode == BUY_PROPOSAL:
+        proposal = await api.proposal({"proposal": 1, **parameters})
+        response = await api.buy({"buy": proposal["proposal"]["id"], "price": max_price(parameters)})
+    else:
+        response = await api.buy({"buy": 1, "price": max_price(parameters), "parameters": parameters})
+    return response["buy"]
+
+
+class _ProposalStream:
+    """One proposal subscription and its latest proposal ID"""
+
+    def __init__(self):
+        self.proposal_id: Optional[str] = None
+        self.disposable: Any = None
+
+    def update(self, response: Dict[str, Any]):
+        self.proposal_id = response["proposal"]["id"]
+
+    def dispose(self):
+        """Unsubscribe; the SDK sends the ``forget``"""
+        if self.disposable is not None:
+            self.disposable.dispose()
+            self.disposable = None
+
+
+class DerivProposalStreams:
+    """
+    Live proposals for the most recently traded contracts.
+
+    Every bought contract's parameters get a proposal subscription on a
+    dedicated session, so the next identical order buys the streamed
+    proposal ID in one round trip without waiting for a quote. Deriv ends a
+    proposal subscription once it is bought, so it is opened again for the
+    order after that. Only the ``max_streams`` most recently traded contracts
+    are kept.
+
+    Args:
+        token: Deriv API token
+        max_streams: Subscriptions kept open
+        **options: Passed to DerivAPI (app_id, endpoint, ...)
+    """
+
+    def __init__(self, token: str, max_streams: int = MAX_STREAMS, **options: Any):
+        self.pool = DerivSessionPool(token, size=1, **options)
+        self.max_streams = max_streams
+        self.hits = 0
+        self.misses = 0
+        self._streams: "OrderedDict[Tuple, _ProposalStream]" = OrderedDict()
+        self._api: Any = None
+        self._tags = itertools.count(1)
+
+    async def start(self):
+        await self.pool.start()
+
+    async def close(self):
+        for stream in self._streams.values():
+            stream.dispose()
+        self._streams.clear()
+        await self.pool.close()
+
+    async def buy(self, parameters: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """
+        Buy a contract, from a live proposal when there is one
+
+        Args:
+            parameters: From contract_parameters()
+
+        Returns:
+            Tuple[Dict, str]: The ``buy`` record and BUY_STREAM or BUY_DIRECT
+        """
+        api = self._session()
+        key = tuple(sorted(parameters.items()))
+        stream = self._streams.pop(key, None)
+        self._watch(api, key, parameters)
+        response = None
+        if stream is not None and stream.proposal_id is not None:
+            try:
+                response = await api.buy({"buy": stream.proposal_id, "price": max_price(parameters)})
+            except Exception as e:
+                if not hasattr(e, "code"):
+                    raise
+                # Quote expired or moved: fall through to a direct buy
+                logger.debug(f"Streamed proposal {stream.proposal_id} rejected: {e}")
+        if stream is not None:
+            stream.dispose()
+        if response is not None:
+            self.hits += 1
+            return response["buy"], BUY_STREAM
+        self.misses += 1
+        return await buy_contract(api, parameters, BUY_DIRECT), BUY_DIRECT
+
+    def _session(self) -> Any:
+        """The streaming session; subscriptions on a replaced session are dropped"""
+        api = self.pool.sessions[0] if self.pool.sessions else None
+        if api is None or not api.connected.is_resolved():
+            raise ConnectionError("Deriv streaming session is reconnecting")
+        if api is not self._api:
+            for stream in self._streams.values():
+                stream.dispose()
+            self._streams.clear()
+            self._api = api
+        return api
+
+    def _watch(self, api: Any, key: Tuple, parameters: Dict[str, Any]):
+        """Open a proposal subscription for ``key`` and evict the least recently traded"""
+        stream = _ProposalStream()
+        self._streams[key] = stream
+        while len(self._streams) > self.max_streams:
+            _, old = self._streams.popitem(last=False)
+            old.dispose()
+        asyncio.ensure_future(self._subscribe(api, key, stream, parameters))
+
+    async def _subscribe(self, api: Any, key: Tuple, stream: _ProposalStream, parameters: Dict[str, Any]):
+        # A fresh passthrough tag keeps the SDK from handing back the finished source of a bought proposal
+        request = {"proposal": 1, **parameters, "passthrough": {"stream": next(self._tags)}}
+
+        def failed(error):
+            logger.debug(f"Proposal stream {parameters['symbol']} ended: {error}")
+            if self._streams.get(key) is stream:
+                del self._streams[key]
+
+        try:
+            source = await api.subscribe(request)
+            stream.disposable = source.subscribe(on_next=stream.update, on_error=failed)
+            if self._streams.get(key) is not stream:
+                stream.dispose()
+        except Exception as e:
+            failed(e)
+
+
+class DerivContractFeed:
+    """
+    New contracts on an account, as Deriv pushes them.
+
+    One pooled session carries two subscriptions: ``proposal_open_contract``
+    without a contract ID (every open contract of the account, pushed on
+    each update) and ``transaction``. The first update of each contract is
+    queued with its arrival time. A ``buy`` transaction whose contract has
+    not shown up yet is looked up with one proposal_open_contract request,
+    so whichever stream reports a contract first wins. When the pool
+    replaces the session both subscriptions are opened again; Deriv then
+    reports the contracts still open, and the consumer's staleness check
+    decides whether those are still worth copying::
+
+        feed = DerivContractFeed(token, app_id=1089)
+        await feed.start()
+        async for contract, received_at in feed:
+            ...
+
+    Args:
+        token: Deriv API token
+        queue_size: Contracts waiting for the consumer before new ones are dropped
+        **options: Passed to DerivAPI (app_id, endpoint, ...)
+    """
+
+    def __init__(self, token: str, queue_size: int = CONTRACT_QUEUE_SIZE, **options: Any):
+        self.pool = DerivSessionPool(token, size=1, **options)
+        self.queue_size = queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.delivered = 0
+        self.dropped = 0
+        self.lookups = 0
+        self.resubscribes = 0
+        self._known: "OrderedDict[str, None]" = OrderedDict()
+        self._api: Any = None
+        self._disposables: List[Any] = []
+        self._tags = itertools.count(1)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def start(self):
+        """
+        Open the session and both subscriptions
+
+        Raises:
+            ConnectionError: If the session could not be opened or authorized
+        """
+        self.queue = asyncio.Queue(self.queue_size)
+        await self.pool.start()
+        self._subscribe(self.pool.sessions[0])
+        self._spawn(self._watch())
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._dispose()
+        await self.pool.close()
+
+    def __aiter__(self) -> "DerivContractFeed":
+        return self
+
+    async def __anext__(self) -> Tuple[Dict[str, Any], float]:
+        """The next new contract and the time (epoch seconds) it arrived"""
+        return await self.queue.get()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "lookups": self.lookups,
+            "resubscribes": self.resubscribes,
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+        }
+
+    def _subscribe(self, api: Any):
+        """Move both subscriptions to ``api``"""
+        self._dispose()
+        self._api = api
+        # A fresh passthrough tag keeps the SDK from handing back a source that already failed
+        tag = {"feed": next(self._tags)}
+        for request, handler in (
+            ({"proposal_open_contract": 1}, self._on_contract),
+            ({"transaction": 1}, self._on_transaction),
+        ):
+            self._spawn(self._open(api, dict(request, passthrough=tag), handler))
+
+    async def _open(self, api: Any, request: Dict[str, Any], handler):
+        def failed(error):
+            logger.warning(f"Deriv {next(iter(request))} stream ended, resubscribing: {error}")
+            if self._api is api:
+                self._api = None
+
+        try:
+            source = await api.subscribe(request)
+        except Exception as e:
+            failed(e)
+            return
+        if self._api is not api:
+            return
+        self._disposables.append(source.subscribe(on_next=handler, on_error=failed))
+
+    def _dispose(self):
+        """Unsubscribe; the SDK sends the ``forget``"""
+        disposables, self._disposables = self._disposables, []
+        for disposable in disposables:
+            disposable.dispose()
+
+    def _on_contract(self, response: Dict[str, Any]):
+        if response.get("error"):
+            # Errors of the all-contracts stream arrive as messages and leave it open
+            logger.debug(f"Deriv contract update error: {response['error'].get('message')}")
+            return
+        contract = response.get("proposal_open_contract") or {}
+        if contract.get("contract_id"):
+            self._deliver(contract)
+
+    def _on_transaction(self, response: Dict[str, Any]):
+        transaction = response.get("transaction") or {}
+        contract_id = transaction.get("contract_id")
+        if transaction.get("action") == "buy" and contract_id and str(contract_id) not in self._known:
+            self._spawn(self._lookup(self._api, contract_id))
+
+    async def _lookup(self, api: Any, contract_id: Any):
+        """Fetch a contract announced by its buy transaction"""
+        self.lookups += 1
+        try:
+            response = await asyncio.wait_for(
+                api.proposal_open_contract({"proposal_open_contract": 1, "contract_id": contract_id}),
+                self.pool.timeout,
+            )
+        except Exception as e:
+            logger.debug(f"Deriv contract {contract_id} lookup failed: {e!r}")
+            return
+        contract = response.get("proposal_open_contract") or {}
+        if contract.get("contract_id"):
+            self._deliver(contract)
+
+    def _deliver(self, contract: Dict[str, Any]):
+        key = str(contract["contract_id"])
+        if key in self._known:
+            return
+        self._known[key] = None
+        while len(self._known) > KEEP_CONTRACTS:
+            self._known.popitem(last=False)
+        try:
+            self.queue.put_nowait((contract, time.time()))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Deriv contract feed full, dropped contract {key}")
+            return
+        self.delivered += 1
+
+    async def _watch(self):
+        """Follow the pool's session: hurry the replacement of a dropped one and resubscribe on the new one"""
+        while True:
+            await asyncio.sleep(WATCH_INTERVAL)
+            api = self.pool.sessions[0] if self.pool.sessions else None
+            if api is None:
+                # The pool is reconnecting with backoff
+                continue
+            if not api.connected.is_resolved():
+                # The socket closed; replace it now rather than at the next health ping
+                self.pool._retire(api)
+                continue
+            if api is not self._api:
+                self.resubscribes += 1
+                logger.info("Deriv contract feed resubscribing")
+                self._subscribe(api)
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,250 @@
+"""
+Single-process multi-broker copy engine
+
+Every master and follower account in the config runs as an asyncio task in
+one process. Masters push signals onto an in-memory queue; the router drops
+duplicates and signals whose trade has too little time left (read on the
+master broker's clock, see copytrade.timesync), appends each signal to the
+audit journal (copytrade.journal) and hands it to the fan-out dispatcher, so
+a signal never crosses a process boundary between detection and order
+placement.
+
+With no masters in the config the engine only serves followers: signals come
+from the standalone masters over ``source`` (bus, shm or file, as
+open_signal_source), so one process replaces a client script per account.
+
+Config (``settings/engine.json``)::
+
+    {
+      "staleness": 15,
+      "audit_path": "orders.log",
+      "latency_interval": 60,
+      "latency_dump": "settings/latency/engine.json",
+      "masters": [
+        {"name": "miq", "broker": "iqoption", "email": "...", "password": "...", "balance": "PRACTICE"}
+      ],
+      "followers": [
+        {"name": "cpo", "broker": "pocketoption", "ssid": "...", "demo": true},
+        {"name": "cdr", "broker": "deriv", "token": "...", "app_id": 1089, "sessions": 2, "buy_mode": "direct",
+         "max_in_flight": 2, "stake_scale": 0.5, "min_stake": 1}
+      ]
+    }
+"""
+
+import asyncio
+import json
+import time
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from .brokers import FOLLOWERS, MASTERS, Follower, Master
+from .bus import DEFAULT_TRANSPORT, open_signal_source
+from .dedup import SAVE_INTERVAL, SeenIds
+from .fanout import FanOutDispatcher
+from .journal import SignalJournal
+from .latency import LatencyTracker, mark
+from .signals import Signal
+from .timesync import time_sync
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = "settings/engine.json"
+QUEUE_SIZE = 1024
+
+
+def load_config(path: str = DEFAULT_CONFIG_PATH) -> Dict[str, Any]:
+    """
+    Read and validate the engine config
+
+    Args:
+        path: JSON config file
+
+    Returns:
+        Dict[str, Any]: Parsed config
+
+    Raises:
+        ValueError: If an account names an unknown broker or the names are not unique
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    names: Set[str] = set()
+    for role, known in (("masters", MASTERS), ("followers", FOLLOWERS)):
+        for account in config.setdefault(role, []):
+            if account.get("broker") not in known:
+                raise ValueError(f"Unknown {role[:-1]} broker {account.get('broker')!r}, expected one of {sorted(known)}")
+            account.setdefault("name", account["broker"])
+            if account["name"] in names:
+                raise ValueError(f"Duplicate account name {account['name']!r}, give each account a unique name")
+            names.add(account["name"])
+    return config
+
+
+class CopyEngine:
+    """
+    Runs masters and followers in one event loop.
+
+    Args:
+        masters: Master adapters (empty to read signals from ``source``)
+        followers: Follower adapters, any number per broker
+        staleness: Age limit, seconds, for signals that carry no expiry
+        audit_path: Journal every routed master signal is appended to (None disables)
+        queue_size: Capacity of the router queue
+        latency: Tracker the per-order stage latencies are recorded in
+        source: Transport to read signals from when there are no masters
+            (defaults to SIGNAL_TRANSPORT)
+    """
+
+    def __init__(
+        self,
+        masters: List[Master],
+        followers: List[Follower],
+        staleness: float = 15.0,
+        audit_path: Optional[str] = "orders.log",
+        queue_size: int = QUEUE_SIZE,
+        latency: Optional[LatencyTracker] = None,
+        source: Optional[str] = None,
+    ):
+        self.masters = masters
+        self.followers = followers
+        self.staleness = staleness
+        self.clock = time_sync()
+        self.audit_path = audit_path
+        self.queue_size = queue_size
+        self.latency = latency or LatencyTracker("engine")
+        self.source = source
+        self.dispatcher = FanOutDispatcher(followers, latency=self.latency, staleness=staleness)
+        self._signals: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._seen = SeenIds(ttl=60)
+        self._audit = None
+        # Router counters: handed to the dispatcher, dropped as duplicates, dropped as stale
+        self.routed = 0
+        self.duplicates = 0
+        self.stale = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "CopyEngine":
+        """Build the adapters named in a config from load_config"""
+        return cls(
+            masters=[MASTERS[a["broker"]](a["name"], a) for a in config["masters"]],
+            followers=[FOLLOWERS[a["broker"]](a["name"], a) for a in config["followers"]],
+            staleness=float(config.get("staleness", 15.0)),
+            audit_path=config.get("audit_path", "orders.log"),
+            latency=LatencyTracker(
+                "engine",
+                interval=float(config.get("latency_interval", 60.0)),
+                dump_path=config.get("latency_dump", "settings/latency/engine.json"),
+            ),
+            source=config.get("source"),
+        )
+
+    def emit(self, signal: Signal):
+        """Hand a master signal to the router (called from the event loop)"""
+        try:
+            self._signals.put_nowait(signal)
+        except asyncio.QueueFull:
+            logger.error(f"Router queue full, dropping signal {signal.id}")
+
+    async def start(self):
+        """Connect every account and start the master, router and follower tasks"""
+        self._signals = asyncio.Queue(self.queue_size)
+        if self.audit_path and self.masters:
+            self._audit = SignalJournal(self.audit_path)
+        results = await asyncio.gather(*(m.connect() for m in self.masters), return_exceptions=True)
+        for master, result in zip(self.masters, results):
+            if isinstance(result, BaseException):
+                raise ConnectionError(f"[{master.name}] {result}") from result
+            logger.info(f"[{master.name}] connected to {master.broker}")
+        await self.dispatcher.start()
+        self._tasks.append(asyncio.ensure_future(self._route()))
+        self._tasks.append(asyncio.ensure_future(self._report()))
+        for master in self.masters:
+            self._tasks.append(asyncio.ensure_future(self._watch(master)))
+        if self.masters:
+            self._tasks.append(asyncio.ensure_future(self._save_seen()))
+        if not self.masters:
+            self._tasks.append(asyncio.ensure_future(self._read_source()))
+
+    async def run(self):
+        """Start the engine and run until cancelled"""
+        await self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Cancel all tasks and disconnect every account"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        await self.dispatcher.stop()
+        await asyncio.gather(*(m.close() for m in self.masters), return_exceptions=True)
+        for master in self.masters:
+            master.seen.close()
+        if self._audit is not None:
+            self._audit.close()
+            self._audit = None
+
+    async def _report(self):
+        """Log the latency and account summaries and refresh the dump every interval"""
+        while True:
+            await asyncio.sleep(self.latency.interval)
+            report = self.latency.report()
+            if report:
+                logger.info(report + "\n" + self.dispatcher.summary())
+
+    async def _save_seen(self):
+        """Write the masters' seen-ID snapshots that a burst of trades left unsaved"""
+        while True:
+            await asyncio.sleep(SAVE_INTERVAL)
+            for master in self.masters:
+                master.seen.flush()
+
+    async def _watch(self, master: Master):
+        """Run a master, restarting it after errors"""
+        while True:
+            try:
+                await master.run(self.emit)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[{master.name}] {e}, restarting in 1s")
+                await asyncio.sleep(1)
+
+    async def _read_source(self):
+        """Feed signals from the standalone masters to the router"""
+        source = await open_signal_source("engine", transport=self.source or DEFAULT_TRANSPORT)
+        logger.info(f"Reading signals from {type(source).__name__}")
+        try:
+            while True:
+                for signal in await source.poll(0.5):
+                    mark(signal, "receive")
+                    self.emit(signal)
+        finally:
+            closed = source.close()
+            if asyncio.iscoroutine(closed):
+                await closed
+
+    async def _route(self):
+        """Hand each new, fresh signal to the dispatcher"""
+        while True:
+            signal = await self._signals.get()
+            # Kept until the trade expires: a signal stays fresh for half its duration
+            if not self._seen.add((signal.broker, signal.id), expires_at=signal.expiry):
+                self.duplicates += 1
+                continue
+            if not self.clock.fresh(signal, signal.broker, self.staleness):
+                self.stale += 1
+                remaining = self.clock.remaining(signal, signal.broker)
+                if remaining is None:
+                    logger.warning(f"Signal {signal.id} is {time.time() - signal.stamp:.1f}s old, not copying")
+                else:
+                    logger.warning(f"Signal {signal.id} has {remaining:.1f}s of {signal.duration}s left, not copying")
+                continue
+            if self._audit is not None:
+                mark(signal, "publish")
+                self._audit.append(signal)
+            self.routed += 1
+            self.dispatcher.submit(signal)
@@ -0,0 +1,206 @@
+"""
+Bounded order dispatch on the client's own event loop
+
+The copy clients used to start a thread per order only to hand the order
+coroutine back to the loop with ``run_coroutine_threadsafe``. The executor
+schedules the coroutine as a task directly: at most ``max_concurrent``
+orders run at once (the rest wait for a slot in arrival order), each order
+is cancelled once its ``deadline`` passes, and the outcome of every order
+is collected for the caller to report with ``drain()``.
+
+With an ``admission`` controller (copytrade.admission) an order first waits
+for the broker's rate limit, nearest ``not_after`` first, and is dropped
+unsent if that time passes while it waits.
+"""
+
+import asyncio
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from .admission import AdmissionController, AdmissionExpired
+from .latency import mark
+from .signals import Signal
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT = 8
+DEADLINE = 30.0
+MAX_RESULTS = 1024
+
+
+@dataclass
+class OrderOutcome:
+    """What happened to one submitted order"""
+
+    key: str
+    ok: bool
+    result: Any = None
+    error: Optional[BaseException] = None
+    waited: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def timed_out(self) -> bool:
+        return isinstance(self.error, asyncio.TimeoutError)
+
+    @property
+    def expired(self) -> bool:
+        return isinstance(self.error, AdmissionExpired)
+
+    def describe(self) -> str:
+        """One line for the client's console"""
+        if self.ok:
+            return f"Order {self.key} done in {self.elapsed * 1000:.0f} ms (waited {self.waited * 1000:.0f} ms)"
+        if self.timed_out:
+            return f"Order {self.key} cancelled after {self.elapsed:.1f}s"
+        if self.expired:
+            return f"Order {self.key} not sent: {self.error}"
+        return f"Order {self.key} failed: {self.error}"
+
+
+class OrderExecutor:
+    """
+    Runs order coroutines as tasks with a concurrency cap and a per-order deadline.
+
+    Args:
+        max_concurrent: Orders executing at once; later ones wait for a slot
+        deadline: Seconds from submission after which an order is cancelled
+            (time spent waiting for a slot counts)
+        max_results: Outcomes kept until the next ``drain()``
+        admission: Broker admission controller orders wait for before taking a slot
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT, deadline: float = DEADLINE,
+                 max_results: int = MAX_RESULTS, admission: Optional[AdmissionController] = None):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.deadline = deadline
+        self.admission = admission
+        self.outcomes: Deque[OrderOutcome] = deque(maxlen=max_results)
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.expired = 0
+        self.running = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Orders submitted and not finished yet (running or waiting for a slot)"""
+        return len(self._tasks)
+
+    def submit(self, key: str, order: Callable[[], Awaitable[Any]], deadline: Optional[float] = None,
+               not_after: Optional[float] = None, signal: Optional[Signal] = None) -> "asyncio.Task":
+        """
+        Schedule an order (must be called from the event loop's thread)
+
+        Args:
+            key: Order ID used in the outcome and log lines
+            order: Zero-argument callable returning the order coroutine; it is
+                only called once a slot is free, so a cancelled order never starts
+            deadline: Override of the executor's deadline for this order
+            not_after: Epoch seconds after which the order is no longer worth
+                admitting (see ``TimeSyncService.deadline``)
+            signal: Signal the order copies; ``admit`` is stamped on it
+
+        Returns:
+            asyncio.Task: Resolves to the order's ``OrderOutcome``
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        self.submitted += 1
+        task = asyncio.ensure_future(
+            self._run(key, order, self.deadline if deadline is None else deadline, not_after, signal)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, key: str, order: Callable[[], Awaitable[Any]], deadline: float,
+                   not_after: Optional[float], signal: Optional[Signal]) -> OrderOutcome:
+        submitted = time.perf_counter()
+        outcome = OrderOutcome(key, False)
+        try:
+            await asyncio.wait_for(self._admit(order, outcome, submitted, not_after, signal), deadline)
+            outcome.ok = True
+            self.succeeded += 1
+        except asyncio.TimeoutError as e:
+            outcome.error = e
+            self.timed_out += 1
+            logger.debug(f"Order {key} cancelled after its {deadline:.1f}s deadline")
+        except AdmissionExpired as e:
+            outcome.error = e
+            self.expired += 1
+            logger.debug(f"Order {key} not admitted: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            outcome.error = e
+            self.failed += 1
+            logger.debug(f"Order {key} failed: {e!r}")
+        outcome.elapsed = time.perf_counter() - submitted
+        self.outcomes.append(outcome)
+        return outcome
+
+    async def _admit(self, order: Callable[[], Awaitable[Any]], outcome: OrderOutcome, submitted: float,
+                     not_after: Optional[float], signal: Optional[Signal]):
+        if self.admission is None:
+            return await self._execute(order, outcome, submitted)
+        await self.admission.admit(not_after)
+        if signal is not None:
+            mark(signal, "admit")
+        try:
+            await self._execute(order, outcome, submitted)
+        finally:
+            self.admission.release()
+
+    async def _execute(self, order: Callable[[], Awaitable[Any]], outcome: OrderOutcome, submitted: float):
+        async with self._slots:
+            outcome.waited = time.perf_counter() - submitted
+            self.running += 1
+            try:
+                outcome.result = await order()
+            finally:
+                self.running -= 1
+
+    def drain(self) -> List[OrderOutcome]:
+        """Outcomes collected since the last call, oldest first"""
+        outcomes = list(self.outcomes)
+        self.outcomes.clear()
+        return outcomes
+
+    async def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for every submitted order to finish
+
+        Returns:
+            bool: False if ``timeout`` passed first
+        """
+        if not self._tasks:
+            return True
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        return not pending
+
+    async def close(self, timeout: Optional[float] = 5.0):
+        """Let running orders finish for up to ``timeout`` seconds, then cancel the rest"""
+        if not await self.join(timeout):
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "expired": self.expired,
+            "running": self.running,
+            "pending": self.pending,
+        }
@@ -0,0 +1,255 @@
+"""
+Fan-out of every signal to many follower accounts
+
+The dispatcher holds one authenticated session per follower account (any
+number per broker) and submits each signal to all of them at once. Each
+account has a bounded queue served by ``max_in_flight`` workers, so a slow
+account never holds more than that many orders open at its broker and never
+delays the other accounts. Stakes are scaled per account.
+
+Each account's orders also pass its broker's admission controller
+(copytrade.admission), so a burst is sent within the broker's rate limit
+instead of being refused by it. Queued signals are served nearest deadline
+first (the time the trade stops being fresh on the follower broker's clock)
+and a signal whose deadline passes before it is admitted is counted as
+expired rather than copied late.
+
+Per-account settings (from the follower's config entry)::
+
+    max_in_flight  orders open at the broker at once (default 2)
+    queue_size     signals waiting for a worker before new ones are dropped (default 64)
+    stake_scale    multiplier applied to the master's amount (default 1.0)
+    min_stake      lower bound after scaling (optional)
+    max_stake      upper bound after scaling (optional)
+    rate_limit     orders per minute (default: the broker's, see copytrade.admission)
+    max_concurrent_orders  orders admitted at once (default: the broker's)
+    burst          orders sent back to back after an idle spell (default: max_concurrent_orders)
+"""
+
+import asyncio
+import itertools
+import time
+import logging
+from collections import deque
+from dataclasses import replace
+from typing import Any, Deque, Dict, List, Optional
+
+from .admission import AdmissionController, AdmissionExpired
+from .brokers import Follower
+from .latency import LatencyTracker, mark, percentiles, stage_times
+from .signals import Signal
+from .timesync import FALLBACK_STALENESS, time_sync
+
+logger = logging.getLogger(__name__)
+
+MAX_IN_FLIGHT = 2
+ACCOUNT_QUEUE_SIZE = 64
+WINDOW = 1024
+
+
+class FollowerAccount:
+    """Deadline-ordered queue, admission, workers and counters of one follower account"""
+
+    def __init__(self, follower: Follower):
+        settings = follower.settings
+        self.follower = follower
+        self.max_in_flight = int(settings.get("max_in_flight", MAX_IN_FLIGHT))
+        self.stake_scale = float(settings.get("stake_scale", 1.0))
+        self.min_stake: Optional[float] = settings.get("min_stake")
+        self.max_stake: Optional[float] = settings.get("max_stake")
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue(int(settings.get("queue_size", ACCOUNT_QUEUE_SIZE)))
+        self.admission = AdmissionController.for_broker(follower.broker, settings)
+        self.workers: List[asyncio.Task] = []
+        self.connected = False
+        self.submitted = 0
+        self.placed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.expired = 0
+        self.in_flight = 0
+        self.latencies: Deque[float] = deque(maxlen=WINDOW)
+
+    @property
+    def name(self) -> str:
+        return self.follower.name
+
+    def stake(self, amount: float) -> float:
+        """Scale and clamp the master's amount for this account"""
+        stake = amount * self.stake_scale
+        if self.min_stake is not None:
+            stake = max(stake, float(self.min_stake))
+        if self.max_stake is not None:
+            stake = min(stake, float(self.max_stake))
+        return round(stake, 2)
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95, p99 = percentiles(self.latencies) if self.latencies else (0.0, 0.0, 0.0)
+        return {
+            "broker": self.follower.broker,
+            "connected": self.connected,
+            "submitted": self.submitted,
+            "placed": self.placed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "expired": self.expired,
+            "in_flight": self.in_flight,
+            "queued": self.queue.qsize(),
+            "admission": self.admission.stats(),
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+        }
+
+
+class FanOutDispatcher:
+    """
+    Submits each signal to every connected follower account.
+
+    Args:
+        followers: Follower adapters, one per account
+        latency: Tracker the per-order stage latencies are recorded in
+        staleness: Age limit, seconds, for signals that carry no expiry
+    """
+
+    def __init__(self, followers: List[Follower], latency: Optional[LatencyTracker] = None,
+                 staleness: float = FALLBACK_STALENESS):
+        self.accounts = [FollowerAccount(f) for f in followers]
+        self.latency = latency or LatencyTracker("fanout")
+        self.staleness = staleness
+        self.clock = time_sync()
+        self._order = itertools.count()
+        self._started = 0.0
+
+    async def start(self):
+        """
+        Connect all accounts concurrently and start their workers
+
+        Accounts that fail to connect are logged and left out.
+
+        Raises:
+            ConnectionError: If no account could connect
+        """
+        results = await asyncio.gather(*(a.follower.connect() for a in self.accounts), return_exceptions=True)
+        for account, result in zip(self.accounts, results):
+            if isinstance(result, BaseException):
+                logger.error(f"[{account.name}] not connected: {result}")
+                continue
+            account.connected = True
+            account.workers = [
+                asyncio.ensure_future(self._work(account)) for _ in range(account.max_in_flight)
+            ]
+            logger.info(f"[{account.name}] connected to {account.follower.broker}")
+        if self.accounts and not any(a.connected for a in self.accounts):
+            raise ConnectionError("No follower account could connect")
+        self._started = time.time()
+
+    async def stop(self):
+        """Cancel the workers and disconnect every account"""
+        workers = [w for a in self.accounts for w in a.workers]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        await asyncio.gather(*(a.follower.close() for a in self.accounts if a.connected), return_exceptions=True)
+        for account in self.accounts:
+            account.workers = []
+            account.connected = False
+
+    def submit(self, signal: Signal) -> int:
+        """
+        Queue a signal for every connected account (never blocks)
+
+        Args:
+            signal: Signal to copy
+
+        Returns:
+            int: Number of accounts the signal was queued for
+        """
+        queued = 0
+        stamps = stage_times(signal)
+        for account in self.accounts:
+            if not account.connected:
+                continue
+            # Each account stamps its own stages and may use its own stake
+            copy = replace(signal, amount=account.stake(signal.amount), extra={**signal.extra, "t": dict(stamps)})
+            if "receive" not in stamps:
+                mark(copy, "receive")
+            account.submitted += 1
+            deadline = self.clock.deadline(copy, account.follower.broker, self.staleness)
+            try:
+                account.queue.put_nowait((deadline, next(self._order), copy))
+                queued += 1
+            except asyncio.QueueFull:
+                account.dropped += 1
+                logger.error(f"[{account.name}] {account.queue.qsize()} signals waiting, dropping {signal.id}")
+        return queued
+
+    async def _work(self, account: FollowerAccount):
+        """Place the account's queued signals, nearest deadline first, one at a time per worker"""
+        follower = account.follower
+        while True:
+            deadline, _, signal = await account.queue.get()
+            try:
+                await account.admission.admit(deadline)
+            except AdmissionExpired as e:
+                account.expired += 1
+                logger.warning(f"[{account.name}] not copying {signal.id}: {e}")
+                continue
+            mark(signal, "admit")
+            account.in_flight += 1
+            start = mark(signal, "send")
+            try:
+                ok, info = await follower.execute(signal)
+            except Exception as e:
+                ok, info = False, e
+            finally:
+                account.in_flight -= 1
+                account.admission.release()
+            elapsed = mark(signal, "ack") - start
+            if ok:
+                account.placed += 1
+                account.latencies.append(elapsed)
+                self.latency.record(signal, follower.broker)
+                logger.info(f"[{account.name}] copied {signal.id} ({signal.amount}) as {info} in {elapsed * 1000:.0f} ms")
+            else:
+                account.failed += 1
+                logger.error(f"[{account.name}] failed to copy {signal.id}: {info}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-account and aggregate counters
+
+        Returns:
+            Dict: ``{"accounts": {name: {...}}, "total": {...}}``; latencies in seconds
+        """
+        accounts = {a.name: a.stats() for a in self.accounts}
+        samples = [s for a in self.accounts for s in a.latencies]
+        elapsed = time.time() - self._started if self._started else 0.0
+        placed = sum(a.placed for a in self.accounts)
+        p50, p95, p99 = percentiles(samples) if samples else (0.0, 0.0, 0.0)
+        total = {
+            "accounts": sum(a.connected for a in self.accounts),
+            "submitted": sum(a.submitted for a in self.accounts),
+            "placed": placed,
+            "failed": sum(a.failed for a in self.accounts),
+            "dropped": sum(a.dropped for a in self.accounts),
+            "expired": sum(a.expired for a in self.accounts),
+            "in_flight": sum(a.in_flight for a in self.accounts),
+            "orders_per_s": placed / elapsed if elapsed else 0.0,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+        }
+        return {"accounts": accounts, "total": total}
+
+    def summary(self) -> str:
+        """Account table with send->ack latency in milliseconds"""
+        stats = self.stats()
+        lines = [f"  {'account':<20}{'broker':<14}{'placed':>8}{'failed':>8}{'dropped':>8}{'expired':>8}{'flight':>7}{'p50':>8}{'p95':>8}"]
+        rows = list(stats["accounts"].items()) + [("TOTAL", dict(stats["total"], broker=""))]
+        for name, s in rows:
+            lines.append(
+                f"  {name:<20}{s['broker']:<14}{s['placed']:>8}{s['failed']:>8}{s['dropped']:>8}{s['expired']:>8}{s['in_flight']:>7}"
+                f"{s['p50'] * 1e3:>8.1f}{s['p95'] * 1e3:>8.1f}"
+            )
+        lines.append(f"  {stats['total']['orders_per_s']:.2f} orders/s over {stats['total']['accounts']} accounts")
+        return "\n".join(lines)
@@ -0,0 +1,296 @@
+"""
+IQ Option order worker pool
+
+``IQ_Option.buy``/``buy_blitz`` reset the shared ``api.buy_multi_option``
+dict, read the shared ``api.result`` and busy-wait for the reply, so two
+orders placed at once overwrite each other's results and every waiting
+thread spins on the GIL. The pool places orders on the SDK's websocket
+channels itself: every order gets a unique request ID, its reply is taken
+from ``buy_multi_option[request_id]`` (the SDK's ``option`` handler files
+replies by request ID) without ever clearing the dict, and waiting sleeps
+instead of spinning.
+
+A fixed number of worker threads serve a bounded queue; ``submit()``
+returns a Future for the order (its result slot, also reachable by request
+ID through ``result()``) and raises ``queue.Full`` when the queue stays
+full, so a burst larger than the pool can absorb is refused instead of
+piling up behind stale orders.
+
+With an ``admission`` controller (copytrade.admission) orders first wait
+for IQ Option's rate limit on the caller's event loop, nearest ``deadline``
+first, and only admitted orders reach the workers. An order whose deadline
+passes while it waits resolves to ``(False, reason)`` without being sent.
+"""
+
+import asyncio
+import itertools
+import queue
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .admission import AdmissionController, AdmissionExpired
+from .latency import mark
+from .signals import Signal
+from .timesync import time_sync
+
+logger = logging.getLogger(__name__)
+
+WORKERS = 4
+QUEUE_SIZE = 32
+TIMEOUT = 5.0
+PAYOUT_TTL = 60.0
+# Durations above this many seconds are bought as turbo/binary options (in minutes), shorter ones as blitz
+BLITZ_MAX_DURATION = 300
+DEFAULT_PAYOUT = 85
+POLL_INTERVAL = 0.002
+# Finished slots kept for result() before the oldest are released
+KEEP_DONE = 256
+
+_request_ids = itertools.count(1)
+
+
+@dataclass
+class IQOrder:
+    """One order waiting for (or being placed by) a worker"""
+
+    request_id: str
+    asset: str
+    amount: float
+    direction: str
+    duration: float
+    signal: Optional[Signal] = None
+    slot: Future = field(default_factory=Future)
+    queued: float = field(default_factory=time.perf_counter)
+    deadline: Optional[float] = None
+    admitted: bool = False
+
+
+class IQOrderPool:
+    """
+    Places IQ Option orders from a fixed set of worker threads.
+
+    Args:
+        client: Connected ``IQ_Option`` instance
+        workers: Orders in flight at once
+        queue_size: Orders waiting for a worker before ``submit()`` refuses more
+        timeout: Seconds to wait for the broker's reply to an order
+        payout_ttl: Seconds the blitz payout table is reused before it is refreshed
+        admission: Rate limiter orders wait for before reaching a worker; ``submit()``
+            must then be called from the event loop's thread
+    """
+
+    def __init__(self, client, workers: int = WORKERS, queue_size: int = QUEUE_SIZE,
+                 timeout: float = TIMEOUT, payout_ttl: float = PAYOUT_TTL,
+                 admission: Optional[AdmissionController] = None):
+        self.client = client
+        self.workers = workers
+        self.timeout = timeout
+        self.payout_ttl = payout_ttl
+        self.admission = admission
+        self.queue: "queue.Queue[Optional[IQOrder]]" = queue.Queue(queue_size)
+        self.slots: Dict[str, Future] = {}
+        self.submitted = 0
+        self.placed = 0
+        self.failed = 0
+        self.refused = 0
+        self.expired = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._done: Deque[str] = deque()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._payouts: Dict[str, Dict[str, float]] = {}
+        self._payouts_at = 0.0
+        self._payout_lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads"""
+        for index in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._work, name=f"iq-order-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self, timeout: float = 5.0):
+        """Let queued orders finish, then stop the workers"""
+        for _ in self._threads:
+            self.queue.put(None)
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def submit(self, asset: str, amount: float, direction: str, duration: float,
+               signal: Optional[Signal] = None, block: bool = False, timeout: Optional[float] = None) -> Future:
+        """
+        Queue an order
+
+        Args:
+            asset: IQ Option asset name (a key of ``iqoptionapi.constants.ACTIVES``)
+            amount: Stake
+            direction: ``call`` or ``put``
+            duration: Seconds
+            signal: Signal the order copies; ``admit``/``send``/``ack`` are stamped on it
+            block: Wait for room in the queue instead of refusing at once (without admission)
+            timeout: With ``block``, seconds to wait for room
+
+        Returns:
+            Future: Resolves to ``(True, option_id)`` or ``(False, reason)``;
+            its request ID is in ``future.request_id``
+
+        Raises:
+            queue.Full: If the queue has no room
+        """
+        order = IQOrder(f"copy-{next(_request_ids)}", asset, amount, direction, duration, signal)
+        order.slot.request_id = order.request_id
+        if self.admission is not None and signal is not None:
+            order.deadline = time_sync().deadline(signal, "iqoption")
+        with self._lock:
+            self.slots[order.request_id] = order.slot
+        try:
+            if self.admission is None:
+                self.queue.put(order, block, timeout)
+            elif self.admission.waiting + self.queue.qsize() >= self.queue.maxsize:
+                raise queue.Full
+            else:
+                self._loop = asyncio.get_event_loop()
+                asyncio.ensure_future(self._admit(order))
+        except queue.Full:
+            with self._lock:
+                self.slots.pop(order.request_id, None)
+                self.refused += 1
+            raise
+        self.submitted += 1
+        return order.slot
+
+    async def _admit(self, order: IQOrder):
+        """Wait for the rate limit, then hand the order to a worker"""
+        try:
+            await self.admission.admit(order.deadline)
+        except AdmissionExpired as e:
+            with self._lock:
+                self.expired += 1
+                self.failed += 1
+                self._done.append(order.request_id)
+            if order.slot.set_running_or_notify_cancel():
+                order.slot.set_result((False, str(e)))
+            return
+        order.admitted = True
+        if order.signal is not None:
+            mark(order.signal, "admit")
+        # At most max_concurrent orders are admitted and unreleased, well under the queue size
+        self.queue.put_nowait(order)
+
+    def _release(self, order: IQOrder):
+        """Free an admitted order's admission slot (from a worker thread)"""
+        if order.admitted:
+            self._loop.call_soon_threadsafe(self.admission.release)
+
+    def result(self, request_id: str, timeout: Optional[float] = None) -> Tuple[bool, Any]:
+        """
+        Wait for an order's outcome and release its slot
+
+        Raises:
+            KeyError: If no pending order has this request ID
+            concurrent.futures.TimeoutError: If ``timeout`` passed first
+        """
+        with self._lock:
+            slot = self.slots[request_id]
+        outcome = slot.result(timeout)
+        with self._lock:
+            self.slots.pop(request_id, None)
+        return outcome
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "placed": self.placed,
+            "failed": self.failed,
+            "refused": self.refused,
+            "expired": self.expired,
+            "queued": self.queue.qsize(),
+            "pending": self.submitted - self.placed - self.failed,
+        }
+
+    def _work(self):
+        while True:
+            order = self.queue.get()
+            if order is None:
+                return
+            if not order.slot.set_running_or_notify_cancel():
+                # Cancelled while queued
+                with self._lock:
+                    self.slots.pop(order.request_id, None)
+                    self.failed += 1
+                self._release(order)
+                continue
+            try:
+                outcome = self._place(order)
+            except Exception as e:
+                outcome = (False, e)
+            finally:
+                self._release(order)
+            with self._lock:
+                if outcome[0]:
+                    self.placed += 1
+                else:
+                    self.failed += 1
+                self._done.append(order.request_id)
+                while len(self._done) > KEEP_DONE:
+                    self.slots.pop(self._done.popleft(), None)
+            order.slot.set_result(outcome)
+
+    def _place(self, order: IQOrder) -> Tuple[bool, Any]:
+        from iqoptionapi.constants import ACTIVES
+
+        api = self.client.api
+        active_id = ACTIVES.get(order.asset)
+        if active_id is None:
+            return False, f"Unknown IQ Option asset {order.asset}"
+        if order.signal is not None:
+            mark(order.signal, "send")
+        if order.duration > BLITZ_MAX_DURATION:
+            api.buyv3(float(order.amount), active_id, str(order.direction), int(order.duration / 60), order.request_id)
+        else:
+            api.buy_blitz_option(
+                order.amount, active_id, order.direction, int(order.duration), self._payout(order.asset),
+                None, order.request_id,
+            )
+        reply = self._reply(order.request_id)
+        if order.signal is not None:
+            mark(order.signal, "ack")
+        if reply is None:
+            return False, f"No reply within {self.timeout:.0f}s"
+        if "message" in reply:
+            return False, reply["message"]
+        return True, reply.get("id")
+
+    def _reply(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """The ``option`` reply filed under ``request_id``, or None on timeout"""
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            # Looked up on every pass: the SDK's own buy methods replace the dict
+            reply = self.client.api.buy_multi_option.pop(request_id, None)
+            if reply is not None:
+                return reply
+            time.sleep(POLL_INTERVAL)
+        return None
+
+    def _payout(self, asset: str) -> int:
+        """Blitz payout percent, from a table refreshed at most every ``payout_ttl`` seconds"""
+        with self._payout_lock:
+            if time.monotonic() - self._payouts_at > self.payout_ttl:
+                try:
+                    self._payouts = self.client.get_all_profit()
+                except Exception as e:
+                    logger.warning(f"Could not read IQ Option payouts: {e!r}")
+                self._payouts_at = time.monotonic()
+            profits = self._payouts.get(asset) or {}
+        for kind in ("turbo", "binary"):
+            if kind in profits:
+                return int(profits[kind] * 100)
+        for profit in profits.values():
+            return int(profit * 100)
+        return DEFAULT_PAYOUT
@@ -0,0 +1,406 @@
+"""
+Rotating, compacting signal journal
+
+orders.log used to grow forever, and every file client that starts without
+a cursor scanned all of it. SignalJournal keeps it as a series of segments::
+
+    orders.log           active segment, the file clients tail
+    orders.log.<id>      closed segment (<id>: when it was started, epoch ms)
+    orders.log.<id>.gz   closed segment archived by compaction
+    orders.log.idx       sparse index: seq, segment id, byte offset
+    orders.log.journal   manifest: the active segment and the closed ones
+
+The active segment is closed (renamed to ``orders.log.<id>``) once it
+holds ``max_bytes`` or was started ``max_age`` seconds ago; SignalReader
+already drains a renamed file before moving on to the new one. Every
+``INDEX_INTERVAL`` bytes the journal records where a signal's sequence
+number landed, so ``seek`` and ``read_from`` start near any seq instead
+of at the first segment.
+
+Consumers commit their offsets as the cursor files SignalReader writes
+(``settings/cursors/<name>.json``: inode and byte offset). A closed
+segment is deleted, or gzipped when ``archive`` is set, once it was closed
+more than ``retention`` seconds ago and every consumer's cursor is in a
+newer segment. Cursors not written for ``consumer_ttl`` seconds belong to
+clients that are gone and hold nothing back.
+
+Only the process that owns the journal (the bus, or the engine with
+masters) rotates it. SignalPublisher's fallback appends to orders.log
+directly, so those lines land in whichever segment is active and are not
+indexed.
+"""
+
+import glob
+import gzip
+import json
+import os
+import re
+import shutil
+import struct
+import time
+import logging
+from bisect import bisect_right
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from .signals import Signal, decode_line, encode
+
+logger = logging.getLogger(__name__)
+
+CURSOR_DIR = "settings/cursors"
+SEGMENT_BYTES = 4 * 1024 * 1024
+SEGMENT_SECONDS = 86400.0
+# Closed segments are kept at least this long, whatever the consumers' offsets
+RETENTION_SECONDS = 3600.0
+CONSUMER_TTL = 7 * 86400.0
+# Bytes between index entries
+INDEX_INTERVAL = 4096
+# Seconds before a rotation refused by the OS (a reader holding the file on Windows) is retried
+ROTATE_RETRY = 60.0
+
+_ENTRY = struct.Struct("<QQQ")
+
+
+def closed_segments(path: str) -> List[Tuple[int, str]]:
+    """
+    Closed, uncompressed segments of a journal, oldest first
+
+    Args:
+        path: Active segment (orders.log)
+
+    Returns:
+        List[Tuple[int, str]]: (segment id, file) pairs
+    """
+    pattern = re.compile(re.escape(os.path.basename(path)) + r"\.(\d+)$")
+    segments = []
+    for name in glob.glob(glob.escape(path) + ".*"):
+        match = pattern.match(os.path.basename(name))
+        if match:
+            segments.append((int(match.group(1)), name))
+    return sorted(segments)
+
+
+class SignalJournal:
+    """
+    Appends signals to a segmented orders.log and compacts it.
+
+    Args:
+        path: Active segment
+        max_bytes: Size that closes the active segment
+        max_age: Age, seconds, that closes the active segment
+        retention: Seconds a closed segment is kept at least
+        archive: Gzip compacted segments instead of deleting them
+        cursor_dir: Directory of the consumers' cursor files
+        consumer_ttl: Seconds after which an unchanged cursor is ignored
+    """
+
+    def __init__(
+        self,
+        path: str = "orders.log",
+        max_bytes: int = SEGMENT_BYTES,
+        max_age: float = SEGMENT_SECONDS,
+        retention: float = RETENTION_SECONDS,
+        archive: bool = False,
+        cursor_dir: Optional[str] = CURSOR_DIR,
+        consumer_ttl: float = CONSUMER_TTL,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.retention = retention
+        self.archive = archive
+        self.cursor_dir = cursor_dir
+        self.consumer_ttl = consumer_ttl
+        self.manifest_path = path + ".journal"
+        self.index_path = path + ".idx"
+        self._file: Optional[IO[bytes]] = None
+        self._index_file: Optional[IO[bytes]] = None
+        self._size = 0
+        self._indexed_at = -INDEX_INTERVAL
+        self._rotate_after = 0.0
+        self._seq = int(time.time() * 1000)
+        # Closed segments, oldest first: id, inode, closed (epoch s), archived
+        self._segments: List[Dict[str, Any]] = []
+        self._index_seqs: List[int] = []
+        self._index: List[Tuple[int, int]] = []
+        self._load()
+
+    def _load(self):
+        """Restore the manifest and the index"""
+        manifest: Dict[str, Any] = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable journal manifest {self.manifest_path}: {e}")
+        self._active_id = int(manifest.get("active", {}).get("id", time.time() * 1000))
+        self._created = float(manifest.get("active", {}).get("created", time.time()))
+        self._segments = manifest.get("segments", [])
+        known = {segment["id"] for segment in self._segments}
+        for segment_id, name in closed_segments(self.path):
+            # Closed before the manifest existed (or it was lost)
+            if segment_id not in known and segment_id != self._active_id:
+                stat = os.stat(name)
+                self._segments.append({"id": segment_id, "inode": stat.st_ino, "closed": stat.st_mtime, "archived": False})
+        self._segments.sort(key=lambda segment: segment["id"])
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+            for seq, segment_id, offset in _ENTRY.iter_unpack(data[: len(data) - len(data) % _ENTRY.size]):
+                self._index_seqs.append(seq)
+                self._index.append((segment_id, offset))
+        if self._index_seqs:
+            self._seq = max(self._seq, self._index_seqs[-1])
+
+    def _save_manifest(self):
+        """Atomically persist the active segment and the closed ones"""
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"active": {"id": self._active_id, "created": self._created}, "segments": self._segments}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _open(self):
+        """Open the active segment and the index for appending"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "ab", buffering=0)
+        self._size = os.fstat(self._file.fileno()).st_size
+        if self._size == 0:
+            self._created = time.time()
+        self._indexed_at = -INDEX_INTERVAL
+        if self._index_file is None:
+            self._index_file = open(self.index_path, "ab", buffering=0)
+        if not os.path.exists(self.manifest_path):
+            self._save_manifest()
+
+    def append(self, signal: Signal, data: Optional[bytes] = None) -> int:
+        """
+        Append a signal to the active segment, closing it first if it is full or old
+
+        Args:
+            signal: Signal to append; one without a sequence number gets the next one
+            data: ``encode(signal)``, if the caller already has it
+
+        Returns:
+            int: The signal's sequence number
+        """
+        if self._file is None:
+            self._open()
+        if self._size and (self._size >= self.max_bytes or time.time() - self._created >= self.max_age):
+            if time.time() >= self._rotate_after:
+                self.rotate()
+                self._open()
+        if signal.seq:
+            self._seq = max(self._seq, signal.seq)
+        else:
+            self._seq += 1
+            signal.seq = self._seq
+            data = None
+        if data is None:
+            data = encode(signal)
+        if self._size - self._indexed_at >= INDEX_INTERVAL:
+            # Count what other processes appended too, so the entry is at a line start
+            self._size = self._indexed_at = os.fstat(self._file.fileno()).st_size
+            self._index_file.write(_ENTRY.pack(signal.seq, self._active_id, self._size))
+            self._index_seqs.append(signal.seq)
+            self._index.append((self._active_id, self._size))
+        self._file.write(data)
+        self._size += len(data)
+        return signal.seq
+
+    def rotate(self) -> bool:
+        """
+        Close the active segment and start a new one
+
+        Returns:
+            bool: False if the OS refused to rename the segment (retried later)
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        closed_path = f"{self.path}.{self._active_id}"
+        try:
+            os.replace(self.path, closed_path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"Cannot close journal segment {self.path}, retrying in {ROTATE_RETRY:.0f}s: {e}")
+            self._rotate_after = time.time() + ROTATE_RETRY
+            return False
+        self._segments.append(
+            {"id": self._active_id, "inode": os.stat(closed_path).st_ino, "closed": time.time(), "archived": False}
+        )
+        logger.info(f"Closed journal segment {closed_path}")
+        self._active_id = max(int(time.time() * 1000), self._active_id + 1)
+        self._created = time.time()
+        self._save_manifest()
+        self.compact()
+        return True
+
+    def _consumer_position(self) -> int:
+        """
+        Index of the oldest closed segment a live consumer's cursor is in
+
+        ``len(segments)`` when every consumer is in the active segment.
+        Cursors of unknown files (deleted segments, other journals) hold
+        nothing back.
+        """
+        position = len(self._segments)
+        if not self.cursor_dir:
+            return position
+        inodes = {segment["inode"]: i for i, segment in enumerate(self._segments) if not segment["archived"]}
+        for cursor_path in glob.glob(os.path.join(glob.escape(self.cursor_dir), "*.json")):
+            try:
+                if time.time() - os.stat(cursor_path).st_mtime > self.consumer_ttl:
+                    continue
+                with open(cursor_path, "r", encoding="utf-8") as f:
+                    inode = json.load(f).get("inode")
+            except (OSError, ValueError):
+                continue
+            position = min(position, inodes.get(inode, position))
+        return position
+
+    def compact(self) -> int:
+        """
+        Delete (or archive) the closed segments no consumer needs any more
+
+        Returns:
+            int: Segments deleted or archived
+        """
+        position = self._consumer_position()
+        oldest = time.time() - self.retention
+        compacted = 0
+        for segment in self._segments[:position]:
+            if segment["archived"]:
+                continue
+            if segment["closed"] > oldest:
+                break
+            name = f"{self.path}.{segment['id']}"
+            try:
+                if self.archive:
+                    with open(name, "rb") as source, gzip.open(name + ".gz", "wb") as target:
+                        shutil.copyfileobj(source, target)
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Cannot compact journal segment {name}: {e}")
+                break
+            segment["archived"] = True
+            compacted += 1
+        if not compacted:
+            return 0
+        if not self.archive:
+            self._segments = [segment for segment in self._segments if not segment["archived"]]
+            self._compact_index()
+        self._save_manifest()
+        logger.info(f"Compacted {compacted} journal segment(s) of {self.path}")
+        return compacted
+
+    def _compact_index(self):
+        """Rewrite the index without the entries of deleted segments"""
+        kept = {segment["id"] for segment in self._segments} | {self._active_id}
+        entries = [(seq, entry) for seq, entry in zip(self._index_seqs, self._index) if entry[0] in kept]
+        self._index_seqs = [seq for seq, _ in entries]
+        self._index = [entry for _, entry in entries]
+        if self._index_file is not None:
+            self._index_file.close()
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for seq, (segment_id, offset) in entries:
+                f.write(_ENTRY.pack(seq, segment_id, offset))
+        os.replace(tmp_path, self.index_path)
+        self._index_file = open(self.index_path, "ab", buffering=0) if self._file is not None else None
+
+    def segments(self) -> List[str]:
+        """Files of every segment still on disk, oldest first, the active one last"""
+        files = []
+        for segment in self._segments:
+            name = f"{self.path}.{segment['id']}"
+            files.append(name + ".gz" if segment["archived"] else name)
+        files.append(self.path)
+        return [name for name in files if os.path.exists(name)]
+
+    def seek(self, seq: int) -> Optional[Tuple[str, int]]:
+        """
+        Where to start reading to find every signal after ``seq``
+
+        Args:
+            seq: Last sequence number already seen
+
+        Returns:
+            Optional[Tuple[str, int]]: Segment file and byte offset, or None
+            to start at the oldest segment
+        """
+        i = bisect_right(self._index_seqs, seq) - 1
+        if i < 0:
+            return None
+        segment_id, offset = self._index[i]
+        if segment_id == self._active_id:
+            return self.path, offset
+        for segment in self._segments:
+            if segment["id"] == segment_id:
+                name = f"{self.path}.{segment_id}"
+                return (name + ".gz" if segment["archived"] else name), offset
+        return None
+
+    def read_from(self, since: int = 0) -> Iterator[Signal]:
+        """
+        Signals after sequence number ``since``, oldest first
+
+        Signals without a sequence number (published while the bus was down)
+        are yielded where they fall between the others.
+        """
+        files = self.segments()
+        start = self.seek(since) if since else None
+        offset = 0
+        if start is not None and start[0] in files:
+            files = files[files.index(start[0]):]
+            offset = start[1]
+        for name in files:
+            opener = gzip.open if name.endswith(".gz") else open
+            with opener(name, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    signal = decode_line(line.decode("utf-8", errors="replace"))
+                    if signal is not None and (not signal.seq or signal.seq > since):
+                        yield signal
+            offset = 0
+
+    def unsequenced(self) -> List[Signal]:
+        """
+        Signals appended after the last one with a sequence number
+
+        These are the lines SignalPublisher's fallback wrote while the
+        journal's owner (the bus) was down, oldest first.
+        """
+        files = self.segments()
+        start = self.seek(self._index_seqs[-1]) if self._index_seqs else None
+        offset = 0
+        if start is not None and start[0] in files:
+            files = files[files.index(start[0]):]
+            offset = start[1]
+        pending: List[Signal] = []
+        for name in files:
+            opener = gzip.open if name.endswith(".gz") else open
+            with opener(name, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    signal = decode_line(line.decode("utf-8", errors="replace"))
+                    if signal is None:
+                        continue
+                    if signal.seq:
+                        pending.clear()
+                    else:
+                        pending.append(signal)
+            offset = 0
+        return pending
+
+    def close(self):
+        """Close the active segment and the index"""
+        for handle in (self._file, self._index_file):
+            if handle is not None:
+                handle.close()
+        self._file = None
+        self._index_file = None
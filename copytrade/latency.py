@@ -0,0 +1,208 @@
+"""
+End-to-end copy latency tracing
+
+Each stage a signal passes through is stamped into ``signal.extra["t"]``
+(wall-clock seconds), so the stamps travel with the signal over the bus, the
+shared-memory ring and orders.log::
+
+    broker   trade opened, as reported by the master's broker
+    detect   master saw the trade
+    publish  master handed the signal to the transport
+    receive  client took the signal from the transport
+    admit    the broker's admission controller let the order go (copytrade.admission)
+    send     client sent the order to its broker
+    ack      broker confirmed the order
+
+After the ack a client calls ``LatencyTracker.record``, which keeps the time
+between consecutive stages (and the end-to-end total) per master->follower
+broker pair. A follower that can place an order more than one way names
+the path it took in ``signal.extra["via"]``; the send->ack time is then also
+kept under ``send->ack via <path>`` so the paths can be compared.
+``summary()`` renders p50/p95/p99 for a periodic log line and ``dump()``
+writes the same numbers as JSON for tooling.
+
+The broker stamp comes from the broker's clock (often whole seconds), so the
+broker->detect segment includes clock offset and rounding. receive->admit is
+the time an order queued behind the broker's rate limit.
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from .signals import Signal
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("broker", "detect", "publish", "receive", "admit", "send", "ack")
+TOTAL = "total"
+MAX_SAMPLES = 4096
+
+
+def mark(signal: Signal, stage: str, when: Optional[float] = None) -> float:
+    """
+    Stamp a stage on a signal
+
+    Args:
+        signal: Signal passing through the stage
+        stage: One of STAGES
+        when: Stage time (defaults to time.time())
+
+    Returns:
+        float: The stamped time
+    """
+    when = time.time() if when is None else when
+    signal.extra.setdefault("t", {})[stage] = round(when, 6)
+    return when
+
+
+def stage_times(signal: Signal) -> Dict[str, float]:
+    """Stage stamps carried by a signal"""
+    stamps = signal.extra.get("t")
+    return stamps if isinstance(stamps, dict) else {}
+
+
+def percentiles(samples: Sequence[float], quantiles: Sequence[float] = (0.50, 0.95, 0.99)) -> List[float]:
+    """
+    Nearest-rank percentiles
+
+    Args:
+        samples: Values (need not be sorted)
+        quantiles: Fractions between 0 and 1
+
+    Returns:
+        List[float]: One value per quantile
+    """
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return [ordered[min(last, int(q * len(ordered)))] for q in quantiles]
+
+
+class LatencyTracker:
+    """
+    Per broker pair latency histograms, thread-safe.
+
+    Args:
+        name: Reported in summaries and dumps
+        interval: Seconds between reports from maybe_report()
+        dump_path: JSON file written on every report (None disables)
+        max_samples: Most recent samples kept per pair and segment
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval: float = 60.0,
+        dump_path: Optional[str] = None,
+        max_samples: int = MAX_SAMPLES,
+    ):
+        self.name = name
+        self.interval = interval
+        self.dump_path = dump_path
+        self.max_samples = max_samples
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._next_report = time.monotonic() + interval
+
+    def add(self, pair: str, segment: str, seconds: float):
+        """Record one sample for a pair and segment"""
+        key = (pair, segment)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.max_samples)
+            samples.append(seconds)
+
+    def record(self, signal: Signal, follower: str):
+        """
+        Record the stage-to-stage latencies of a signal that reached its ack
+
+        Args:
+            signal: Signal stamped with mark()
+            follower: Follower broker name
+        """
+        stamps = stage_times(signal)
+        present = [(stage, stamps[stage]) for stage in STAGES if stage in stamps]
+        if len(present) < 2:
+            return
+        pair = f"{signal.broker}->{follower}"
+        for (start, t0), (end, t1) in zip(present, present[1:]):
+            self.add(pair, f"{start}->{end}", t1 - t0)
+        via = signal.extra.get("via")
+        if via and "send" in stamps and "ack" in stamps:
+            self.add(pair, f"send->ack via {via}", stamps["ack"] - stamps["send"])
+        self.add(pair, TOTAL, present[-1][1] - present[0][1])
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Current percentiles
+
+        Returns:
+            Dict: ``{pair: {segment: {"n", "p50", "p95", "p99", "max"}}}`` in seconds
+        """
+        with self._lock:
+            items = [(key, list(samples)) for key, samples in self._samples.items()]
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (pair, segment), samples in sorted(items):
+            p50, p95, p99 = percentiles(samples)
+            result.setdefault(pair, {})[segment] = {
+                "n": len(samples), "p50": p50, "p95": p95, "p99": p99, "max": max(samples),
+            }
+        return result
+
+    def summary(self) -> str:
+        """Percentile table in milliseconds"""
+        lines = [f"Copy latency ({self.name}), ms"]
+        lines.append(f"  {'pair':<26}{'segment':<24}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        for pair, segments in self.snapshot().items():
+            for segment, s in segments.items():
+                lines.append(
+                    f"  {pair:<26}{segment:<24}{s['n']:>6}"
+                    f"{s['p50'] * 1e3:>9.1f}{s['p95'] * 1e3:>9.1f}{s['p99'] * 1e3:>9.1f}{s['max'] * 1e3:>9.1f}"
+                )
+        return "\n".join(lines)
+
+    def dump(self, path: Optional[str] = None):
+        """Atomically write the snapshot as JSON"""
+        path = path or self.dump_path
+        if not path:
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"name": self.name, "time": time.time(), "unit": "s", "pairs": self.snapshot()}, f, indent=1)
+        os.replace(tmp_path, path)
+
+    def maybe_report(self) -> Optional[str]:
+        """
+        Dump and return the summary if the report interval has passed
+
+        Returns:
+            Optional[str]: Summary, or None if not due or nothing recorded yet
+        """
+        now = time.monotonic()
+        if now < self._next_report:
+            return None
+        self._next_report = now + self.interval
+        return self.report()
+
+    def report(self) -> Optional[str]:
+        """
+        Dump and return the summary now
+
+        Returns:
+            Optional[str]: Summary, or None if nothing was recorded yet
+        """
+        if not self._samples:
+            return None
+        try:
+            self.dump()
+        except OSError as e:
+            logger.warning(f"Could not write latency dump {self.dump_path}: {e}")
+        return self.summary()
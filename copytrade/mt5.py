@@ -0,0 +1,303 @@
+"""
+MetaTrader 5 position copying between two terminals
+
+The MetaTrader5 package drives one terminal per process, so copying
+between two accounts from one process means an ``initialize`` + ``login``
+(seconds each) before and after every copied open and close, and the
+master is not watched meanwhile. ``run_master`` and ``run_follower`` each
+keep one terminal logged in, in a process of their own, linked by a
+multiprocessing queue of ``PositionEvent`` records::
+
+    master    polls positions_get(), diffs it against the previous snapshot
+              by ticket and queues an ``open`` or ``close`` event per change
+    follower  opens or closes its matching position and records the
+              detect->open / detect->close latency
+
+A position is copied once it carries both a stop loss and a take profit;
+positions already open when the master starts are never copied. The
+MetaTrader5 module is imported inside each process (``module`` names it),
+so a stand-in can replace it for offline measurement.
+"""
+
+import importlib
+import queue
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .latency import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+MODULE = "MetaTrader5"
+POLL_INTERVAL = 0.1
+DEVIATION = 20
+# Seconds between retries of follower closes the terminal refused
+RETRY_INTERVAL = 1.0
+REPORT_INTERVAL = 60.0
+
+OPEN = "open"
+CLOSE = "close"
+
+LOG_FORMAT = "%(asctime)s - %(processName)s - %(levelname)s - %(message)s"
+
+
+@dataclass
+class PositionEvent:
+    """A master position opened or closed, as queued to the follower"""
+
+    kind: str
+    ticket: int
+    symbol: str
+    volume: float = 0.0
+    type: int = 0
+    price: float = 0.0
+    sl: float = 0.0
+    tp: float = 0.0
+    detected: float = 0.0
+
+    @classmethod
+    def opened(cls, position: Any, detected: float) -> "PositionEvent":
+        return cls(
+            OPEN, position.ticket, position.symbol, position.volume, position.type,
+            position.price_current, position.sl, position.tp, detected,
+        )
+
+    @classmethod
+    def closed(cls, position: Any, detected: float) -> "PositionEvent":
+        return cls(CLOSE, position.ticket, position.symbol, detected=detected)
+
+
+def index_positions(positions: Iterable[Any]) -> Dict[int, Any]:
+    """``positions_get()`` result keyed by ticket"""
+    return {position.ticket: position for position in positions}
+
+
+def diff_positions(previous: Dict[int, Any], current: Dict[int, Any]) -> Tuple[List[int], List[int]]:
+    """
+    Tickets opened and closed between two snapshots
+
+    Args:
+        previous: Earlier snapshot from index_positions()
+        current: Later snapshot from index_positions()
+
+    Returns:
+        Tuple[List[int], List[int]]: Opened tickets, closed tickets (ascending)
+    """
+    return sorted(current.keys() - previous.keys()), sorted(previous.keys() - current.keys())
+
+
+def copyable(position: Any) -> bool:
+    """Whether a master position is copied (it has both a stop loss and a take profit)"""
+    return position.sl != 0 and position.tp != 0
+
+
+def login(mt5: Any, account: Dict[str, Any], path: str) -> bool:
+    """
+    Start a terminal and log in to an account
+
+    Args:
+        mt5: The MetaTrader5 module
+        account: ``login``, ``password`` and ``server``
+        path: terminal64.exe of the terminal to drive
+
+    Returns:
+        bool: False if the terminal could not start or the login failed
+    """
+    if not mt5.initialize(path):
+        logger.error(f"initialize({path}) failed, error code: {mt5.last_error()}")
+        return False
+    if not mt5.login(account["login"], account["password"], account["server"]):
+        logger.error(f"Failed to connect to account {account['login']}: {mt5.last_error()}")
+        return False
+    logger.info(f"Connected to account {account['login']}")
+    return True
+
+
+def open_position(mt5: Any, event: PositionEvent) -> Optional[int]:
+    """
+    Open the follower's copy of a master position
+
+    Returns:
+        Optional[int]: The follower's ticket, or None if the terminal refused
+    """
+    request = {
+        "action": mt5.TRADE_ACTION_DEAL,
+        "symbol": event.symbol,
+        "volume": event.volume,
+        "type": mt5.ORDER_TYPE_BUY if event.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_SELL,
+        "price": event.price,
+        "sl": event.sl,
+        "tp": event.tp,
+        "deviation": DEVIATION,
+        "magic": 0,
+        "comment": "Copied trade",
+        "type_time": mt5.ORDER_TIME_GTC,
+        "type_filling": mt5.ORDER_FILLING_IOC,
+    }
+    result = mt5.order_send(request)
+    if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+        logger.warning(f"Failed to copy trade {event.ticket}: {result.comment if result else mt5.last_error()}")
+        return None
+    logger.info(f"Trade {event.ticket} copied with ticket {result.order}")
+    return result.order
+
+
+def close_position(mt5: Any, ticket: int) -> Optional[int]:
+    """
+    Close a follower position
+
+    Returns:
+        Optional[int]: The closing order, or None if the position was not
+        found or the terminal refused
+    """
+    positions = mt5.positions_get(ticket=ticket)
+    if not positions:
+        logger.warning(f"Position {ticket} not found on the follower: {mt5.last_error()}")
+        return None
+    position = positions[0]
+    order_type = mt5.ORDER_TYPE_SELL if position.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY
+    tick = mt5.symbol_info_tick(position.symbol)
+    request = {
+        "action": mt5.TRADE_ACTION_DEAL,
+        "position": position.ticket,
+        "symbol": position.symbol,
+        "volume": position.volume,
+        "type": order_type,
+        "price": tick.bid if order_type == mt5.ORDER_TYPE_SELL else tick.ask,
+        "deviation": DEVIATION,
+        "magic": 0,
+        "comment": "Close copied trade",
+        "type_time": mt5.ORDER_TIME_GTC,
+        "type_filling": mt5.ORDER_FILLING_IOC,
+    }
+    result = mt5.order_send(request)
+    if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+        logger.warning(f"Failed to close position {ticket}: {result.comment if result else mt5.last_error()}")
+        return None
+    logger.info(f"Position {ticket} closed")
+    return result.order
+
+
+def _process_logging():
+    """Spawned processes start without handlers"""
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+
+def run_master(account: Dict[str, Any], path: str, events: Any, module: str = MODULE,
+               poll_interval: float = POLL_INTERVAL, stop: Any = None):
+    """
+    Process entry point: watch the master terminal and queue its position changes
+
+    Args:
+        account: Master account credentials
+        path: Master terminal
+        events: ``multiprocessing.Queue`` read by run_follower()
+        module: MetaTrader5 module (or a stand-in) to import
+        poll_interval: Seconds between positions_get() calls
+        stop: ``multiprocessing.Event`` that ends the loop; None runs until killed
+    """
+    _process_logging()
+    mt5 = importlib.import_module(module)
+    if not login(mt5, account, path):
+        events.put(None)
+        return
+    positions = index_positions(mt5.positions_get() or ())
+    # Opened while running but not copied yet (no SL/TP so far), and copied
+    waiting: Set[int] = set()
+    sent: Set[int] = set()
+    while stop is None or not stop.is_set():
+        snapshot = mt5.positions_get()
+        if snapshot is None:
+            logger.warning(f"positions_get() failed, error code: {mt5.last_error()}")
+            time.sleep(poll_interval)
+            continue
+        detected = time.time()
+        current = index_positions(snapshot)
+        opened, closed = diff_positions(positions, current)
+        waiting.update(opened)
+        for ticket in closed:
+            waiting.discard(ticket)
+            if ticket in sent:
+                sent.discard(ticket)
+                events.put(PositionEvent.closed(positions[ticket], detected))
+        for ticket in sorted(waiting):
+            position = current[ticket]
+            if copyable(position):
+                waiting.discard(ticket)
+                sent.add(ticket)
+                events.put(PositionEvent.opened(position, detected))
+        positions = current
+        time.sleep(poll_interval)
+    mt5.shutdown()
+
+
+def run_follower(account: Dict[str, Any], path: str, events: Any, module: str = MODULE,
+                 report_interval: float = REPORT_INTERVAL, results: Any = None):
+    """
+    Process entry point: mirror queued master changes on the follower terminal
+
+    Runs until it takes None from ``events``.
+
+    Args:
+        account: Follower account credentials
+        path: Follower terminal
+        events: ``multiprocessing.Queue`` filled by run_master()
+        module: MetaTrader5 module (or a stand-in) to import
+        report_interval: Seconds between latency summaries in the log
+        results: Optional queue that gets ``(kind, master_ticket, ok, detected, done)`` per event
+    """
+    _process_logging()
+    mt5 = importlib.import_module(module)
+    if not login(mt5, account, path):
+        return
+    tracker = LatencyTracker("mt5", interval=report_interval)
+    # Master ticket -> follower ticket
+    copied: Dict[int, int] = {}
+    # Closes the terminal refused, by master ticket
+    retry: Dict[int, PositionEvent] = {}
+    next_retry = 0.0
+
+    def mirror(event: PositionEvent):
+        if event.kind == OPEN:
+            ticket = open_position(mt5, event)
+            ok = ticket is not None
+            if ok:
+                copied[event.ticket] = ticket
+        else:
+            ticket = copied.get(event.ticket)
+            if ticket is None:
+                return
+            ok = close_position(mt5, ticket) is not None
+            if ok or not mt5.positions_get(ticket=ticket):
+                # Closed now, or already gone by its own SL/TP
+                del copied[event.ticket]
+            else:
+                retry[event.ticket] = event
+        done = time.time()
+        if ok:
+            tracker.add("mt5->mt5", f"detect->{event.kind}", done - event.detected)
+        if results is not None:
+            results.put((event.kind, event.ticket, ok, event.detected, done))
+
+    while True:
+        if retry and time.monotonic() >= next_retry:
+            next_retry = time.monotonic() + RETRY_INTERVAL
+            for ticket in sorted(retry):
+                mirror(retry.pop(ticket))
+        try:
+            event = events.get(timeout=max(0.0, next_retry - time.monotonic()) if retry else None)
+        except queue.Empty:
+            continue
+        if event is None:
+            break
+        mirror(event)
+        report = tracker.maybe_report()
+        if report:
+            logger.info(report)
+    report = tracker.report()
+    if report:
+        logger.info(report)
+    mt5.shutdown()
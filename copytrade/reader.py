@@ -0,0 +1,191 @@
+"""
+Incremental tailing reader for the orders.log signal file
+"""
+
+import json
+import os
+import asyncio
+import logging
+from typing import List, Optional
+
+from .journal import closed_segments
+from .signals import Signal, decode_line
+from .watcher import FileWatcher
+
+logger = logging.getLogger(__name__)
+
+class SignalReader:
+    """
+    Tails a signal file, returning only lines appended since the last read.
+
+    The reader keeps the file open and remembers the byte offset of the last
+    complete line together with the file's inode. Truncation rewinds to the
+    start of the file; rotation (the path now points to a different inode)
+    drains what is left of the old file before switching to the new one.
+    When ``cursor_path`` is given the offset is persisted after every read so
+    a restarted client resumes where it stopped instead of re-scanning; if
+    the journal closed its file meanwhile (see copytrade.journal), the rest
+    of that segment and of any later closed ones is read first. The cursor
+    is also the client's committed offset, which journal compaction honours.
+    ``poll`` sleeps on a FileWatcher, so it returns as soon as a master
+    appends rather than after a fixed delay.
+    """
+
+    def __init__(
+        self,
+        path: str = "orders.log",
+        cursor_path: Optional[str] = None,
+        use_inotify: bool = True,
+    ):
+        self.path = path
+        self.cursor_path = cursor_path
+        self.watcher = FileWatcher(path, use_inotify=use_inotify)
+        self._file = None
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._load_cursor()
+
+    def _load_cursor(self):
+        """Restore inode/offset from the cursor file, if any"""
+        if not self.cursor_path or not os.path.exists(self.cursor_path):
+            return
+        try:
+            with open(self.cursor_path, "r", encoding="utf-8") as f:
+                cursor = json.load(f)
+            self._inode = cursor.get("inode")
+            self._offset = int(cursor.get("offset", 0))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cursor {self.cursor_path}: {e}")
+            self._inode, self._offset = None, 0
+
+    def _save_cursor(self):
+        """Atomically persist the current inode/offset"""
+        if not self.cursor_path:
+            return
+        directory = os.path.dirname(self.cursor_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.cursor_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"inode": self._inode, "offset": self._offset}, f)
+        os.replace(tmp_path, self.cursor_path)
+
+    def _open(self, stat: os.stat_result):
+        """Open the current file, keeping the offset only if it is the same inode"""
+        self._file = open(self.path, "rb")
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._offset = 0
+        self._inode = stat.st_ino
+
+    def _read_closed(self) -> List[str]:
+        """Lines after the cursor in the closed segment it points into, and in the later closed ones"""
+        segments = [name for _, name in closed_segments(self.path)]
+        for i, name in enumerate(segments):
+            try:
+                if os.stat(name).st_ino == self._inode:
+                    break
+            except OSError:
+                continue
+        else:
+            return []
+        lines: List[str] = []
+        offset = self._offset
+        for name in segments[i:]:
+            try:
+                with open(name, "rb") as f:
+                    f.seek(offset)
+                    lines.extend(f.read().decode("utf-8", errors="replace").splitlines())
+            except OSError as e:
+                logger.warning(f"Skipping journal segment {name}: {e}")
+            offset = 0
+        if lines:
+            logger.info(f"Read {len(lines)} line(s) from {len(segments) - i} closed segment(s) of {self.path}")
+        return lines
+
+    def _read_complete(self) -> List[str]:
+        """Read complete lines from the open file starting at the offset"""
+        self._file.seek(self._offset)
+        chunk = self._file.read()
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return []
+        self._offset += end + 1
+        return chunk[: end + 1].decode("utf-8", errors="replace").splitlines()
+
+    def read_lines(self) -> List[str]:
+        """
+        Return the complete lines appended since the previous call
+
+        Returns:
+            List[str]: New lines, without line terminators
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        lines: List[str] = []
+        switched = stat.st_ino != self._inode
+        if self._file is not None and switched:
+            # Rotated: finish the old file and any closed after it, then start the new one from zero
+            lines.extend(self._read_complete())
+            self._file.close()
+            self._file = None
+            lines.extend(self._read_closed())
+            self._offset = 0
+        elif self._file is None and switched and self._inode is not None:
+            # Rotated while the client was down
+            lines.extend(self._read_closed())
+        if self._file is None:
+            self._open(stat)
+        elif stat.st_size < self._offset:
+            logger.info(f"{self.path} was truncated, rewinding")
+            self._offset = 0
+
+        before = self._offset
+        lines.extend(self._read_complete())
+        if self._offset != before or lines or switched:
+            self._save_cursor()
+        return lines
+
+    def read(self) -> List[Signal]:
+        """
+        Return the signals appended since the previous call
+
+        Returns:
+            List[Signal]: Decoded signals in file order
+        """
+        signals = []
+        for line in self.read_lines():
+            signal = decode_line(line)
+            if signal is not None:
+                signals.append(signal)
+        return signals
+
+    async def poll(self, timeout: float = 0.5) -> List[Signal]:
+        """
+        Return new signals, waiting up to ``timeout`` seconds if there are none
+
+        Args:
+            timeout: Maximum time to wait for new signals
+
+        Returns:
+            List[Signal]: Decoded signals in file order (possibly empty)
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        signals = self.read()
+        while not signals:
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await self.watcher.wait(remaining):
+                break
+            # A wake-up may be a partial line; keep waiting until it completes
+            signals = self.read()
+        return signals
+
+    def close(self):
+        """Close the underlying file handle"""
+        self.watcher.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,280 @@
+"""
+Shared-memory ring buffer transport for same-host signalling
+
+Each master owns one ring (``copytrade_<broker>``) in
+``multiprocessing.shared_memory`` and is its only writer. Any number of client
+processes attach read-only and follow the ring by sequence number, so
+publishing and receiving a signal costs no system calls.
+
+Layout (little endian)::
+
+    header  magic u32 | version u16 | pad u16 | slot_size u32 | slot_count u32 | head u64
+    slot    seq u64 | length u32 | pad u32 | payload[slot_size - 16]
+
+The writer clears a slot's seq, writes the payload, stores the new seq in the
+slot and finally advances ``head``. A reader copies the payload and re-checks
+the slot seq; a mismatch means the writer lapped it (overrun).
+"""
+
+import asyncio
+import struct
+import sys
+import time
+import logging
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List
+
+from .signals import Signal, decode, encode
+
+logger = logging.getLogger(__name__)
+
+RING_PREFIX = "copytrade_"
+RING_MAGIC = 0x42525443  # "CTRB"
+RING_VERSION = 1
+SLOT_SIZE = 512
+SLOT_COUNT = 1024
+
+_HEADER = struct.Struct("<IHHIIQ")
+_HEAD_OFFSET = 16
+_HEAD = struct.Struct("<Q")
+_SLOT_HEADER = struct.Struct("<QII")
+_SEQ = struct.Struct("<Q")
+
+
+def _open_segment(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    """
+    Open a segment without handing it to the multiprocessing resource tracker.
+
+    The ring must outlive the processes using it: a restarted master keeps
+    writing where it stopped and attached readers keep working, so no process
+    may unlink it on exit.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    if sys.platform == "win32":
+        return shared_memory.SharedMemory(name=name, create=create, size=size)
+    from multiprocessing import resource_tracker
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name, create=create, size=size)
+    finally:
+        resource_tracker.register = register
+
+
+class ShmRingWriter:
+    """Single-writer side of a signal ring"""
+
+    def __init__(self, broker: str, slot_size: int = SLOT_SIZE, slot_count: int = SLOT_COUNT):
+        self.name = RING_PREFIX + broker
+        try:
+            self._shm = _open_segment(self.name, create=True, size=_HEADER.size + slot_size * slot_count)
+            _HEADER.pack_into(self._shm.buf, 0, RING_MAGIC, RING_VERSION, 0, slot_size, slot_count, 0)
+        except FileExistsError:
+            # Left by a previous run: keep its sequence so readers carry on
+            self._shm = _open_segment(self.name)
+            magic, version, _, slot_size, slot_count, _ = _HEADER.unpack_from(self._shm.buf, 0)
+            if magic != RING_MAGIC or version != RING_VERSION:
+                raise ValueError(f"Shared memory {self.name} is not a version {RING_VERSION} signal ring")
+        self.slot_size = slot_size
+        self.slot_count = slot_count
+        self.capacity = slot_size - _SLOT_HEADER.size
+        self._buf = self._shm.buf
+        self.head = _HEAD.unpack_from(self._buf, _HEAD_OFFSET)[0]
+
+    def publish(self, signal: Signal) -> int:
+        """
+        Write a signal into the next slot
+
+        Args:
+            signal: Signal to publish
+
+        Returns:
+            int: Sequence number of the signal in this ring
+
+        Raises:
+            ValueError: If the encoded signal does not fit in a slot
+        """
+        data = encode(signal)
+        if len(data) > self.capacity:
+            raise ValueError(f"Signal of {len(data)} bytes exceeds ring slot capacity {self.capacity}")
+        seq = self.head + 1
+        offset = _HEADER.size + (seq % self.slot_count) * self.slot_size
+        buf = self._buf
+        _SEQ.pack_into(buf, offset, 0)
+        start = offset + _SLOT_HEADER.size
+        buf[start:start + len(data)] = data
+        _SLOT_HEADER.pack_into(buf, offset, seq, len(data), 0)
+        _HEAD.pack_into(buf, _HEAD_OFFSET, seq)
+        self.head = seq
+        return seq
+
+    def close(self):
+        """Detach from the ring (it stays available to readers)"""
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self):
+        """Remove the ring from the system"""
+        if sys.version_info < (3, 13) and sys.platform != "win32":
+            from multiprocessing import resource_tracker
+
+            # SharedMemory.unlink() unregisters; register first to keep the tracker consistent
+            resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
+
+
+class _RingCursor:
+    """A reader's position in one ring"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, from_start: bool):
+        self.shm = shm
+        self.buf = shm.buf
+        magic, version, _, self.slot_size, self.slot_count, head = _HEADER.unpack_from(self.buf, 0)
+        if magic != RING_MAGIC or version != RING_VERSION:
+            raise ValueError(f"Shared memory {shm.name} is not a version {RING_VERSION} signal ring")
+        self.next_seq = max(1, head - self.slot_count + 1) if from_start else head + 1
+        self.overruns = 0
+        self.lost = 0
+
+    def head(self) -> int:
+        return _HEAD.unpack_from(self.buf, _HEAD_OFFSET)[0]
+
+    def read(self, out: List[Signal]):
+        """Append every signal between next_seq and head to ``out``"""
+        head = self.head()
+        if head - self.next_seq + 1 > self.slot_count:
+            self._skip_to(head - self.slot_count + 1)
+        while self.next_seq <= head:
+            seq = self.next_seq
+            offset = _HEADER.size + (seq % self.slot_count) * self.slot_size
+            slot_seq, length, _ = _SLOT_HEADER.unpack_from(self.buf, offset)
+            if slot_seq != seq:
+                # Lapped while we were behind (or slot mid-rewrite)
+                self._skip_to(max(seq + 1, self.head() - self.slot_count + 1))
+                head = self.head()
+                continue
+            start = offset + _SLOT_HEADER.size
+            data = bytes(self.buf[start:start + length])
+            if _SEQ.unpack_from(self.buf, offset)[0] != seq:
+                self._skip_to(max(seq + 1, self.head() - self.slot_count + 1))
+                head = self.head()
+                continue
+            self.next_seq = seq + 1
+            try:
+                out.append(decode(data))
+            except ValueError:
+                logger.warning(f"Dropping malformed ring record {seq} in {self.shm.name}")
+
+    def _skip_to(self, seq: int):
+        """Record an overrun and resume at ``seq``"""
+        self.overruns += 1
+        self.lost += seq - self.next_seq
+        logger.warning(f"Ring {self.shm.name} overrun, {seq - self.next_seq} signals lost")
+        self.next_seq = seq
+
+
+class ShmRingReader:
+    """
+    Follows the rings of several masters.
+
+    Rings that do not exist yet (master not started) are attached as soon as
+    they appear. ``read()`` never blocks and makes no system calls once all
+    rings are attached.
+    """
+
+    def __init__(
+        self,
+        brokers: Iterable[str] = ("iqoption", "pocketoption", "deriv"),
+        from_start: bool = False,
+        attach_interval: float = 1.0,
+    ):
+        self.names = [RING_PREFIX + broker for broker in brokers]
+        self.from_start = from_start
+        self.attach_interval = attach_interval
+        self._cursors: Dict[str, _RingCursor] = {}
+        self._next_attach = 0.0
+
+    def _attach(self):
+        """Attach to rings that have appeared since the last attempt"""
+        now = time.monotonic()
+        if now < self._next_attach:
+            return
+        self._next_attach = now + self.attach_interval
+        for name in self.names:
+            if name in self._cursors:
+                continue
+            try:
+                shm = _open_segment(name)
+            except FileNotFoundError:
+                continue
+            self._cursors[name] = _RingCursor(shm, self.from_start)
+
+    def read(self) -> List[Signal]:
+        """
+        Return the signals published since the previous call
+
+        Returns:
+            List[Signal]: New signals, in order within each ring
+        """
+        if len(self._cursors) < len(self.names):
+            self._attach()
+        signals: List[Signal] = []
+        for cursor in self._cursors.values():
+            cursor.read(signals)
+        return signals
+
+    def lag(self) -> Dict[str, int]:
+        """Unread signals per attached ring"""
+        return {name: c.head() - c.next_seq + 1 for name, c in self._cursors.items()}
+
+    def overruns(self) -> Dict[str, int]:
+        """Signals lost to overruns per attached ring"""
+        return {name: c.lost for name, c in self._cursors.items()}
+
+    def wait_blocking(self, timeout: float) -> List[Signal]:
+        """
+        Busy-wait for signals (lowest latency, burns one core while waiting)
+
+        Args:
+            timeout: Maximum time to wait
+
+        Returns:
+            List[Signal]: New signals (possibly empty)
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            signals = self.read()
+            if signals or time.perf_counter() >= deadline:
+                return signals
+
+    async def poll(self, timeout: float = 0.5, spin: float = 0.002) -> List[Signal]:
+        """
+        Wait for signals without blocking the event loop
+
+        The loop is yielded to on every check for ``spin`` seconds after the
+        call starts; after that the ring is checked once per millisecond.
+
+        Args:
+            timeout: Maximum time to wait
+            spin: Time spent checking on every loop iteration
+
+        Returns:
+            List[Signal]: New signals (possibly empty)
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        while True:
+            signals = self.read()
+            now = loop.time()
+            if signals or now - start >= timeout:
+                return signals
+            await asyncio.sleep(0 if now - start < spin else 0.001)
+
+    def close(self):
+        """Detach from all rings"""
+        for cursor in self._cursors.values():
+            cursor.buf = None
+            cursor.shm.close()
+        self._cursors.clear()
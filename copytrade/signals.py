@@ -0,0 +1,168 @@
+"""
+Schema-versioned signal record shared by every master and client
+
+A signal is one line of JSON (newline-delimited), e.g.::
+
+    {"v": 1, "ts": 1752128678.412, "id": "11839203471", "broker": "iqoption",
+     "asset": "EURUSD_otc", "amount": 1.0, "dir": "call", "dur": 60, "type": "turbo"}
+
+``sts`` and ``exp`` are the trade's open and expiry times on the master
+broker's server clock, when the master knows them; ``ts`` is the master's
+local clock.
+
+Decoding is a single ``json.loads`` plus a fixed number of key lookups, so the
+cost per signal is constant. New fields are added as optional keys; fields a
+reader does not know are kept in ``Signal.extra`` and written back unchanged.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Union
+
+SCHEMA_VERSION = 1
+
+# Keys owned by the Signal dataclass; everything else round-trips through extra
+_KNOWN_KEYS = frozenset(("v", "ts", "id", "broker", "asset", "amount", "dir", "dur", "type", "seq", "sts", "exp"))
+
+# Free-text line written by masters before the structured format existed:
+# - Time: ... Stamp: <int> ID: <id> Asset: <asset> Amount: <amount> Direction: <dir> Duration: <secs>
+LEGACY_LINE = re.compile(
+    r"Stamp: (\d+\.?\d*)\s+ID: (\d+\.?\d*)\s+Asset: ([\w-]+)\s+Amount: (\d+\.?\d*)\s+Direction: (\w+)\s+Duration: (\d+\.?\d*)"
+)
+
+
+@dataclass
+class Signal:
+    """A master trade to be copied by the clients"""
+
+    stamp: float
+    id: str
+    broker: str
+    asset: str
+    amount: float
+    direction: str
+    duration: int
+    option_type: str = "binary"
+    seq: int = 0
+    server_stamp: float = 0.0
+    expiry: float = 0.0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the wire representation of the signal"""
+        record = dict(self.extra)
+        record.update(
+            v=SCHEMA_VERSION,
+            ts=self.stamp,
+            id=self.id,
+            broker=self.broker,
+            asset=self.asset,
+            amount=self.amount,
+            dir=self.direction,
+            dur=self.duration,
+            type=self.option_type,
+        )
+        if self.seq:
+            record["seq"] = self.seq
+        if self.server_stamp:
+            record["sts"] = self.server_stamp
+        if self.expiry:
+            record["exp"] = self.expiry
+        return record
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "Signal":
+        """Build a signal from its wire representation"""
+        try:
+            return cls(
+                stamp=float(record["ts"]),
+                id=str(record["id"]),
+                broker=record.get("broker", "unknown"),
+                asset=record["asset"],
+                amount=float(record["amount"]),
+                direction=record["dir"],
+                duration=int(record["dur"]),
+                option_type=record.get("type", "binary"),
+                seq=int(record.get("seq", 0)),
+                server_stamp=float(record.get("sts", 0.0)),
+                expiry=float(record.get("exp", 0.0)),
+                extra={k: v for k, v in record.items() if k not in _KNOWN_KEYS},
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid signal record: {e}") from e
+
+
+def encode(signal: Signal) -> bytes:
+    """
+    Encode a signal as one newline-terminated JSON record
+
+    Args:
+        signal: Signal to encode
+
+    Returns:
+        bytes: UTF-8 record including the trailing newline
+    """
+    return (json.dumps(signal.to_dict(), separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def decode(line: Union[bytes, str]) -> Signal:
+    """
+    Decode one record produced by encode
+
+    Args:
+        line: Record, with or without the trailing newline
+
+    Returns:
+        Signal: Decoded signal
+
+    Raises:
+        ValueError: If the record is not a valid signal
+    """
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("Invalid signal record: not an object")
+    return Signal.from_dict(record)
+
+
+def parse_legacy_line(line: str) -> Optional[Signal]:
+    """
+    Parse a free-text line written by the old masters
+
+    Args:
+        line: Raw orders.log line
+
+    Returns:
+        Optional[Signal]: Signal, or None if the line is not a signal
+    """
+    match = LEGACY_LINE.search(line)
+    if not match:
+        return None
+    stamp, id, asset, amount, direction, duration = match.groups()
+    return Signal(
+        stamp=float(stamp),
+        id=str(int(float(id))),
+        broker="unknown",
+        asset=asset,
+        amount=float(amount),
+        direction=direction.lower(),
+        duration=int(float(duration)),
+    )
+
+
+def decode_line(line: str) -> Optional[Signal]:
+    """
+    Decode an orders.log line in either the structured or the legacy format
+
+    Args:
+        line: Raw orders.log line
+
+    Returns:
+        Optional[Signal]: Signal, or None if the line is not a signal
+    """
+    if line.startswith("{"):
+        try:
+            return decode(line)
+        except ValueError:
+            return None
+    return parse_legacy_line(line)
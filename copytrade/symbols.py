@@ -0,0 +1,284 @@
+"""
+Cross-broker asset symbol translation
+
+Every broker names the same instrument differently::
+
+    IQ Option     EURUSD-OTC   APPLE         GER30-OTC
+    PocketOption  EURUSD_otc   #AAPL         D30EUR_otc
+    Quotex        EURUSD_otc   ...           ...
+    Deriv         frxEURUSD    ...           OTC_GDAXI
+
+``canonical_asset()`` reduces any of them to one key (PocketOption style:
+upper-case, ``_otc`` suffix for OTC markets, common tickers for IQ Option's
+company names and Deriv's index codes). ``SymbolTable`` keeps, per broker,
+canonical -> broker name and broker name -> canonical dicts, so a
+translation is a dict lookup. An instrument a broker does not list
+translates to ``UNMAPPABLE`` and the follower skips it without sending an
+order the broker would reject.
+
+IQ Option ACTIVES and PocketOption ASSETS ship with their SDKs; Quotex
+instruments and Deriv symbols are only known after connecting, so the
+followers add them with ``update()``. All lists are cached in
+``settings/symbols.json`` and the table is built once per process
+(``symbol_table()``).
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+import re
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "settings/symbols.json"
+UNMAPPABLE = "unmappable"
+BROKERS = ("iqoption", "pocketoption", "quotex", "deriv")
+
+# Brokers without separate OTC markets: an OTC signal maps to the regular symbol
+OTC_AGNOSTIC = ("deriv",)
+
+_OTC = re.compile(r"[\s_-]*\(?otc\)?$", re.IGNORECASE)
+_PREFIXES = ("frx", "cry", "OTC_", "WLD")
+
+# Names that differ between brokers, mapped to the PocketOption style key
+ALIASES: Dict[str, str] = {
+    # IQ Option company names
+    "ALIBABA": "BABA", "AMAZON": "AMZN", "APPLE": "AAPL", "BAIDU": "BIDU", "CISCO": "CSCO",
+    "COKE": "KO", "FACEBOOK": "FB", "FERRARI": "RACE", "GOOGLE": "GOOGL", "INTEL": "INTC",
+    "MCDON": "MCD", "MORSTAN": "MS", "NIKE": "NKE", "TESLA": "TSLA",
+    # Crypto
+    "AVAX": "AVAXUSD", "CARDANO": "ADAUSD", "DOGE": "DOGEUSD", "DOGECOIN": "DOGEUSD", "DSHUSD": "DASHUSD",
+    "LINK": "LINKUSD", "LNKUSD": "LINKUSD", "MATIC": "MATICUSD", "TRON": "TRXUSD",
+    # Indices and commodities
+    "US30": "DJI30", "DJI": "DJI30", "USNDAQ100": "NASUSD", "NDX": "NASUSD", "SPC": "SP500",
+    "JP225": "JPN225", "N225": "JPN225", "GER30": "D30EUR", "GDAXI": "D30EUR", "FR40": "F40EUR",
+    "FCHI": "F40EUR", "EU50": "E50EUR", "SX5E": "E50EUR", "SP35": "E35EUR", "IBEX35": "E35EUR",
+    "HK33": "H33HKD", "HSI": "H33HKD", "UK100": "100GBP", "FTSE": "100GBP", "AS51": "AUS200",
+    "AEX": "AEX25", "SSMI": "SMI20", "UKOUSD": "UKBRENT", "USOUSD": "USCRUDE",
+}
+
+
+def canonical_asset(name: str) -> str:
+    """
+    Broker-neutral key of an asset name
+
+    Args:
+        name: Asset as any broker (or a signal) names it
+
+    Returns:
+        str: e.g. ``EURUSD_otc`` for ``EURUSD-OTC``, ``EURUSD_otc`` and ``EUR/USD (OTC)``;
+        ``AAPL`` for ``#AAPL`` and ``APPLE``; ``EURUSD`` for ``frxEURUSD``
+    """
+    text = name.strip()
+    otc = bool(_OTC.search(text))
+    text = _OTC.sub("", text)
+    if text.endswith("-op"):
+        text = text[:-3]
+    if text.endswith(":US"):
+        text = text[:-3]
+    for prefix in _PREFIXES:
+        if text.startswith(prefix) and len(text) > len(prefix):
+            text = text[len(prefix):]
+            break
+    key = re.sub(r"[^A-Z0-9]", "", text.upper())
+    key = ALIASES.get(key, key)
+    return f"{key}_otc" if otc else key
+
+
+def _tradable(broker: str, name: str) -> bool:
+    # IQ Option "-L" instruments are CFDs, not options
+    return not (broker == "iqoption" and name.endswith("-L"))
+
+
+class SymbolTable:
+    """
+    Canonical <-> broker asset names for every broker with a known list.
+
+    Args:
+        names: Broker -> the asset names that broker lists
+    """
+
+    def __init__(self, names: Optional[Dict[str, Iterable[str]]] = None):
+        self.names: Dict[str, List[str]] = {}
+        self.to_broker: Dict[str, Dict[str, str]] = {}
+        self.to_canonical: Dict[str, Dict[str, str]] = {}
+        self._memo: Dict[str, Dict[str, str]] = {}
+        self.path = DEFAULT_PATH
+        self.sources: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        for broker, broker_names in (names or {}).items():
+            self._build(broker, broker_names)
+
+    def has(self, broker: str) -> bool:
+        """Whether the broker's list is known"""
+        return broker in self.to_broker
+
+    def update(self, broker: str, names: Iterable[str], save: bool = False) -> bool:
+        """
+        Replace a broker's list
+
+        Args:
+            broker: Broker name
+            names: Asset names the broker lists now
+            save: Rewrite the disk cache if the list changed
+
+        Returns:
+            bool: True if the list changed
+        """
+        names = sorted(set(map(str, names)))
+        if names == self.names.get(broker):
+            return False
+        self._build(broker, names)
+        if save:
+            try:
+                self.save()
+            except OSError as e:
+                logger.warning(f"Could not write symbol cache {self.path}: {e}")
+        return True
+
+    def _build(self, broker: str, names: Iterable[str]):
+        names = sorted(set(map(str, names)))
+        forward: Dict[str, str] = {}
+        reverse: Dict[str, str] = {}
+        # Shortest name first, so "EURUSD" wins over "EURUSD-op" for the same key
+        for name in sorted(names, key=lambda n: (len(n), n)):
+            if not _tradable(broker, name):
+                continue
+            key = canonical_asset(name)
+            reverse[name] = key
+            forward.setdefault(key, name)
+        if broker in OTC_AGNOSTIC:
+            for key, name in list(forward.items()):
+                forward.setdefault(f"{key}_otc", name)
+        with self._lock:
+            self.names[broker] = names
+            self.to_broker[broker] = forward
+            self.to_canonical[broker] = reverse
+            self._memo[broker] = {}
+
+    def canonical(self, name: str, broker: Optional[str] = None) -> str:
+        """Canonical key of an asset name (a dict hit for a name on ``broker``'s list)"""
+        key = self.to_canonical.get(broker, {}).get(name) if broker else None
+        return canonical_asset(name) if key is None else key
+
+    def translate(self, asset: str, target: str) -> str:
+        """
+        Name of an asset on another broker
+
+        Args:
+            asset: Asset name (any broker's, or canonical)
+            target: Broker the order goes to
+
+        Returns:
+            str: The target broker's name, ``UNMAPPABLE`` if the target's list
+            is known and lacks the instrument, or ``asset`` unchanged if the
+            target's list is not known yet
+        """
+        memo = self._memo.get(target)
+        if memo is None:
+            return asset
+        name = memo.get(asset)
+        if name is None:
+            # First time this spelling is seen: canonicalize once and remember
+            name = memo[asset] = self.to_broker[target].get(self.canonical(asset), UNMAPPABLE)
+        return name
+
+    def to_json(self) -> Dict[str, List[str]]:
+        return {broker: list(names) for broker, names in self.names.items()}
+
+    def save(self, path: Optional[str] = None, sources: Optional[Dict[str, str]] = None):
+        """Atomically write every broker's list"""
+        path = path or self.path
+        sources = self.sources if sources is None else sources
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "sources": sources, "names": self.to_json()}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+def _sdk_lists() -> Dict[str, Tuple[str, str, str]]:
+    """Broker -> (package, constants file, attribute) of the lists the SDKs ship"""
+    return {
+        "iqoption": ("iqoptionapi", "constants.py", "ACTIVES"),
+        "pocketoption": ("pocketoptionapi_async", "constants.py", "ASSETS"),
+    }
+
+
+def _fingerprint(package: str, filename: str) -> Optional[str]:
+    """Size and mtime of an SDK constants file, found without importing the SDK"""
+    try:
+        spec = importlib.util.find_spec(package)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    try:
+        stat = os.stat(os.path.join(list(spec.submodule_search_locations)[0], filename))
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_symbol_table(path: str = DEFAULT_PATH) -> SymbolTable:
+    """
+    Build the table from the disk cache, re-reading an SDK list only if its file changed
+
+    Importing an SDK just for its constants can take most of a second, so the
+    cache keeps each list with the size and mtime of the file it came from.
+
+    Args:
+        path: Cache file
+
+    Returns:
+        SymbolTable: The table
+    """
+    cache: Dict[str, Any] = {}
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable symbol cache {path}: {e}")
+    table = SymbolTable(cache.get("names", {}))
+    sources: Dict[str, str] = dict(cache.get("sources", {}))
+    changed = False
+    for broker, (package, filename, attribute) in _sdk_lists().items():
+        fingerprint = _fingerprint(package, filename)
+        if fingerprint is None or (sources.get(broker) == fingerprint and table.has(broker)):
+            continue
+        try:
+            module = importlib.import_module(f"{package}.{filename[:-3]}")
+        except ImportError as e:
+            logger.warning(f"Could not read {broker} assets from {package}: {e}")
+            continue
+        table.update(broker, getattr(module, attribute))
+        sources[broker] = fingerprint
+        changed = True
+    if changed:
+        try:
+            table.save(path, sources)
+        except OSError as e:
+            logger.warning(f"Could not write symbol cache {path}: {e}")
+    table.path = path
+    table.sources = sources
+    return table
+
+
+_tables: Dict[str, SymbolTable] = {}
+_tables_lock = threading.Lock()
+
+
+def symbol_table(path: str = DEFAULT_PATH) -> SymbolTable:
+    """The process-wide table for ``path``, loaded on first use"""
+    with _tables_lock:
+        table = _tables.get(path)
+        if table is None:
+            table = _tables[path] = load_symbol_table(path)
+        return table
@@ -0,0 +1,215 @@
+"""
+Broker server clocks and expiry-based staleness
+
+Masters used to stamp signals with their own box's clock and clients
+dropped anything stamped 15 s before their clock, so a few seconds of skew
+between two boxes (or a box and a broker) dropped good trades or copied
+ones that were about to expire. Signals now carry the trade's open and
+expiry times as the master's broker reported them (``Signal.server_stamp``
+and ``Signal.expiry``), and ``TimeSyncService`` tracks the offset between
+each broker's server clock and the local one, so a client can tell how
+long the master's trade has left::
+
+    clock = time_sync()
+    clock.sync_iqoption(api)
+    if clock.fresh(signal, "iqoption"):
+        ...
+
+Offsets come from the clocks the SDKs already keep:
+
+    iqoption      ``api.timesync``, set by the server's ``timeSync`` pushes
+    pocketoption  ``client.server_time``, the open times of the account's orders
+    deriv         the ``time`` call, timed by its round trip
+    quotex        none (pyquotex only knows the local clock and a zone offset)
+
+Broker server clocks are taken to agree with each other (they keep UTC),
+so a client measures a signal from any broker against the clock of the
+broker it trades on. Each broker keeps the best of its last ``window``
+samples: the shortest round trip, or among one-way samples (server stamps
+made before the message was sent) the largest offset, the one least
+delayed in transit. A broker without samples is read on the local clock.
+
+A signal is fresh while its trade has at least ``min_remaining(duration)``
+left. Signals without an expiry (written by older masters) fall back to an
+age limit.
+"""
+
+import math
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from .signals import Signal
+
+logger = logging.getLogger(__name__)
+
+SAMPLES = 8
+MIN_REMAINING = 3.0
+MIN_REMAINING_SHARE = 0.5
+# Age limit for signals that carry no expiry
+FALLBACK_STALENESS = 15.0
+SYNC_INTERVAL = 60.0
+# Samples further off than this are not clock readings (e.g. IQ Option's TimeSync before its first push)
+MAX_OFFSET = 86400.0
+
+
+def min_remaining(duration: float) -> float:
+    """
+    Time a copied trade must still have before its master's expiry
+
+    Args:
+        duration: Trade duration, seconds
+
+    Returns:
+        float: ``MIN_REMAINING`` seconds or ``MIN_REMAINING_SHARE`` of the
+        duration, whichever is longer
+    """
+    return max(MIN_REMAINING, duration * MIN_REMAINING_SHARE)
+
+
+class TimeSyncService:
+    """
+    Offsets (server minus local, seconds) of each broker's clock, thread-safe.
+
+    Args:
+        window: Samples kept per broker
+    """
+
+    def __init__(self, window: int = SAMPLES):
+        self.window = window
+        self.offsets: Dict[str, float] = {}
+        self.synced_at: Dict[str, float] = {}
+        self._samples: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, broker: str, server_time: float, local_time: Optional[float] = None,
+               rtt: Optional[float] = None) -> Optional[float]:
+        """
+        Add a clock sample
+
+        Args:
+            broker: Broker name
+            server_time: Broker server clock, epoch seconds
+            local_time: Local clock at the same moment: the midpoint of the
+                request's round trip, or when a pushed server stamp arrived
+                (defaults to now)
+            rtt: Round trip of a request/response sample; None for a one-way sample
+
+        Returns:
+            Optional[float]: The broker's offset after the sample, or None if
+            the sample was rejected
+        """
+        local_time = time.time() if local_time is None else local_time
+        offset = server_time - local_time
+        if abs(offset) > MAX_OFFSET:
+            logger.debug(f"Ignoring {broker} clock sample {server_time} ({offset:+.0f}s off)")
+            return None
+        sample = (math.inf if rtt is None else rtt, offset)
+        with self._lock:
+            samples = self._samples.get(broker)
+            if samples is None:
+                samples = self._samples[broker] = deque(maxlen=self.window)
+            if samples and samples[-1] == sample:
+                # The SDK's clock has not moved since the last read
+                return self.offsets[broker]
+            samples.append(sample)
+            best = min(samples, key=lambda s: (s[0], -s[1]))[1]
+            if abs(best - self.offsets.get(broker, best)) > 1.0:
+                logger.info(f"{broker} clock offset {self.offsets[broker]:+.3f}s -> {best:+.3f}s")
+            self.offsets[broker] = best
+            self.synced_at[broker] = time.time()
+        return best
+
+    def offset(self, broker: Optional[str]) -> float:
+        """Server minus local clock, seconds (0 for a broker without samples)"""
+        return self.offsets.get(broker, 0.0) if broker else 0.0
+
+    def now(self, broker: Optional[str] = None) -> float:
+        """The broker's server clock, read through the local one"""
+        return time.time() + self.offset(broker)
+
+    def remaining(self, signal: Signal, broker: Optional[str] = None) -> Optional[float]:
+        """
+        Seconds the master's trade has left
+
+        Args:
+            signal: Signal to check
+            broker: Broker whose clock to read (the caller's own)
+
+        Returns:
+            Optional[float]: Seconds to the signal's expiry, None if it carries none
+        """
+        if not signal.expiry:
+            return None
+        return signal.expiry - self.now(broker)
+
+    def fresh(self, signal: Signal, broker: Optional[str] = None, staleness: float = FALLBACK_STALENESS) -> bool:
+        """
+        Whether a signal is still worth copying
+
+        Args:
+            signal: Signal to check
+            broker: Broker whose clock to read (the caller's own)
+            staleness: Age limit, seconds, for a signal without an expiry
+
+        Returns:
+            bool: True if the trade has at least ``min_remaining`` left
+        """
+        remaining = self.remaining(signal, broker)
+        if remaining is None:
+            return time.time() - signal.stamp < staleness
+        return remaining >= min_remaining(signal.duration)
+
+    def deadline(self, signal: Signal, broker: Optional[str] = None, staleness: float = FALLBACK_STALENESS) -> float:
+        """
+        When a signal stops being fresh
+
+        Args:
+            signal: Signal to check
+            broker: Broker whose clock to read (the caller's own)
+            staleness: Age limit, seconds, for a signal without an expiry
+
+        Returns:
+            float: Epoch seconds on the local clock after which ``fresh()`` is False
+        """
+        if not signal.expiry:
+            return signal.stamp + staleness
+        return signal.expiry - self.offset(broker) - min_remaining(signal.duration)
+
+    def sync_iqoption(self, api: Any) -> Optional[float]:
+        """Sample an ``IQOptionAPI``'s TimeSync (the last ``timeSync`` push)"""
+        timesync = api.timesync
+        local_time = getattr(timesync, "local_timestamp", None)
+        if local_time is None:
+            return None
+        return self.update("iqoption", timesync.server_timestamp, local_time)
+
+    def sync_pocketoption(self, client: Any) -> Optional[float]:
+        """Sample an ``AsyncPocketOptionClient``'s ServerTime"""
+        server_time = getattr(client, "server_time", None)
+        if server_time is None:
+            return None
+        return self.update("pocketoption", server_time.server_timestamp, server_time.local_timestamp)
+
+    async def sync_deriv(self, api: Any) -> Optional[float]:
+        """Time a ``time`` request on an authorized DerivAPI session"""
+        sent = time.time()
+        response = await api.time()
+        received = time.time()
+        # Whole seconds: the server clock was somewhere in [time, time + 1)
+        return self.update("deriv", response["time"] + 0.5, (sent + received) / 2, received - sent)
+
+
+_service: Optional[TimeSyncService] = None
+_service_lock = threading.Lock()
+
+
+def time_sync() -> TimeSyncService:
+    """The process-wide service"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TimeSyncService()
+        return _service
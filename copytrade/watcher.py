@@ -0,0 +1,185 @@
+"""
+Wake-ups for file-based signal consumers
+
+On Linux an inotify watch on orders.log (IN_MODIFY / IN_MOVE_SELF) is
+registered with the asyncio loop, so a waiting client wakes as soon as a
+master appends. Elsewhere, or if inotify cannot be set up, the file is
+polled with an interval that drops to a few milliseconds after activity and
+backs off to ``max_interval`` while idle.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import logging
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+FILE_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVE_SELF | IN_DELETE_SELF
+DIR_MASK = IN_CREATE | IN_MOVED_TO
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+_libc = None
+
+
+def _load_libc():
+    """Return libc with the inotify symbols, or None if unavailable"""
+    global _libc
+    if _libc is None:
+        if not sys.platform.startswith("linux"):
+            _libc = False
+        else:
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+                _libc = libc if hasattr(libc, "inotify_init1") else False
+            except OSError:
+                _libc = False
+    return _libc or None
+
+
+class FileWatcher:
+    """
+    Waits for a file to change.
+
+    ``await wait(timeout)`` returns True as soon as the file was modified,
+    replaced (rotation) or created, and False on timeout.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        use_inotify: bool = True,
+        min_interval: float = 0.005,
+        max_interval: float = 0.1,
+    ):
+        self.path = os.path.abspath(path)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._interval = min_interval
+        self._event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fd: Optional[int] = None
+        self._file_wd = -1
+        self._dir_wd = -1
+        self._use_inotify = use_inotify
+        self._last_stat: Optional[Tuple[int, int, int]] = self._stat()
+
+    @property
+    def uses_inotify(self) -> bool:
+        """Whether change notifications come from inotify"""
+        return self._fd is not None
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        """Identity and size of the file, used by the polling fallback"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _start(self):
+        """Bind to the running loop and set up inotify if possible"""
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        libc = _load_libc() if self._use_inotify else None
+        if libc is None:
+            return
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            logger.warning(f"inotify_init1 failed (errno {ctypes.get_errno()}), polling instead")
+            return
+        self._fd = fd
+        self._dir_wd = libc.inotify_add_watch(fd, os.path.dirname(self.path).encode(), DIR_MASK)
+        self._add_file_watch()
+        try:
+            self._loop.add_reader(fd, self._on_readable)
+        except NotImplementedError:
+            # e.g. a Proactor loop; fall back to polling
+            os.close(fd)
+            self._fd = None
+
+    def _add_file_watch(self):
+        """(Re-)watch the path; it may be a new inode after rotation"""
+        self._file_wd = _libc.inotify_add_watch(self._fd, self.path.encode(), FILE_MASK)
+
+    def _on_readable(self):
+        """Drain inotify events and wake any waiter"""
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        name = os.path.basename(self.path).encode()
+        relevant = False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            event_name = data[offset + _EVENT_HEADER.size: offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += _EVENT_HEADER.size + length
+            if wd == self._file_wd:
+                relevant = True
+                if mask & (IN_MOVE_SELF | IN_DELETE_SELF | IN_IGNORED):
+                    self._add_file_watch()
+            elif wd == self._dir_wd and event_name == name:
+                relevant = True
+                self._add_file_watch()
+        if relevant:
+            self._event.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait until the file changes
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            bool: True if the file changed, False on timeout
+        """
+        if self._loop is None:
+            self._start()
+        if self._fd is not None:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+            self._event.clear()
+            return True
+        return await self._poll(timeout)
+
+    async def _poll(self, timeout: float) -> bool:
+        """Adaptive stat() polling used when inotify is unavailable"""
+        deadline = self._loop.time() + timeout
+        while True:
+            current = self._stat()
+            if current != self._last_stat:
+                self._last_stat = current
+                self._interval = self.min_interval
+                return True
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(self._interval, remaining))
+            self._interval = min(self._interval * 2, self.max_interval)
+
+    def close(self):
+        """Release the inotify descriptor"""
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
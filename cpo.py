@@ -1,64 +1,57 @@
 import asyncio
 from loguru import logger
 from pocketoptionapi_async import AsyncPocketOptionClient, OrderDirection
+from copytrade import UNMAPPABLE, AdmissionController, LatencyTracker, OrderExecutor, SeenIds, mark, open_signal_source, symbol_table, time_sync
+from pocketoptionapi_async.constants import API_LIMITS
 from datetime import datetime
-import re
-import threading
 import sys
 
+latency = LatencyTracker("cpo", dump_path="settings/latency/cpo.json")
+symbols = symbol_table()
+clock = time_sync()
 
-def read_orders_from_file(file_path):
-    """Reads orders from the log file and extracts relevant information."""
+
+def read_orders_from_signals(signals):
+    """Converts signals received from the masters into orders."""
     orders = []
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            match = re.search(
-                r"Stamp: (\d+\.?\d*) ID: (\d+\.?\d*) Asset: ([\w-]+) Amount: (\d+\.?\d*) Direction: (\w+) Duration: (\d+\.?\d*)",
-                line,
-            )
-            if match:
-                stamp, id, asset, amount, direction, duration = match.groups()
-                orders.append({
-                    "Stamp": float(stamp),
-                    "ID": int(id),
-                    "asset": asset,
-                    "amount": float(amount),
-                    "direction": OrderDirection.CALL if direction.lower() == "call" else OrderDirection.PUT,
-                    "duration": int(float(duration))
-                })
+    for signal in signals:
+        mark(signal, "receive")
+        asset = symbols.translate(signal.asset, "pocketoption")
+        if asset == UNMAPPABLE:
+            print(f"Asset {signal.asset} is not listed on PocketOption, skipping {signal.id}")
+            continue
+        direction = signal.direction
+        orders.append({
+            "Stamp": signal.stamp,
+            "ID": signal.id,
+            "asset": asset,
+            "amount": signal.amount,
+            "direction": OrderDirection.CALL if direction == "call" else OrderDirection.PUT,
+            "duration": signal.duration,
+            "signal": signal
+        })
     return orders
 
 async def execute_order(client, order):
-    """Executes a single order using the provided client."""
+    """Executes a single order using the provided client (errors are collected by the executor)."""
     Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Client]PocketOption: ")
-    try:
-        print(str(Timen) + f" New Order Placing: {order['ID']}")
-        order_result = await client.place_order(
-            asset=order["asset"],
-            amount=order["amount"],
-            direction=order["direction"],
-            duration=order["duration"],
-        )
-        #print(str(Timen) + f" Order result: {order_result.order_id}")
-
-        # Optionally, check the order result
-        if order_result and order_result.status != "error":  # Replace "error" with the actual error status if different
-            print(str(Timen) + f" Order placed successfully: {order_result.order_id}")
-        else:
-            print(str(Timen) + f" Failed to place order: {order_result.error_message if order_result else 'Unknown error'}")
-
-    except Exception as e:
-        print(f"Error executing order: {e}")
-
-def execute_order_thread_target(loop, client, order):
-    """Schedules execute_order to run on the main event loop from a separate thread."""
-    try:
-        # Schedule the coroutine to be executed in the event loop
-        future = asyncio.run_coroutine_threadsafe(execute_order(client, order), loop)
-        # Wait for the coroutine to finish. A timeout is a good idea.
-        future.result(timeout=60)
-    except Exception as e:
-        print(f"Error in thread for order {order.get('ID', 'N/A')}: {e}")
+    print(str(Timen) + f" New Order Placing: {order['ID']}")
+    mark(order["signal"], "send")
+    order_result = await client.place_order(
+        asset=order["asset"],
+        amount=order["amount"],
+        direction=order["direction"],
+        duration=order["duration"],
+    )
+    mark(order["signal"], "ack")
+    #print(str(Timen) + f" Order result: {order_result.order_id}")
+
+    # Optionally, check the order result
+    if order_result and order_result.status != "error":  # Replace "error" with the actual error status if different
+        latency.record(order["signal"], "pocketoption")
+        print(str(Timen) + f" Order placed successfully: {order_result.order_id}")
+        return order_result.order_id
+    raise RuntimeError(order_result.error_message if order_result else "Unknown error")
 
 async def main():
             
@@ -81,6 +74,7 @@ async def main():
     
     client = AsyncPocketOptionClient(ssid=ssid, is_demo=True,  # Enable keep-alive like old API
             auto_reconnect=True,)
+    executor = None
 
     try:
         #logger.info("Connecting to PocketOption...")
@@ -110,16 +104,23 @@ async def main():
             # Test placing an order (this should now work without the order_id error)
             #logger.info("esting order placement...")
 
-            # Get the current event loop to pass to threads
-            main_event_loop = asyncio.get_running_loop()
+            # Orders run as tasks on this loop, at most as many as the broker accepts at once and within its rate limit
+            admission = AdmissionController.for_broker("pocketoption")
+            executor = OrderExecutor(max_concurrent=API_LIMITS["max_concurrent_orders"], deadline=60, admission=admission)
 
-            ListOrder = []
+            source = await open_signal_source("cpo")
+            ListOrder = SeenIds(ttl=60, snapshot_path="settings/seen/cpo.json")
             cnt = 0
             while True:
                 Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Client]PocketOption: ")
                 print("" + str(Timen) + " 📊 Checking active orders to Read...")
-                # Read orders from file
-                orders = read_orders_from_file("orders.log")
+                # Write the seen-ID snapshot if the last burst left it behind
+                ListOrder.flush()
+                # Wait for new orders from the masters
+                orders = read_orders_from_signals(await source.poll(0.5))
+                report = latency.maybe_report()
+                if report:
+                    print(str(Timen) + " " + report)
                 #print(f"Orders from file: {orders}")
                 #await asyncio.sleep(20)
 
@@ -148,33 +149,30 @@ async def main():
                     print(str(Timen) + " You Are Still connected !")
                     #time.sleep(0.5)  # Wait for a second to ensure reconnection is established
             
-                # Execute orders as threads
-                threads = []
-                now = datetime.now().timestamp()
+                # Report orders that failed or ran past their deadline since the last poll
+                for outcome in executor.drain():
+                    if not outcome.ok:
+                        print(str(Timen) + " " + outcome.describe())
+
+                # Execute orders as tasks, while the master's trade has enough time left on the server clock
+                clock.sync_pocketoption(client)
                 
                 for order in orders:
-                    if (order["ID"] not in ListOrder) and ((now - int(order["Stamp"])) < 15 ):
-                        ListOrder.append(order["ID"])
-                        thread = threading.Thread(
-                            target=execute_order_thread_target,
-                            args=(main_event_loop, client, order)
+                    if not clock.fresh(order["signal"], "pocketoption"):
+                        print(str(Timen) + f" Order {order['ID']} too close to expiry, skipping")
+                    elif ListOrder.add(order["ID"], expires_at=order["signal"].expiry):
+                        executor.submit(
+                            order["ID"], lambda order=order: execute_order(client, order),
+                            not_after=clock.deadline(order["signal"], "pocketoption"), signal=order["signal"],
                         )
-                        threads.append(thread)
-                        thread.start()
-                    else:
-                        continue
-    
-                # Wait for all tasks to complete
-                #for thread in threads:
-                    #thread.join()
-                
-                await asyncio.sleep( 0.5 )  # Use asyncio.sleep in an async function
                 
     except Exception as e:
         #logger.error(f"Connection error: {e}")
         print(f"Connection error: {e}")
 
     finally:
+        if executor is not None:
+            await executor.close()
         await client.disconnect()
         logger.info("Disconnected")
 
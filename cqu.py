@@ -7,8 +7,6 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict, Any, Callable
 from functools import wraps
-import threading # Added import
-import re
 import pandas as pd
 
 
@@ -24,6 +22,7 @@ from pyquotex.utils.processor import (
 )
 from pyquotex.config import credentials
 from pyquotex.stable_api import Quotex
+from copytrade import UNMAPPABLE, AdmissionController, LatencyTracker, OrderExecutor, SeenIds, Signal, mark, open_signal_source, symbol_table, time_sync
 
 __author__ = "Cleiton Leonel Creton"
 __version__ = "1.0.3"
@@ -41,31 +40,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def read_trades_from_log(file_path: str = "orders.log") -> List[Dict[str, Any]]:
-    """Reads trade orders from the log file."""
+latency = LatencyTracker("cqu", dump_path="settings/latency/cqu.json")
+symbols = symbol_table()
+# pyquotex has no server clock to sample: signals are measured on the local clock
+clock = time_sync()
+
+def read_trades_from_signals(signals: List[Signal]) -> List[Dict[str, Any]]:
+    """Converts signals received from the masters into trade orders."""
     trades = []
-    log_file = Path(file_path)
-    if not log_file.is_file():
-        logger.warning(f"Log file not found: {file_path}")
-        return trades
-
-    with open(log_file, "r", encoding="utf-8") as f:
-        for line in f:
-            match = re.search(
-                r"Stamp: (\d+\.?\d*)\s+ID: (\d+\.?\d*)\s+Asset: ([\w-]+)\s+Amount: (\d+\.?\d*)\s+Direction: (\w+)\s+Duration: (\d+\.?\d*)",
-                line,
-            )
-            #print(match)
-            if match:
-                stamp, id, asset, amount, direction, duration = match.groups()
-                trades.append({
-                    'stamp': int(stamp),
-                    'trade_id': int(id),
-                    'amount': float(amount),
-                    'asset': asset,
-                    'direction': direction.lower(),
-                    'duration': int(float(duration))
-                })
+    for signal in signals:
+        mark(signal, "receive")
+        asset = symbols.translate(signal.asset, "quotex")
+        if asset == UNMAPPABLE:
+            print(f"Asset {signal.asset} is not listed on Quotex, skipping {signal.id}")
+            continue
+        trades.append({
+            'stamp': int(signal.stamp),
+            'trade_id': signal.id,
+            'amount': signal.amount,
+            'asset': asset,
+            'direction': signal.direction,
+            'duration': signal.duration,
+            'signal': signal
+        })
     #print(trades)
     return trades
 
@@ -202,8 +199,8 @@ class PyQuotexCLI:
         print(description)
 
     @ensure_connection()
-    async def buy_simple(self, stamp: int = 0, trade_id: int = 0, amount: float = 50, asset: str = None,
-                         direction: str = "call", duration: int = 60) -> None:
+    async def buy_simple(self, stamp: int = 0, trade_id: str = "", amount: float = 50, asset: str = None,
+                         direction: str = "call", duration: int = 60, signal: Optional[Signal] = None) -> None:
         """Executes a simple buy operation."""
         logger.info(f"Executing simple buy: {amount} on {asset} in {direction} direction for {duration}s.")
         """
@@ -217,9 +214,15 @@ class PyQuotexCLI:
 
         logger.info(f"Asset {asset} is open.")
         """
+        if signal is not None:
+            mark(signal, "send")
         status, buy_info = await self.client.buy(
             amount, asset, direction, duration, time_mode="TIMER"
         )
+        if signal is not None:
+            mark(signal, "ack")
+            if status:
+                latency.record(signal, "quotex")
         Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Client]Quotex: ")
         if status:
             logger.info(f"Buy successful: {buy_info}")
@@ -472,24 +475,15 @@ class PyQuotexCLI:
         finally:
             pass
 
-# This synchronous function will be the target for each thread.
-# It safely schedules the asynchronous 'buy_simple' coroutine on the main event loop.
-def thread_target(loop, cli_instance, **trade_params):
-        try:
-            future = asyncio.run_coroutine_threadsafe(
-                cli_instance.buy_simple(**trade_params),
-                loop
-            )
-            # You can optionally wait for the result within the thread
-            future.result(timeout=0.1)  # Wait for up to 120 seconds for the trade to execute
-            #logger.info(f"Trade successfully submitted from thread for asset: {trade_params['asset']}")
-        except Exception as e:
-            logger.error("")
+# Trades placed at once; more wait for a free slot
+MAX_CONCURRENT = 8
+# Seconds a trade may take, from signal to broker reply, before it is cancelled
+ORDER_DEADLINE = 60
 
 
 async def main():
     """
-    Main function to run trades concurrently using threading.
+    Main function to run trades concurrently as tasks on the event loop.
     """
     logging.getLogger().setLevel(logging.CRITICAL)
     cli = PyQuotexCLI()
@@ -501,7 +495,14 @@ async def main():
     Balance = await cli.get_balance()
     print(Balance)
     await cli.change_account("PRACTICE")
-    ListTrade = []
+    # Quotex lists its instruments only after login; keep the symbol table current
+    if symbols.update("quotex", await cli.client.get_all_assets(), save=True):
+        print(str(Timen) + " Quotex instrument list updated")
+    source = await open_signal_source("cqu")
+    ListTrade = SeenIds(ttl=60, snapshot_path="settings/seen/cqu.json")
+    executor = OrderExecutor(
+        max_concurrent=MAX_CONCURRENT, deadline=ORDER_DEADLINE, admission=AdmissionController.for_broker("quotex")
+    )
     cnt = 0
     #await asyncio.sleep(30)
 
@@ -510,19 +511,17 @@ async def main():
     try:
         while True:
             #Timens = pd.to_datetime(await cli.client.get_server_time(), utc=False, unit='s')
-            # Get the running asyncio event loop to pass it to the threads
             Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Client]Quotex: ")
-            main_event_loop = asyncio.get_running_loop()
             print("" + str(Timen) + " 📊 Checking active orders to Read...")
+            # Write the seen-ID snapshot if the last burst left it behind
+            ListTrade.flush()
     
-            # Read trades from the log file
-            trades_to_run = read_trades_from_log("orders.log")
+            # Wait for new trades from the masters
+            trades_to_run = read_trades_from_signals(await source.poll(0.3))
+            report = latency.maybe_report()
+            if report:
+                print(str(Timen) + " " + report)
     
-            if not trades_to_run:
-                logger.warning("No trades found in orders.log. Exiting.")
-                print(str(Timen) + " ⚠️No trades to execute from orders.log.")
-                #return
-
             #test connection every 30 and 31 seconds
             cnt += 1
             if cnt >= 30:
@@ -545,41 +544,30 @@ async def main():
                 print(str(Timen) + " You Are Still connected !")
                 #time.sleep(0.5)  # Wait for a second to ensure reconnection is established
     
-            threads = []
-            now = datetime.now().timestamp()
+            # Report trades that failed or ran past their deadline since the last poll
+            for outcome in executor.drain():
+                if not outcome.ok:
+                    logger.error(outcome.describe())
+                    print(str(Timen) + " " + outcome.describe())
+
             for trade in trades_to_run:
-                #print(now - int(trade["stamp"]))
-                if (trade['trade_id'] not in ListTrade) and ((now - int(trade["stamp"])) < 15 ):
-                    # Create a thread for each trade
-                    t = threading.Thread(
-                        target=thread_target,
-                        args=(main_event_loop, cli),
-                        kwargs=trade
+                if not clock.fresh(trade["signal"], "quotex"):
+                    print(str(Timen) + f" Trade {trade['trade_id']} too close to expiry, skipping")
+                elif ListTrade.add(trade['trade_id'], expires_at=trade["signal"].expiry):
+                    # Run each trade as a task on this loop
+                    executor.submit(
+                        trade['trade_id'], lambda trade=trade: cli.buy_simple(**trade),
+                        not_after=clock.deadline(trade["signal"], "quotex"), signal=trade["signal"],
                     )
-                    threads.append(t)
-                    t.start() # Start the thread
-                    logger.info(f"Thread started for trade: {trade['trade_id']}")
-                    print(str(Timen)+ f"Thread started for trade: {trade['trade_id']}")
-                    ListTrade.append(trade['trade_id'])
-                else:
-                    continue
-    
-            # Wait for all threads to complete their execution
-            #for t in threads:
-                #t.join()
-    
-            #logger.info("All trade threads have completed.")
-            #print(str(Timen)+" All trade threads have completed,  Waiting For new Trades ...")
-    
-            # Clear the list of threads
-            threads = []
+                    logger.info(f"Task started for trade: {trade['trade_id']}")
+                    print(str(Timen)+ f"Task started for trade: {trade['trade_id']}")
     
-            # You can now perform other operations sequentially after the threads are done
+            # You can now perform other operations sequentially while the trades run
             #Balance = await cli.get_balance()
             #print(str(Timen)+Balance)
-            await asyncio.sleep(0.3)
 
     finally:
+        await executor.close()
         if cli.client and await cli.client.check_connect():
             logger.info("Closing connection.")
             await cli.client.close()
@@ -173,6 +173,8 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         self.token_login2fa = None
         self.token_sms = None
         self.proxies = proxies
+        # called with (id, message) on the websocket thread for every "socket-option-opened"
+        self.socket_option_opened_listeners = []
         # is used to determine if a buyOrder was set  or failed. If
         # it is None, there had been no buy order yet or just send.
         # If it is false, the last failed
@@ -1,5 +1,6 @@
 # python
 import time
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 
 # https://docs.python.org/3/library/datetime.html
@@ -78,3 +79,73 @@ def get_remaning_time(timestamp):
         remaning.append((dr, int(t)-int(time.time())))
 
     return remaning
+
+
+class ExpirationSchedule(object):
+    """The expiration ladder of get_expiration_time() and get_remaning_time(), built once and looked up by bisection.
+
+    The ladder (5 one-minute turbo expiries, then quarter hours more than
+    5 minutes away) only moves when the timestamp crosses a minute or the
+    30 second turbo cutoff, so it is kept for the current half minute.
+    """
+
+    TURBO = 5
+    QUARTERS = 50
+    # Slots get_remaning_time() lists
+    REMANING = TURBO + 11
+
+    def __init__(self):
+        # (half minute, expiries); replaced whole, so threads can share it
+        self._cached = (None, [])
+        self.minutes = [idx + 1 if idx < self.TURBO else 15 * (idx - self.TURBO + 1)
+                        for idx in range(self.TURBO + self.QUARTERS)]
+
+    def ladder(self, timestamp):
+        """Expiry timestamps, ascending, for a trade opened at timestamp"""
+        key = int(timestamp // 30)
+        cached = self._cached
+        if cached[0] != key:
+            cached = self._cached = (key, self._build(timestamp))
+        return cached[1]
+
+    def _build(self, timestamp):
+        minute = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0)
+        exp_date = minute+timedelta(minutes=1)
+        if (int(date_to_timestamp(exp_date))-timestamp) <= 30:
+            exp_date = exp_date+timedelta(minutes=1)
+        exp = [int(date_to_timestamp(exp_date+timedelta(minutes=i))) for i in range(self.TURBO)]
+        exp_date = minute
+        while exp_date.minute % 15 != 0 or (int(date_to_timestamp(exp_date))-int(timestamp)) <= 60*5:
+            exp_date = exp_date+timedelta(minutes=1)
+        for _ in range(self.QUARTERS):
+            exp.append(int(date_to_timestamp(exp_date)))
+            exp_date = exp_date+timedelta(minutes=15)
+        return exp
+
+    def expiration(self, timestamp, duration, now=None):
+        """get_expiration_time(): the expiry closest to duration minutes from now, and its index"""
+        exp = self.ladder(timestamp)
+        target = int(time.time() if now is None else now)+60*duration
+        idx = bisect_left(exp, target)
+        if idx == len(exp) or (idx > 0 and target-exp[idx-1] <= exp[idx]-target):
+            idx = idx-1
+        # The first of equal expiries, as get_expiration_time() picks
+        idx = bisect_left(exp, exp[idx])
+        return exp[idx], idx
+
+    def remaning(self, timestamp, now=None):
+        """get_remaning_time(): (minutes, seconds left) per slot"""
+        exp = self.ladder(timestamp)
+        now = int(time.time() if now is None else now)
+        return [(self.minutes[idx], exp[idx]-now) for idx in range(self.REMANING)]
+
+    def duration_for(self, timestamp, seconds, now=None):
+        """Minutes of the first get_remaning_time() slot with more than seconds left, None past the last one"""
+        exp = self.ladder(timestamp)
+        idx = bisect_right(exp, seconds+int(time.time() if now is None else now), 0, self.REMANING)
+        if idx == self.REMANING:
+            return None
+        return self.minutes[idx]
+
+
+expiration_schedule = ExpirationSchedule()
@@ -5,12 +5,13 @@ import iqoptionapi.country_id as Country
 import threading
 import time
 import json
+import queue
 import logging
 import operator
 import iqoptionapi.global_value as global_value
 from collections import defaultdict
 from collections import deque
-from iqoptionapi.expiration import get_expiration_time, get_remaning_time
+from iqoptionapi.expiration import expiration_schedule
 from iqoptionapi.version_control import api_version
 from datetime import datetime, timedelta
 from random import randint
@@ -37,6 +38,8 @@ class IQ_Option:
         self.subscribe_candle_all_size = []
         self.subscribe_mood = []
         self.subscribe_indicators = []
+        # kept here so the listeners survive the new IQOptionAPI of every connect()
+        self.option_opened_listeners = []
         # for digit
         self.get_digital_spot_profit_after_sale_data = nested_dict(2, int)
         self.get_realtime_strike_list_temp_data = {}
@@ -87,6 +90,7 @@ class IQ_Option:
 
         self.api = IQOptionAPI(
             "iqoption.com", self.email, self.password)
+        self.api.socket_option_opened_listeners = self.option_opened_listeners
         check = None
 
         # 2FA--
@@ -861,7 +865,7 @@ class IQ_Option:
             logging.error('buy_multi error please input all same len')
 
     def get_remaning(self, duration):
-        for remaning in get_remaning_time(self.api.timesync.server_timestamp):
+        for remaning in expiration_schedule.remaning(self.api.timesync.server_timestamp):
             if remaning[0] == duration:
                 return remaning[1]
         logging.error('get_remaning(self,duration) ERROR duration')
@@ -1049,7 +1053,7 @@ class IQ_Option:
         # doEURUSD201907191250PT5MPSPT
         timestamp = int(self.api.timesync.server_timestamp)
         if duration == 1:
-            exp, _ = get_expiration_time(timestamp, duration)
+            exp, _ = expiration_schedule.expiration(timestamp, duration)
         else:
             now_date = datetime.fromtimestamp(
                 timestamp) + timedelta(minutes=1, seconds=30)
@@ -1469,6 +1473,39 @@ class IQ_Option:
     def del_option_open_by_other_pc(self, id):
         del self.api.socket_option_opened[id]
 
+    def subscribe_option_opened(self, callback=None, maxsize=0):
+        """Get every "socket-option-opened" push the moment it arrives.
+
+        :param callback: (optional) Called as ``callback(id, message)`` on the
+            websocket thread; it must return quickly.
+        :param maxsize: Size of the queue returned when no callback is given
+            (0 is unbounded); pushes that find it full are dropped and logged.
+        :returns: The callback, or a ``queue.Queue`` of ``(id, message)``;
+            pass it to :meth:`unsubscribe_option_opened` to stop.
+
+        The push is still kept in ``get_option_open_by_other_pc()`` as well.
+        """
+        if callback is None:
+            events = queue.Queue(maxsize)
+
+            def callback(id, message):
+                try:
+                    events.put_nowait((id, message))
+                except queue.Full:
+                    logging.error("socket-option-opened queue full, dropping option %s", id)
+
+            events.listener = callback
+            self.option_opened_listeners.append(callback)
+            return events
+        self.option_opened_listeners.append(callback)
+        return callback
+
+    def unsubscribe_option_opened(self, subscription):
+        """Stop a subscription made with :meth:`subscribe_option_opened`."""
+        listener = getattr(subscription, "listener", subscription)
+        if listener in self.option_opened_listeners:
+            self.option_opened_listeners.remove(listener)
+
     # -----------------------------------------------------------------
 
     def opcode_to_name(self, opcode):
@@ -1579,7 +1616,7 @@ class IQ_Option:
         timestamp = int(self.api.timesync.server_timestamp)
 
         if duration == 1:
-            exp, _ = get_expiration_time(timestamp, duration)
+            exp, _ = expiration_schedule.expiration(timestamp, duration)
         else:
             now_date = datetime.fromtimestamp(
                 timestamp) + timedelta(minutes=1, seconds=30)
@@ -2,7 +2,7 @@
 from datetime import datetime, timedelta
 import iqoptionapi.global_value as global_value
 from iqoptionapi.ws.chanels.base import Base
-from iqoptionapi.expiration import get_expiration_time
+from iqoptionapi.expiration import expiration_schedule
 
 
 class Buyv2(Base):
@@ -18,7 +18,7 @@ class Buyv2(Base):
         :param direction: The buying direction.
         """
 
-        exp, idx = get_expiration_time(
+        exp, idx = expiration_schedule.expiration(
             int(self.api.timesync.server_timestamp), duration)
 
         if idx < 5:
@@ -3,7 +3,7 @@ import time
 from iqoptionapi.ws.chanels.base import Base
 import logging
 import iqoptionapi.global_value as global_value
-from iqoptionapi.expiration import get_expiration_time
+from iqoptionapi.expiration import expiration_schedule
 
 
 class Buyv3(Base):
@@ -14,7 +14,7 @@ class Buyv3(Base):
 
         # thank Darth-Carrotpie's code
         # https://github.com/Lu-Yi-Hsun/iqoptionapi/issues/6
-        exp, idx = get_expiration_time(
+        exp, idx = expiration_schedule.expiration(
             int(self.api.timesync.server_timestamp), duration)
         if idx < 5:
             option = 3  # "turbo"
@@ -13,6 +13,7 @@ class TimeSync(Base):
         super(TimeSync, self).__init__()
         self.__name = "timeSync"
         self.__server_timestamp = time.time()
+        self.__local_timestamp = None
         self.__expiration_time = 1
 
     @property
@@ -31,6 +32,15 @@ class TimeSync(Base):
     def server_timestamp(self, timestamp):
         """Method to set server timestamp."""
         self.__server_timestamp = timestamp
+        self.__local_timestamp = None if timestamp is None else time.time()
+
+    @property
+    def local_timestamp(self):
+        """Property to get the local time the server timestamp was received.
+
+        :returns: The local timestamp, or None before the first timeSync message.
+        """
+        return self.__local_timestamp
 
     @property
     def server_datetime(self):
@@ -1,6 +1,12 @@
 """Module for IQ option websocket."""
+import logging
 
 def socket_option_opened(api, message):
     if message["name"] == "socket-option-opened":
         id = message["msg"]["id"]
-        api.socket_option_opened[id] = message
\ No newline at end of file
+        api.socket_option_opened[id] = message
+        for listener in list(api.socket_option_opened_listeners):
+            try:
+                listener(id, message)
+            except Exception:
+                logging.exception("socket-option-opened listener failed")
\ No newline at end of file
@@ -2,25 +2,13 @@
 import sys
 import asyncio
 import os
-from deriv_api import DerivAPI
 from deriv_api import APIError
-import time
+from copytrade import SeenIds, SignalPublisher, time_sync
+from copytrade.brokers import signal_from_deriv_contract
+from copytrade.deriv import DerivContractFeed
+from copytrade.timesync import SYNC_INTERVAL
 from datetime import datetime
-import socket
-
-def test_connection(host="8.8.8.8", port=53, timeout=3):
-  try:
-    socket.setdefaulttimeout(timeout)
-    socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((host, port))
-    return True, None
-  except Exception as ex:
-    #print ex.message
-    return False, ex
-
-# Check connection to Deriv server
-destination_host = "app.deriv.com"
-destination_port = 443  # Default port for HTTPS
-timeout = 0.5
+import time
 
 # Read raw ssids from ssid.txt
 try:
@@ -43,94 +31,59 @@ if len(token) == 0:
 
 
 async def main():
-    api = DerivAPI(app_id=app_id)
     Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Master]Deriv: ")
     print(str(Timen) + " Connecting to Deriv API...")
-    # Authorize
-    authorize = await api.authorize(token)
-    #print(authorize)
-    if authorize["authorize"]["account_list"]:
-        print(str(Timen) + " Connected successfully to Deriv API!")
-    else:
+    # One pooled session, pinged and reconnected in the background, carries the contract subscriptions
+    feed = DerivContractFeed(token, app_id=app_id)
+    try:
+        await feed.start()
+    except ConnectionError:
         print(str(Timen) + " ❌ Authorization failed. Please check your API token.")
         exit()
-
+    print(str(Timen) + " Connected successfully to Deriv API!")
 
     # Get Balance
-    response = await api.balance()
+    async with feed.pool.lease() as api:
+        response = await api.balance()
     response = response['balance']
     currency = response['currency']
     print(str(Timen) + " Your current balance is " + str(currency) + " " + str( response['balance']) )
     
-    # Get assets
-    #assets = await api.cache.asset_index({"asset_index": 1})
-    #print(assets)
-    #await buy(api, symbol= "R_100",amount = 1, duration = 60)
-    #await buy(api, symbol= "R_100",amount = 1, duration = 60)
-    lt = []  # list of open contracts
-    ListTrade =  []
-    cnt = 0  # Counter for connection checks
+    publisher = SignalPublisher(ring="deriv")
+    lt = SeenIds(ttl=86400, snapshot_path="settings/seen/mdr.json")  # contracts already published
+    resubscribes = 0
+    # Contracts are published while they have enough time left on the Deriv server clock
+    clock = time_sync()
+    next_sync = 0.0
+    print(str(Timen) + " 📊 Watching for new contracts...")
     while True:
+        lt.flush()
+        if time.monotonic() >= next_sync:
+            next_sync = time.monotonic() + SYNC_INTERVAL
+            try:
+                async with feed.pool.lease() as api:
+                    await asyncio.wait_for(clock.sync_deriv(api), 10)
+            except Exception as e:
+                print(str(Timen) + f" Time sync failed: {e}")
         try:
-            cnt += 1
-            if cnt >= 30:
-                Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Master]Deriv: ")
-                cnt = 0
-            #if datetime.now().second in [45,46,15,16]:
-                test_result, ex = test_connection(destination_host, destination_port, timeout)
-                if test_result == True:
-                    print(str(Timen) + " Checking connection status...")
-                    api = DerivAPI(app_id=app_id)
-                    # Authorize
-                    authorize = await api.authorize(token)
-                
-                    if authorize["authorize"]["account_list"]:
-                        print(str(Timen) + " ✅ Reconnected successfully !")
-                        response = await api.ping({'ping': 1})
-                    else:
-                        print(str(Timen) + " ❌ Reconnection failed. Retrying...")
-                        cnt = 31
-            test_result, ex = test_connection(destination_host, destination_port, timeout)
-            if test_result == True:
-                Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Master]Deriv: ")
-                print("" + str(Timen) + " 📊 Checking active orders to Write...")
-
-            
-                trades = await api.proposal_open_contract(
-                    {"proposal_open_contract": 1 })
-                #print(trades)
-                #print(trades['proposal_open_contract']['contract_id'], trades['proposal_open_contract']['status'])
-                #for trade in lt:
-                if bool(trades['proposal_open_contract']) == True:
-                    if str(trades['proposal_open_contract']['contract_id'])[-8:] not in lt:
-                        #lt.append(str(trades['proposal_open_contract']['contract_id'])[-8:])  # Store only the last 8 characters of the contract ID
-                        ListTrade.append(trades['proposal_open_contract'])
-            
-                    #print("Open Contracts: ", len(ListTrade))
-                if ListTrade:
-                    for trade in ListTrade:
-                        idt = str(trade['contract_id'])[-8:] 
-                        if (idt not in lt) and ((int(time.time()) - int(trade['date_start'])) < 15) :
-                            duration = trade['date_expiry'] - trade['date_start']      
-                            trade['underlying'] = str(trade['underlying']).replace("frx", "")
-                            #print(trade)
-                            print(str(Timen) + " New trade detected:"+ str(idt)+ " Asset: " + trade['display_name'] + " Direction: " + str(trade['contract_type']).lower() + " Duration: " + str(duration) + " seconds")
-                            log_entry = f"- Time: {datetime.now()} Stamp: {int(datetime.now().timestamp())} ID: {int(idt)} Asset: {trade['underlying']} Amount: {trade['buy_price']} Direction: {str(trade['contract_type']).lower()} Duration: {duration}\n"  #trade['underlying'] + "\n"
-                            with open("orders.log", "a", encoding="utf-8") as f:
-                                f.write(log_entry)
-                            print(str(Timen) + f"   -> Logged new order {idt} to orders.log")
-                            lt.append(idt)
-                            
-                        else:
-                            continue
-            else:
+            trade, received_at = await asyncio.wait_for(feed.__anext__(), 1)
+        except asyncio.TimeoutError:
+            if feed.resubscribes != resubscribes:
+                resubscribes = feed.resubscribes
                 Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Master]Deriv: ")
-                print(str(Timen) + " ❌ Reconnection failed. Retrying...")
-                cnt = 31 
-            await asyncio.sleep(0.5)
-        except APIError as e:
-            print(str(Timen) + " API Error: " + str(e))
-            await asyncio.sleep(0.5)
+                print(str(Timen) + " ✅ Reconnected successfully !")
+            continue
+        Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Master]Deriv: ")
+        idt = str(trade['contract_id'])[-8:]
+        signal = signal_from_deriv_contract(trade, now=received_at)
+        if (idt in lt) or not clock.fresh(signal, "deriv"):
+            continue
+        print(str(Timen) + " New trade detected:"+ str(idt)+ " Asset: " + trade['display_name'] + " Direction: " + signal.direction + " Duration: " + str(signal.duration) + " seconds")
+        if publisher.publish(signal):
+            print(str(Timen) + f"   -> Published new order {idt} to the signal bus")
+        else:
+            print(str(Timen) + f"   -> Logged new order {idt} to orders.log")
+        lt.add(idt)
     
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 from iqoptionapi.stable_api import IQ_Option
-from iqoptionapi import expiration
+from copytrade import SeenIds, SignalPublisher
+from copytrade.brokers import signal_from_iq_option
 import time
+import queue
 from datetime import datetime
 import sys
 
@@ -34,14 +36,28 @@ api.change_balance("PRACTICE")
 print(str(Timen) + " Balance:", api.get_balance())
 print(str(Timen) + " Type of account:", api.get_balance_mode())
 
-ListTrade = []
+publisher = SignalPublisher(ring="iqoption")
+# Keep published IDs for a day so a restart never republishes an open trade
+ListTrade = SeenIds(ttl=86400, snapshot_path="settings/seen/miq.json")
+# The SDK hands every "socket-option-opened" push to this queue as it arrives
+events = api.subscribe_option_opened()
+# Options opened before subscribing are only in the SDK's dict
+for id, trade in list(api.get_option_open_by_other_pc().items()):
+    events.put((id, trade))
 cnt = 0
 while True:
     try:
         
         Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Master]Iqoption: ")
-        print("" + str(Timen) + " 📊 Checking active orders to Write...")
-        trades = api.get_option_open_by_other_pc()
+        ListTrade.flush()
+        try:
+            # Wakes up the moment a push arrives; the timeout only paces the connection checks
+            trades = dict([events.get(timeout=0.5)])
+            while not events.empty():
+                trades.update([events.get_nowait()])
+        except queue.Empty:
+            trades = {}
+            print("" + str(Timen) + " 📊 Checking active orders to Write...")
 
         #test connection every 30 and 31 seconds
         cnt += 1
@@ -70,37 +86,20 @@ while True:
         
         if trades:
             #print("Trades:", trades)
-            for id, trade in trades.items():
+            for id, trade in list(trades.items()):
                 idt = str(id)
                 idt = idt[-8:] 
                 if idt not in ListTrade:
-                    duration = trade['msg']['expired'] - trade['msg']['created']
-                    durations = expiration.get_remaning_time(datetime.now().timestamp())
-                    #print(durations,duration)
-                    for i in durations:
-                        if duration >= i[1]:
-                            continue
-                        else:
-                            duration_new = i[0] * 60
-                            break     
-                    #print("Duration:", duration, "New Duration:", duration_new)
-                    #print(trade)
-                    #time.sleep(700)  # Use time.sleep in a synchronous function
-                    if trade['msg']['type_name'] == "blitz":
-                        duration_new = duration
-                    pktrade = str(trade['msg']['active']).replace("-OTC", "_otc")
-                    pktrade = str(pktrade).replace("-op", "")
-                    print(str(Timen) + " New trade detected:"+ str(idt)+ " Asset: " + trade['msg']['active'] + " Direction: " + trade['msg']['dir'] + " Duration: " + str(duration_new) + " seconds")
-                    log_entry = f"- Time: {datetime.now()} Stamp: {int(datetime.now().timestamp())} ID: {idt} Asset: {pktrade} Amount: {trade['msg']['profit_amount']} Direction: {trade['msg']['dir']} Duration: {duration_new}\n"
+                    signal = signal_from_iq_option(id, trade['msg'])
+                    print(str(Timen) + " New trade detected:"+ str(idt)+ " Asset: " + trade['msg']['active'] + " Direction: " + trade['msg']['dir'] + " Duration: " + str(signal.duration) + " seconds")
                     #log_entry = f"ID: {id}, Active: {trade['msg']['active']}, Amount: {trade['msg']['profit_amount'] }, Direction: {trade['msg']['dir']} created: {trade['msg']['created']}, Expired: {trade['msg']['expired']} Type: {trade['msg']['type_name']} "
-                    with open("orders.log", "a", encoding="utf-8") as f:
-                        f.write(log_entry)
-                    print(str(Timen) + f"   -> Logged new order {idt} to orders.log")
-                    ListTrade.append(idt)
-                    api.del_option_open_by_other_pc(id)
-                else:
-                    continue
-        time.sleep(0.5)  # Use time.sleep in a synchronous function
+                    if publisher.publish(signal):
+                        print(str(Timen) + f"   -> Published new order {idt} to the signal bus")
+                    else:
+                        print(str(Timen) + f"   -> Logged new order {idt} to orders.log")
+                    ListTrade.add(idt)
+                # The SDK keeps every push in its dict as well
+                api.get_option_open_by_other_pc().pop(id, None)
     
     except Exception as e:
         print(str(Timen) + f" An error occurred: {e}")
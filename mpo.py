@@ -5,6 +5,8 @@ import re
 import asyncio
 from loguru import logger
 from pocketoptionapi_async import AsyncPocketOptionClient, OrderDirection
+from copytrade import SeenIds, SignalPublisher
+from copytrade.brokers import signal_from_pocket_order
 from datetime import datetime
 import sys
 
@@ -47,6 +49,7 @@ async def main():
     
     client = AsyncPocketOptionClient(ssid=ssid, is_demo=True,  # Enable keep-alive like old API
             auto_reconnect=True,)
+    events = None
 
     try:
         #logger.info("Connecting to PocketOption...")
@@ -75,14 +78,26 @@ async def main():
 
             # Test placing an order (this should now work without the order_id error)
             #logger.info("esting order placement...")
-            ListOrder = []
+            publisher = SignalPublisher(ring="pocketoption")
+            # Orders stay active until expiry; keep published IDs for a day
+            ListOrder = SeenIds(ttl=86400, snapshot_path="settings/seen/mpo.json")
+            # The client hands every order the server reports to this stream as it arrives
+            events = client.order_events(kinds=("opened",))
+            # Orders opened before subscribing are only in the active list
+            active_orders = await client.get_active_orders()
             cnt = 0
             while True:
                 try:
-                    # Check active orders
                     Timen = datetime.now().strftime("%Y-%m-%d %H:%M:%S [Master]PocketOption: ")
-                    print("" + str(Timen) + " 📊 Checking active orders to Write...")
-                    active_orders = await client.get_active_orders()
+                    ListOrder.flush()
+                    if not active_orders:
+                        try:
+                            # Wakes up the moment an order is reported; the timeout only paces the connection checks
+                            active_orders = [(await asyncio.wait_for(events.__anext__(), 0.5)).order]
+                            while events.qsize():
+                                active_orders.append((await events.__anext__()).order)
+                        except asyncio.TimeoutError:
+                            print("" + str(Timen) + " 📊 Checking active orders to Write...")
                     #print(f"Active orders count: {len(active_orders)}")
                     
                     #test connection every 30 and 31 seconds
@@ -119,16 +134,15 @@ async def main():
                         # Check immediate order result
                         
                         if order_id not in ListOrder:
-                            # The order object has an 'open_time' attribute which is a datetime object.
-                            log_entry = f"- Time: {datetime.now()} Stamp: {int(datetime.now().timestamp())} ID: {order_id} Asset: {order.asset} Amount: {order.amount} Direction: {order.direction} Duration: {order.duration}\n"
-                            with open("orders.log", "a", encoding="utf-8") as f:
-                                f.write(log_entry)
-                            print(str(Timen) + f"   -> Logged new order {order_id} to orders.log")
-                            ListOrder.append(order_id)
+                            signal = signal_from_pocket_order(order)
+                            if publisher.publish(signal):
+                                print(str(Timen) + f"   -> Published new order {order_id} to the signal bus")
+                            else:
+                                print(str(Timen) + f"   -> Logged new order {order_id} to orders.log")
+                            ListOrder.add(order_id)
                             await client.delete_order_result(order.order_id)  # Delete the order after logging
 
-                            
-                    await asyncio.sleep(0.5)  # Use asyncio.sleep in an async function
+                    active_orders = []
                 except Exception as e:
                     #logger.error(f"An error occurred: {e}")
                     print(str(Timen) + f" An error occurred: {e}")
@@ -142,6 +156,8 @@ async def main():
         print(f"Connection error: {e}")
 
     finally:
+        if events is not None:
+            events.close()
         await client.disconnect()
         logger.info("Disconnected")
 
@@ -18,6 +18,7 @@ from .models import (
     Candle,
     Order,
     OrderResult,
+    OrderEvent,
     OrderStatus,
     OrderDirection,
     Asset,
@@ -56,6 +57,7 @@ __all__ = [
     "Candle",
     "Order",
     "OrderResult",
+    "OrderEvent",
     "OrderStatus",
     "OrderDirection",
     "Asset",
@@ -19,6 +19,7 @@ from .models import (
     Candle,
     Order,
     OrderResult,
+    OrderEvent,
     OrderStatus,
     OrderDirection,
     ServerTime,
@@ -33,6 +34,62 @@ from .exceptions import (
 )
 
 
+ORDER_EVENT_QUEUE_SIZE = 256
+
+
+class OrderEventStream:
+    """
+    Async iterator over order events, fed by the client as the server reports them
+
+    The queue is bounded: when the consumer falls behind by ``maxsize`` events the
+    client's message handler waits for room instead of dropping events, so every
+    opened and closed order is delivered exactly once.
+    """
+
+    def __init__(self, client: "AsyncPocketOptionClient", maxsize: int, kinds: tuple):
+        self.kinds = kinds
+        self._client = client
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._closed = False
+
+    def __aiter__(self) -> "OrderEventStream":
+        return self
+
+    async def __anext__(self) -> OrderEvent:
+        if self._closed and self._queue.empty():
+            raise StopAsyncIteration
+        event = await self._queue.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    async def __aenter__(self) -> "OrderEventStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def qsize(self) -> int:
+        """Events waiting to be consumed"""
+        return self._queue.qsize()
+
+    async def _put(self, event: OrderEvent) -> None:
+        if not self._closed and event.kind in self.kinds:
+            await self._queue.put(event)
+
+    def close(self) -> None:
+        """Stop the subscription; a pending iteration ends"""
+        if self._closed:
+            return
+        self._closed = True
+        if self in self._client._order_streams:
+            self._client._order_streams.remove(self)
+        # Unblock a handler waiting for room, then wake a waiting consumer
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+
 class AsyncPocketOptionClient:
     """
     Professional async PocketOption API client with modern Python practices
@@ -96,6 +153,7 @@ class AsyncPocketOptionClient:
         self._candles_cache: Dict[str, List[Candle]] = {}
         self._server_time: Optional[ServerTime] = None
         self._event_callbacks: Dict[str, List[Callable]] = defaultdict(list)
+        self._order_streams: List[OrderEventStream] = []
         # Setup event handlers for websocket messages
         self._setup_event_handlers()
 
@@ -604,6 +662,38 @@ class AsyncPocketOptionClient:
         """
         return list(self._active_orders.values()) 
 
+    def order_events(
+        self, maxsize: int = ORDER_EVENT_QUEUE_SIZE, kinds: tuple = ("opened", "closed")
+    ) -> OrderEventStream:
+        """
+        Subscribe to opened and closed orders
+
+        Usage::
+
+            async with client.order_events() as events:
+                async for event in events:
+                    print(event.kind, event.order.order_id)
+
+        Args:
+            maxsize: Events buffered before the message handler waits for the consumer
+            kinds: Event kinds to deliver ("opened", "closed")
+
+        Returns:
+            OrderEventStream: Async iterator of OrderEvent; close() (or leaving the
+            ``async with`` block) ends the subscription
+        """
+        stream = OrderEventStream(self, maxsize, tuple(kinds))
+        self._order_streams.append(stream)
+        return stream
+
+    async def _publish_order_event(self, kind: str, order: OrderResult) -> None:
+        """Hand an order event to every order_events() subscriber"""
+        if not self._order_streams:
+            return
+        event = OrderEvent(kind=kind, order=order, received_at=time.time())
+        for stream in list(self._order_streams):
+            await stream._put(event)
+
     def add_event_callback(self, event: str, callback: Callable) -> None:
         """
         Add event callback
@@ -638,6 +728,11 @@ class AsyncPocketOptionClient:
         else:
             return self._websocket.is_connected
 
+    @property
+    def server_time(self) -> Optional[ServerTime]:
+        """Latest server clock sample (None until the server has sent a timestamp)"""
+        return self._server_time
+
     @property
     def connection_info(self):
         """Get connection information (including persistent connections)"""
@@ -757,11 +852,19 @@ class AsyncPocketOptionClient:
 
     async def _setup_time_sync(self) -> None:
         """Setup server time synchronization"""
-        # This would typically involve getting server timestamp
-        # For now, create a basic time sync object
+        # Samples come from the server's own timestamps as they arrive (_sync_server_time);
+        # a fresh connection starts without one rather than with the local clock
+        self._server_time = None
+
+    def _sync_server_time(self, server_timestamp: float) -> None:
+        """Record a server timestamp that has just arrived"""
+        if server_timestamp <= 0:
+            return
         local_time = datetime.now().timestamp()
         self._server_time = ServerTime(
-            server_timestamp=local_time, local_timestamp=local_time, offset=0.0
+            server_timestamp=server_timestamp,
+            local_timestamp=local_time,
+            offset=server_timestamp - local_time,
         )
 
     def _validate_order_parameters(
@@ -1053,6 +1156,7 @@ class AsyncPocketOptionClient:
         # Check if this is detailed order data with requestId
         if "requestId" in data and "asset" in data and "amount" in data:
             request_id = str(data["requestId"])
+            self._sync_server_time(float(data.get("openTimestamp", 0)))
 
             # If this is a new order, add it to tracking
             if (
@@ -1081,6 +1185,7 @@ class AsyncPocketOptionClient:
                         f" Order {request_id} added to tracking from JSON data"
                     )
 
+                await self._publish_order_event("opened", order_result)
                 await self._emit_event("order_opened", data)
 
         # Check if this is order result data with deals
@@ -1122,7 +1227,8 @@ class AsyncPocketOptionClient:
                             logger.success(
                                 f" Order {order_id} completed via JSON data: {status.value} - Profit: ${profit:.2f}"
                             )
-                            await self._emit_event("order_closed", result)
+                        await self._publish_order_event("closed", result)
+                        await self._emit_event("order_closed", result)
 
     async def _emit_event(self, event: str, data: Any) -> None:
         """Emit event to registered callbacks"""
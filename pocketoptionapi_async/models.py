@@ -205,6 +205,17 @@ class OrderResult(BaseModel):
         frozen = False
 
 
+class OrderEvent(BaseModel):
+    """
+    Order lifecycle event delivered by AsyncPocketOptionClient.order_events().
+    kind is "opened" when the server reports a new order and "closed" when its result arrives.
+    """
+
+    kind: str
+    order: OrderResult
+    received_at: float
+
+
 class ServerTime(BaseModel):
     """
     Server time synchronization model.
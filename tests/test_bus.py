@@ -0,0 +1,68 @@
+import asyncio
+import socket
+import time
+
+from copytrade import Signal, SignalBus, SignalPublisher, SignalSubscriber
+
+
+def closed_port() -> int:
+    """A localhost port nothing listens on, so the publisher's TCP fallback fails fast"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def trade(trade_id: str) -> Signal:
+    now = time.time()
+    return Signal(broker="iqoption", id=trade_id, asset="EURUSD", direction="call", amount=1.0,
+                  duration=60, stamp=now, expiry=now + 60)
+
+
+def test_signal_published_while_bus_restarts_reaches_subscriber(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    socket_path = str(tmp_path / "signals.sock")
+    audit_path = str(tmp_path / "orders.log")
+    port = closed_port()
+
+    async def run():
+        bus = SignalBus(socket_path=socket_path, port=port, audit_path=audit_path)
+        await bus.start()
+        subscriber = SignalSubscriber(socket_path=socket_path, port=port, reconnect_delay=0.05)
+        assert await subscriber.connect()
+        publisher = SignalPublisher(socket_path=socket_path, port=port, fallback_path=audit_path)
+
+        assert publisher.publish(trade("first"))
+        received = await subscriber.poll(2.0)
+
+        await bus.stop()
+        # The bus is down: the publisher falls back to orders.log
+        assert not publisher.publish(trade("second"))
+
+        bus = SignalBus(socket_path=socket_path, port=port, audit_path=audit_path)
+        await bus.start()
+        deadline = time.monotonic() + 5.0
+        while len(received) < 2 and time.monotonic() < deadline:
+            received += await subscriber.poll(0.2)
+
+        publisher.close()
+        await subscriber.close()
+        await bus.stop()
+        return [signal.id for signal in received]
+
+    assert asyncio.run(run()) == ["first", "second"]
+
+
+def test_signal_too_large_for_the_ring_is_still_published(tmp_path):
+    audit_path = tmp_path / "orders.log"
+    publisher = SignalPublisher(socket_path=str(tmp_path / "signals.sock"), port=closed_port(),
+                                fallback_path=str(audit_path), ring=f"test_{time.time_ns()}")
+    try:
+        signal = trade("large")
+        signal.extra["note"] = "x" * 4096
+        assert not publisher.publish(signal)
+        assert publisher.ring_skipped == 1
+        assert b'"large"' in audit_path.read_bytes()
+    finally:
+        publisher.close()
+        publisher._ring.close()
+        publisher._ring.unlink()
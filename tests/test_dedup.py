@@ -0,0 +1,33 @@
+import time
+
+from copytrade import SeenIds, Signal
+from copytrade.timesync import TimeSyncService
+
+
+def test_resend_inside_freshness_window_is_not_copied_again():
+    # A 10 minute trade opened 200 s ago, re-sent now: past the 60 s TTL, still fresh
+    now = time.time()
+    signal = Signal(broker="iqoption", id="1234", asset="EURUSD", direction="call", amount=1.0,
+                    duration=600, stamp=now - 200, expiry=now + 400)
+    seen = SeenIds(ttl=60)
+    assert seen.add(signal.id, now=signal.stamp, expires_at=signal.expiry)
+
+    assert TimeSyncService().fresh(signal)
+    assert not seen.add(signal.id, expires_at=signal.expiry)
+
+
+def test_id_without_expiry_falls_back_to_ttl():
+    now = time.time()
+    seen = SeenIds(ttl=60)
+    assert seen.add("1234", now=now - 61)
+    assert seen.add("1234", now=now)
+
+
+def test_expiry_order_survives_mixed_lifetimes():
+    now = time.time()
+    seen = SeenIds(ttl=60)
+    seen.add("long", now=now, expires_at=now + 600)
+    seen.add("short", now=now)
+    seen.expire(now + 61)
+    assert "long" in seen
+    assert "short" not in seen